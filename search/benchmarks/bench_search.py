@@ -0,0 +1,365 @@
+#!/usr/bin/env python3
+
+import argparse
+import json
+import math
+import multiprocessing as mp
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from corpus import DISTRIBUTIONS, SIZES, generate_corpus, make_vocabulary
+from sliding_window import (
+    TOKENIZERS,
+    FileFinder,
+    IndexSearch,
+    MinimumWindowSearch,
+    SearchIndex,
+    TextHighlighter,
+)
+
+COMPARED_METRICS = (
+    "files_per_sec",
+    "mb_per_sec",
+    "tokens_per_sec",
+    "matches_per_sec",
+    "p50_ms",
+    "p99_ms",
+)
+
+
+def peak_rss_mb() -> Optional[float]:
+    if resource is None:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in kilobytes elsewhere.
+    if sys.platform == "darwin":
+        rss /= 1024
+    return round(rss / 1024, 1)
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    ordered = sorted(values)
+    rank = max(1, math.ceil(fraction * len(ordered)))
+    return ordered[rank - 1]
+
+
+def latency_stats(latencies: List[float]) -> Dict[str, Any]:
+    return {
+        "queries": len(latencies),
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 3),
+        "mean_ms": round(statistics.mean(latencies) * 1000, 3),
+    }
+
+
+def best_of(repeat: int, function) -> Tuple[Any, float]:
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        best = min(best, time.perf_counter() - start)
+    return result, best
+
+
+def make_queries(vocabulary: List[str], count: int, seed: int) -> List[List[str]]:
+    # Pair terms from the head, middle and tail of the rank order so Zipf
+    # corpora exercise frequent, common and rare postings alike.
+    rng = random.Random(seed)
+    bands = [(0, 10), (10, 200), (200, len(vocabulary))]
+    queries = []
+    for i in range(count):
+        first = bands[i % len(bands)]
+        second = bands[(i // len(bands)) % len(bands)]
+        queries.append(
+            [
+                vocabulary[rng.randrange(*first)],
+                vocabulary[rng.randrange(*second)],
+            ]
+        )
+    return queries
+
+
+def read_texts(paths: List[str]) -> List[Tuple[str, str]]:
+    texts = []
+    for path in paths:
+        with open(path, "r", encoding="utf-8") as f:
+            texts.append((path, f.read()))
+    return texts
+
+
+def bench_corpus(
+    root: str, queries: List[List[str]], window: int, repeat: int
+) -> Tuple[Dict[str, Dict[str, Any]], Optional[float]]:
+    # ru_maxrss is a high-water mark for the whole process and cannot be
+    # reset, so peak memory is reported once per corpus rather than per stage.
+    stages = {}
+
+    paths, seconds = best_of(repeat, lambda: list(FileFinder().find_files(root)))
+    stages["walk"] = {
+        "seconds": round(seconds, 4),
+        "files": len(paths),
+        "files_per_sec": round(len(paths) / seconds, 1),
+    }
+
+    texts, seconds = best_of(repeat, lambda: read_texts(paths))
+    total_bytes = sum(len(text.encode("utf-8")) for _, text in texts)
+    stages["read"] = {
+        "seconds": round(seconds, 4),
+        "bytes": total_bytes,
+        "mb_per_sec": round(total_bytes / seconds / 1e6, 2),
+    }
+
+    token_count = 0
+    for name, tokenizer_class in sorted(TOKENIZERS.items()):
+        tokenizer = tokenizer_class(use_cache=False)
+        results, seconds = best_of(
+            repeat, lambda: [tokenizer.tokenize(text) for _, text in texts]
+        )
+        token_count = sum(len(tokens) for tokens in results)
+        del results
+        stages[f"tokenize.{name}"] = {
+            "seconds": round(seconds, 4),
+            "tokens": token_count,
+            "tokens_per_sec": round(token_count / seconds, 1),
+        }
+
+    # Size the caches to hold the whole corpus so query latency measures the
+    # window search itself; tokenization is timed above.
+    strategy = MinimumWindowSearch(cache_bytes=1 << 40)
+    for path, text in texts:
+        strategy.search(text, queries[0], window, path)
+
+    matches = []
+    latencies = []
+    for query in queries:
+        start = time.perf_counter()
+        query_matches = []
+        for path, text in texts:
+            query_matches.extend(strategy.search(text, query, window, path))
+        latencies.append(time.perf_counter() - start)
+        matches.append((query, query_matches))
+
+    stages["search"] = latency_stats(latencies)
+    stages["search"]["tokens_per_sec"] = round(
+        token_count * len(queries) / sum(latencies), 1
+    )
+    del strategy
+
+    index, seconds = best_of(repeat, lambda: SearchIndex.build(root, FileFinder()))
+    stages["index_build"] = {
+        "seconds": round(seconds, 4),
+        "files_per_sec": round(len(index.files) / seconds, 1),
+        "tokens_per_sec": round(token_count / seconds, 1),
+        "terms": len(index.postings),
+    }
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        index_path = os.path.join(temp_dir, "index")
+        _, seconds = best_of(repeat, lambda: index.save(index_path))
+        stages["index_save"] = {
+            "seconds": round(seconds, 4),
+            "bytes": os.path.getsize(index_path),
+        }
+
+        def load():
+            loaded = SearchIndex.load(index_path)
+            loaded.close()
+
+        _, seconds = best_of(repeat, load)
+        stages["index_load"] = {
+            "seconds": round(seconds, 4),
+        }
+
+    index_search = IndexSearch(index, MinimumWindowSearch())
+    latencies = []
+    for query in queries:
+        start = time.perf_counter()
+        list(index_search.search(query, window))
+        latencies.append(time.perf_counter() - start)
+    stages["index_query"] = latency_stats(latencies)
+
+    highlighter = TextHighlighter(use_color=True)
+    match_count = sum(len(query_matches) for _, query_matches in matches)
+
+    def highlight():
+        for query, query_matches in matches:
+            for match in query_matches:
+                highlighter.format_match(match, query)
+
+    _, seconds = best_of(repeat, highlight)
+    stages["highlight"] = {
+        "seconds": round(seconds, 4),
+        "matches": match_count,
+        "matches_per_sec": round(match_count / seconds, 1) if seconds else None,
+    }
+
+    return stages, peak_rss_mb()
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(baseline: Dict[str, Any], report: Dict[str, Any]):
+    previous = {
+        (result["size"], result["distribution"]): result
+        for result in baseline.get("results", [])
+    }
+
+    for result in report["results"]:
+        before_result = previous.get((result["size"], result["distribution"]))
+        if before_result is None:
+            continue
+
+        print(f"{result['size']}/{result['distribution']}:", file=sys.stderr)
+        changes = [
+            ("peak_rss_mb", before_result.get("peak_rss_mb"), result["peak_rss_mb"])
+        ]
+        for stage, metrics in result["stages"].items():
+            for metric in COMPARED_METRICS:
+                changes.append(
+                    (
+                        f"{stage}.{metric}",
+                        before_result["stages"].get(stage, {}).get(metric),
+                        metrics.get(metric),
+                    )
+                )
+
+        for name, before, after in changes:
+            if not before or after is None:
+                continue
+            change = (after - before) / before * 100
+            print(
+                f"  {name:<32} {before:>12} -> {after:>12} ({change:+.1f}%)",
+                file=sys.stderr,
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Time each sliding window search stage on synthetic corpora "
+        "and report the results as JSON."
+    )
+    parser.add_argument(
+        "--sizes",
+        nargs="+",
+        choices=sorted(SIZES),
+        default=["small", "medium"],
+        help="Corpus size presets to run (default: small medium)",
+    )
+    parser.add_argument(
+        "--distributions",
+        nargs="+",
+        choices=DISTRIBUTIONS,
+        default=list(DISTRIBUTIONS),
+        help="Term distributions to run (default: all)",
+    )
+    parser.add_argument(
+        "--queries", type=int, default=30, help="Queries per corpus (default: 30)"
+    )
+    parser.add_argument(
+        "-w", "--window", type=int, default=50, help="Window size (default: 50)"
+    )
+    parser.add_argument(
+        "--repeat",
+        type=int,
+        default=3,
+        help="Timed runs per throughput stage, best one kept (default: 3)",
+    )
+    parser.add_argument("--seed", type=int, default=0, help="Random seed (default: 0)")
+    parser.add_argument(
+        "--corpus-dir",
+        help="Generate corpora here and keep them (default: a temporary directory)",
+    )
+    parser.add_argument("-o", "--output", help="Write the JSON report to this file")
+    parser.add_argument(
+        "--compare", help="Baseline JSON report to print relative changes against"
+    )
+    args = parser.parse_args()
+
+    report = {
+        "meta": {
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        },
+        "config": {
+            "queries": args.queries,
+            "window": args.window,
+            "repeat": args.repeat,
+            "seed": args.seed,
+        },
+        "results": [],
+    }
+
+    vocabulary = make_vocabulary(5000, args.seed)
+    queries = make_queries(vocabulary, args.queries, args.seed)
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        base_dir = args.corpus_dir or temp_dir
+        for size in args.sizes:
+            file_count, file_bytes = SIZES[size]
+            for distribution in args.distributions:
+                root = os.path.join(base_dir, f"{size}-{distribution}")
+                if not os.path.isdir(root):
+                    generate_corpus(
+                        root, file_count, file_bytes, distribution, seed=args.seed
+                    )
+
+                print(f"Benchmarking {size}/{distribution}...", file=sys.stderr)
+                # A fresh process per corpus keeps peak RSS from carrying over.
+                with ProcessPoolExecutor(1, mp_context=mp.get_context("spawn")) as pool:
+                    stages, peak_rss = pool.submit(
+                        bench_corpus, root, queries, args.window, args.repeat
+                    ).result()
+                report["results"].append(
+                    {
+                        "size": size,
+                        "distribution": distribution,
+                        "files": file_count,
+                        "bytes": file_count * file_bytes,
+                        "peak_rss_mb": peak_rss,
+                        "stages": stages,
+                    }
+                )
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+
+    if args.compare:
+        with open(args.compare) as f:
+            compare(json.load(f), report)
+
+
+if __name__ == "__main__":
+    main()
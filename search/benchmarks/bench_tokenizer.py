@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+
+import argparse
+import os
+import sys
+import time
+from typing import List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from corpus import synthetic_text
+from sliding_window import TOKENIZERS, FileFinder
+
+
+def load_corpus(path: str) -> List[str]:
+    texts = []
+    for file_path in FileFinder().find_files(path):
+        try:
+            with open(file_path, "r", encoding="utf-8") as f:
+                texts.append(f.read())
+        except (IOError, UnicodeDecodeError):
+            continue
+    return texts
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compare tokenizer backends on a real or synthetic corpus."
+    )
+    parser.add_argument("-f", "--file", help="File or directory to use as the corpus")
+    parser.add_argument(
+        "--size-mb",
+        type=float,
+        default=20,
+        help="Size of the synthetic corpus when no --file is given (default: 20)",
+    )
+    parser.add_argument(
+        "--repeat", type=int, default=3, help="Timed runs per backend (default: 3)"
+    )
+    args = parser.parse_args()
+
+    if args.file:
+        texts = load_corpus(args.file)
+    else:
+        texts = [synthetic_text(int(args.size_mb * 1024 * 1024))]
+
+    total_chars = sum(len(text) for text in texts)
+    print(f"Corpus: {len(texts)} texts, {total_chars / 1e6:.1f}M characters")
+
+    reference = None
+    for name, tokenizer_class in sorted(TOKENIZERS.items()):
+        best = float("inf")
+        for _ in range(args.repeat):
+            tokenizer = tokenizer_class(use_cache=False)
+            start = time.perf_counter()
+            results = [tokenizer.tokenize(text) for text in texts]
+            best = min(best, time.perf_counter() - start)
+
+        token_count = sum(len(tokens) for tokens in results)
+        # Term ids depend on interning order, so compare the normalized terms.
+        tokenized = [
+            (
+                tokens.starts,
+                tokens.ends,
+                [tokens.dictionary[term_id] for term_id in tokens.term_ids],
+            )
+            for tokens in results
+        ]
+        if reference is None:
+            reference = tokenized
+        elif tokenized != reference:
+            print(f"{name}: tokens or normalized terms differ from the other backend")
+            sys.exit(1)
+
+        print(
+            f"{name:>8}: {best:8.3f}s  "
+            f"{total_chars / best / 1e6:8.2f}M chars/s  "
+            f"{token_count / best / 1e6:8.2f}M tokens/s"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+
+import argparse
+import itertools
+import os
+import random
+from typing import List, Optional, Sequence
+
+WORDS = (
+    "the of and to in is that for it as was with be by on not he this are or his "
+    "from at which but have an they you were her she there been one all we their "
+    "search window token index query file python data system memory process"
+).split()
+PUNCTUATION = ["", "", "", "", ",", ".", ";", ":", "!", "?", ")", '"']
+SYLLABLES = [c + v for c in "bcdfghklmnprstvz" for v in "aeiou"]
+
+DISTRIBUTIONS = ("uniform", "zipf")
+SIZES = {
+    "small": (50, 20 * 1024),
+    "medium": (200, 50 * 1024),
+    "large": (500, 100 * 1024),
+}
+
+
+def make_vocabulary(size: int, seed: int = 0) -> List[str]:
+    rng = random.Random(seed)
+    vocabulary = list(dict.fromkeys(WORDS))
+    seen = set(vocabulary)
+    while len(vocabulary) < size:
+        word = "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(1, 4)))
+        if word not in seen:
+            seen.add(word)
+            vocabulary.append(word)
+    return vocabulary[:size]
+
+
+def cumulative_weights(
+    count: int, distribution: str, exponent: float = 1.1
+) -> Optional[List[float]]:
+    if distribution == "uniform":
+        return None
+    if distribution == "zipf":
+        return list(
+            itertools.accumulate(1.0 / rank**exponent for rank in range(1, count + 1))
+        )
+    raise ValueError(f"unknown distribution {distribution!r}")
+
+
+def synthetic_text(
+    size_bytes: int,
+    seed: int = 0,
+    vocabulary: Sequence[str] = WORDS,
+    distribution: str = "uniform",
+    exponent: float = 1.1,
+) -> str:
+    rng = random.Random(seed)
+    weights = cumulative_weights(len(vocabulary), distribution, exponent)
+    parts = []
+    total = 0
+    while total < size_bytes:
+        for word in rng.choices(vocabulary, cum_weights=weights, k=1024):
+            if rng.random() < 0.05:
+                word = word.capitalize()
+            chunk = (
+                word + rng.choice(PUNCTUATION) + ("\n" if rng.random() < 0.08 else " ")
+            )
+            parts.append(chunk)
+            total += len(chunk)
+            if total >= size_bytes:
+                break
+    return "".join(parts)
+
+
+def generate_corpus(
+    directory: str,
+    file_count: int,
+    file_bytes: int,
+    distribution: str = "zipf",
+    vocabulary_size: int = 5000,
+    exponent: float = 1.1,
+    seed: int = 0,
+    files_per_dir: int = 20,
+) -> List[str]:
+    vocabulary = make_vocabulary(vocabulary_size, seed)
+    paths = []
+    for i in range(file_count):
+        subdir = os.path.join(directory, f"d{i // files_per_dir:03d}")
+        os.makedirs(subdir, exist_ok=True)
+        path = os.path.join(subdir, f"f{i:05d}.txt")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(
+                synthetic_text(
+                    file_bytes, seed * 1000003 + i, vocabulary, distribution, exponent
+                )
+            )
+        paths.append(path)
+    return paths
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Write a deterministic synthetic corpus for the search benchmarks."
+    )
+    parser.add_argument("directory", help="Directory to write the corpus into")
+    parser.add_argument(
+        "--size",
+        choices=sorted(SIZES),
+        default="small",
+        help="Corpus size preset (default: small)",
+    )
+    parser.add_argument(
+        "--files", type=int, help="Number of files (overrides the size preset)"
+    )
+    parser.add_argument(
+        "--file-kb",
+        type=int,
+        help="Size of each file in KB (overrides the size preset)",
+    )
+    parser.add_argument(
+        "--distribution",
+        choices=DISTRIBUTIONS,
+        default="zipf",
+        help="Term frequency distribution (default: zipf)",
+    )
+    parser.add_argument(
+        "--exponent",
+        type=float,
+        default=1.1,
+        help="Zipf exponent; larger values concentrate on fewer terms (default: 1.1)",
+    )
+    parser.add_argument(
+        "--vocabulary",
+        type=int,
+        default=5000,
+        help="Number of distinct terms (default: 5000)",
+    )
+    parser.add_argument("--seed", type=int, default=0, help="Random seed (default: 0)")
+    args = parser.parse_args()
+
+    file_count, file_bytes = SIZES[args.size]
+    if args.files is not None:
+        file_count = args.files
+    if args.file_kb is not None:
+        file_bytes = args.file_kb * 1024
+
+    paths = generate_corpus(
+        args.directory,
+        file_count,
+        file_bytes,
+        args.distribution,
+        args.vocabulary,
+        args.exponent,
+        args.seed,
+    )
+    print(
+        f"Wrote {len(paths)} files ({len(paths) * file_bytes / 1e6:.1f}MB) "
+        f"to {args.directory}"
+    )
+
+
+if __name__ == "__main__":
+    main()
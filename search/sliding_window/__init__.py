@@ -0,0 +1,87 @@
+from .cache import DEFAULT_CACHE_BYTES, LRUCache
+from .stats import PipelineStats, stage_timer, StageStats
+from .tokens import (
+    FastTokenizer,
+    TermDictionary,
+    TextTokenizer,
+    Token,
+    TokenArray,
+    TOKENIZERS,
+)
+from .matches import MatchCollector, SearchMatch, TokenWindow
+from .scoring import BM25Scorer, CorpusStats, Scorer, SCORERS, WindowScorer
+from .walk import DEFAULT_READ_AHEAD_BYTES, FileFinder, IgnoreFile, ReadAheadReader
+from .strategies import MinimumWindowSearch, SearchStrategy, SlidingWindowSearch
+from .stream import StreamingWindowSearch, TermPrefilter
+from .vocabulary import edit_distance, TermVocabulary, TrigramIndex
+from .postings import IndexedFile, PackedPostings
+from .index import DEFAULT_INDEX_PATH, IndexChanges, IndexSearch, SearchIndex
+from .query import (
+    QueryClause,
+    QueryError,
+    QueryExecutor,
+    QueryParser,
+    QuerySearch,
+    QueryTerm,
+)
+from .serve import (
+    DEFAULT_SERVE_PORT,
+    SearchHTTPHandler,
+    SearchService,
+    SearchSocketHandler,
+)
+from .highlight import TextHighlighter
+from .cli import WindowSearchCLI, main
+
+__all__ = [
+    "DEFAULT_CACHE_BYTES",
+    "LRUCache",
+    "PipelineStats",
+    "stage_timer",
+    "StageStats",
+    "FastTokenizer",
+    "TermDictionary",
+    "TextTokenizer",
+    "Token",
+    "TokenArray",
+    "TOKENIZERS",
+    "MatchCollector",
+    "SearchMatch",
+    "TokenWindow",
+    "BM25Scorer",
+    "CorpusStats",
+    "Scorer",
+    "SCORERS",
+    "WindowScorer",
+    "DEFAULT_READ_AHEAD_BYTES",
+    "FileFinder",
+    "IgnoreFile",
+    "ReadAheadReader",
+    "MinimumWindowSearch",
+    "SearchStrategy",
+    "SlidingWindowSearch",
+    "StreamingWindowSearch",
+    "TermPrefilter",
+    "edit_distance",
+    "TermVocabulary",
+    "TrigramIndex",
+    "IndexedFile",
+    "PackedPostings",
+    "DEFAULT_INDEX_PATH",
+    "IndexChanges",
+    "IndexSearch",
+    "SearchIndex",
+    "QueryClause",
+    "QueryError",
+    "QueryExecutor",
+    "QueryParser",
+    "QuerySearch",
+    "QueryTerm",
+    "DEFAULT_SERVE_PORT",
+    "SearchHTTPHandler",
+    "SearchService",
+    "SearchSocketHandler",
+    "TextHighlighter",
+    "WindowSearchCLI",
+    "main",
+]
@@ -0,0 +1,864 @@
+import argparse
+import cProfile
+import multiprocessing as mp
+import sys
+import time
+import tracemalloc
+import os
+import socketserver
+import stat
+import struct
+from http.server import ThreadingHTTPServer
+from typing import Any, List, Tuple, Dict, Iterable, Iterator, Optional
+
+from .cache import DEFAULT_CACHE_BYTES, file_key
+from .stats import PipelineStats, stage_timer
+from .tokens import TOKENIZERS
+from .matches import MatchCollector, SearchMatch
+from .scoring import BM25Scorer, CorpusStats, SCORERS
+from .walk import DEFAULT_READ_AHEAD_BYTES, FileFinder, ReadAheadReader
+from .strategies import MinimumWindowSearch
+from .stream import StreamingWindowSearch, TermPrefilter
+from .index import DEFAULT_INDEX_PATH, IndexSearch, SearchIndex
+from .query import QueryError, QueryExecutor, QueryParser, QuerySearch
+from .serve import (
+    DEFAULT_SERVE_PORT,
+    SearchHTTPHandler,
+    SearchService,
+    SearchSocketHandler,
+)
+from .highlight import TextHighlighter
+
+
+class WindowSearchCLI:
+
+    def __init__(self, stats: Optional[PipelineStats] = None):
+        self.stats = stats
+        self.search_strategy = MinimumWindowSearch()
+        self.highlighter = TextHighlighter()
+        self.file_finder = None
+        self.collector: Optional[MatchCollector] = None
+        self.score_bound = float("inf")
+        self.files_searched = 0
+        self.files_skipped = 0
+
+    def add_file_filter_args(self, parser: argparse.ArgumentParser):
+
+        parser.add_argument(
+            "-E", "--file-pattern", help="Regular expression pattern to filter files"
+        )
+        parser.add_argument(
+            "--no-ignore",
+            action="store_true",
+            help="Disable default ignore patterns and .gitignore/.ignore files",
+        )
+        parser.add_argument(
+            "--binary",
+            action="store_true",
+            help="Also search files that look binary (contain NUL bytes)",
+        )
+        parser.add_argument(
+            "--ignore-dir",
+            action="append",
+            default=[],
+            help="Additional directory names to ignore (can be specified multiple times)",
+        )
+        parser.add_argument(
+            "--ignore-ext",
+            action="append",
+            default=[],
+            help="Additional file extensions to ignore (can be specified multiple times)",
+        )
+
+    def parse_index_args(self, argv: List[str]):
+
+        parser = argparse.ArgumentParser(
+            prog=f"{os.path.basename(sys.argv[0])} index",
+            description="Build a persistent positional index for fast repeated searches.",
+        )
+        parser.add_argument("path", help="File or directory to index")
+        parser.add_argument(
+            "-o",
+            "--output",
+            default=DEFAULT_INDEX_PATH,
+            help=f"Index file to write (default: {DEFAULT_INDEX_PATH})",
+        )
+        parser.add_argument(
+            "-u",
+            "--update",
+            action="store_true",
+            help="Refresh an existing index, re-tokenizing only added or changed files",
+        )
+        parser.add_argument(
+            "--hash",
+            action="store_true",
+            help="Store content hashes so touched but unmodified files are not re-tokenized",
+        )
+        self.add_file_filter_args(parser)
+
+        args = parser.parse_args(argv)
+        args.command = "index"
+        return args
+
+    def parse_serve_args(self, argv: List[str]):
+
+        parser = argparse.ArgumentParser(
+            prog=f"{os.path.basename(sys.argv[0])} serve",
+            description="Keep a warm in-memory index of one or more roots and answer "
+            "queries with JSON over HTTP or a Unix socket.",
+        )
+        parser.add_argument("roots", nargs="+", help="Files or directories to serve")
+        parser.add_argument(
+            "--host", default="127.0.0.1", help="HTTP address (default: 127.0.0.1)"
+        )
+        parser.add_argument(
+            "--port",
+            type=int,
+            default=DEFAULT_SERVE_PORT,
+            help=f"HTTP port (default: {DEFAULT_SERVE_PORT})",
+        )
+        parser.add_argument(
+            "--socket",
+            help="Listen on this Unix socket for newline-delimited JSON requests "
+            "instead of HTTP",
+        )
+        parser.add_argument(
+            "--poll-interval",
+            type=float,
+            default=2.0,
+            help="Seconds between scans for changed files, 0 to disable (default: 2.0)",
+        )
+        parser.add_argument(
+            "--hash",
+            action="store_true",
+            help="Store content hashes so touched but unmodified files are not re-tokenized",
+        )
+        parser.add_argument(
+            "--cache-mb",
+            type=int,
+            default=DEFAULT_CACHE_BYTES // (1024 * 1024),
+            help="Memory budget in MB for the token cache (default: %(default)s)",
+        )
+        self.add_file_filter_args(parser)
+
+        args = parser.parse_args(argv)
+        if args.poll_interval < 0:
+            parser.error("--poll-interval cannot be negative")
+        args.command = "serve"
+        return args
+
+    def parse_args(self, argv: Optional[List[str]] = None):
+
+        argv = sys.argv[1:] if argv is None else argv
+        if argv and argv[0] == "index":
+            return self.parse_index_args(argv[1:])
+        if argv and argv[0] == "serve":
+            return self.parse_serve_args(argv[1:])
+
+        parser = argparse.ArgumentParser(
+            description="Search text using a sliding window approach to find sections containing all query terms.",
+            formatter_class=argparse.RawDescriptionHelpFormatter,
+            epilog="""
+Examples:
+
+  %(prog)s -f document.txt -q "python" "machine learning" -w 50
+
+
+  %(prog)s -f document.txt -q "python" "data" --min-window 20 --max-window 100
+  
+
+  cat document.txt | %(prog)s -q "python" "data"
+  zcat huge.log.gz | %(prog)s -q "timeout" "retry" --stream
+
+
+  %(prog)s index ./docs -o docs.idx
+  %(prog)s index ./docs -o docs.idx --update
+  %(prog)s --index docs.idx -q "python" "data" -w 50
+  %(prog)s --index docs.idx -Q '"machine learning" optim* NOT deprecated' -w 30
+
+
+  %(prog)s serve ./docs ./src --port 8765
+  curl 'http://127.0.0.1:8765/search?q=python+data&w=50'
+""",
+        )
+
+        parser.add_argument(
+            "-f",
+            "--file",
+            help="Input file or directory (if not specified, reads from stdin)",
+        )
+        parser.add_argument(
+            "-i",
+            "--index",
+            help="Answer the query from an index built with the 'index' command",
+        )
+        self.add_file_filter_args(parser)
+        query = parser.add_mutually_exclusive_group(required=True)
+        query.add_argument("-q", "--query", nargs="+", help="Query terms to search for")
+        query.add_argument(
+            "-Q",
+            "--expr",
+            help='Query expression evaluated on the index (requires -i/--index): '
+            '"exact phrase", a OR b, NOT a / -a (files without a), optim* '
+            "(prefix), term~N (within N edits, default 1) and parentheses; "
+            "reports minimal spans of at most -w tokens",
+        )
+        parser.add_argument(
+            "-w",
+            "--window",
+            type=int,
+            default=50,
+            help="Window size in tokens (default: 50)",
+        )
+        parser.add_argument(
+            "--min-window",
+            type=int,
+            help="Minimum window size to try (enables variable window search)",
+        )
+        parser.add_argument(
+            "--max-results",
+            type=int,
+            default=5,
+            help="Maximum number of results to show (default: 5)",
+        )
+        parser.add_argument(
+            "--stream",
+            action="store_true",
+            help="Stream files (mmap) or stdin (chunked) keeping only one window of "
+            "tokens in memory; positions are byte offsets",
+        )
+        parser.add_argument(
+            "-j",
+            "--jobs",
+            type=int,
+            default=1,
+            help="Number of worker processes for directory searches (default: 1)",
+        )
+        parser.add_argument(
+            "--read-ahead-mb",
+            type=int,
+            default=DEFAULT_READ_AHEAD_BYTES // (1024 * 1024),
+            help="Memory budget in MB for files read ahead of the one being searched "
+            "in single-process directory searches; 0 reads one file at a time "
+            "(default: %(default)s)",
+        )
+        parser.add_argument(
+            "--no-prefilter",
+            action="store_true",
+            help="Tokenize every file instead of first skipping files that lack a query term",
+        )
+        parser.add_argument(
+            "--scorer",
+            choices=sorted(SCORERS),
+            default="window",
+            help="Ranking function: 1/window size, or BM25 with span tightness and "
+            "term order (requires -i/--index) (default: window)",
+        )
+        parser.add_argument(
+            "--tokenizer",
+            choices=sorted(TOKENIZERS),
+            default="fast",
+            help="Tokenizer backend (default: fast)",
+        )
+        parser.add_argument(
+            "--cache-mb",
+            type=int,
+            default=DEFAULT_CACHE_BYTES // (1024 * 1024),
+            help="Memory budget in MB for each token and position cache (default: %(default)s)",
+        )
+        parser.add_argument(
+            "--no-color", action="store_true", help="Disable colored output"
+        )
+        parser.add_argument(
+            "--stats",
+            action="store_true",
+            help="Print wall and CPU time per pipeline stage plus bytes, tokens, "
+            "cache and skip counters to stderr (worker figures are summed)",
+        )
+        parser.add_argument(
+            "--profile",
+            metavar="FILE",
+            help="Write cProfile data for the search to FILE (view with python -m pstats)",
+        )
+        parser.add_argument(
+            "--tracemalloc",
+            type=int,
+            metavar="N",
+            nargs="?",
+            const=10,
+            help="Trace allocations and print the N largest sites (default N: 10)",
+        )
+
+        args = parser.parse_args(argv)
+        if args.jobs < 1:
+            parser.error("-j/--jobs must be at least 1")
+        if args.window < 1:
+            parser.error("-w/--window must be at least 1")
+        if args.min_window is not None and not 1 <= args.min_window <= args.window:
+            parser.error("--min-window must be between 1 and -w/--window")
+        if args.read_ahead_mb < 0:
+            parser.error("--read-ahead-mb must not be negative")
+        if args.scorer == "bm25" and not args.index:
+            parser.error("--scorer bm25 needs corpus statistics from -i/--index")
+        if args.stream and (args.index or args.min_window is not None):
+            parser.error("--stream cannot be combined with -i/--index or --min-window")
+        if args.index and args.file:
+            parser.error("-f/--file and -i/--index are mutually exclusive")
+        args.clauses = None
+        if args.expr is not None:
+            if not args.index:
+                parser.error("-Q/--expr is evaluated on the index and needs -i/--index")
+            try:
+                args.clauses = QueryParser().parse(args.expr)
+            except QueryError as e:
+                parser.error(f"invalid query expression: {e}")
+        args.command = "search"
+        return args
+
+    def create_search_strategy(self, args) -> MinimumWindowSearch:
+
+        cache_bytes = args.cache_mb * 1024 * 1024
+        tokenizer = TOKENIZERS[args.tokenizer](cache_bytes=cache_bytes)
+        search_strategy = MinimumWindowSearch(cache_bytes, tokenizer)
+        search_strategy.stats = self.stats
+        return search_strategy
+
+    def stage(self, name: str):
+
+        return stage_timer(self.stats, name)
+
+    def timed(self, name: str, iterable: Iterable) -> Iterable:
+
+        if self.stats is None:
+            return iterable
+        return self.stats.iterate(name, iterable)
+
+    def count(self, name: str, amount: int = 1):
+
+        if self.stats is not None:
+            self.stats.count(name, amount)
+
+    def create_file_finder(self, args) -> FileFinder:
+
+        ignore_dirs = set(FileFinder.DEFAULT_IGNORE_DIRS)
+        ignore_dirs.update(args.ignore_dir)
+
+        ignore_extensions = set(FileFinder.DEFAULT_IGNORE_EXTENSIONS)
+        ignore_extensions.update("." + ext.lstrip(".") for ext in args.ignore_ext)
+
+        return FileFinder(
+            args.file_pattern,
+            ignore_dirs=ignore_dirs if not args.no_ignore else set(),
+            ignore_extensions=ignore_extensions if not args.no_ignore else set(),
+            no_ignore=args.no_ignore,
+            skip_binary=not args.binary,
+        )
+
+    def create_prefilter(self, args) -> Optional[TermPrefilter]:
+
+        return None if args.no_prefilter else TermPrefilter(args.query)
+
+    def read_input(self, args) -> Iterator[Tuple[str, Optional[str]]]:
+        if not args.file:
+
+            with self.stage("read"):
+                content = sys.stdin.read()
+            self.count("bytes_read", len(content.encode("utf-8")))
+            yield None, content
+            return
+
+        self.file_finder = self.create_file_finder(args)
+        prefilter = self.create_prefilter(args)
+        reader = ReadAheadReader(args.read_ahead_mb * 1024 * 1024)
+
+        file_paths = self.timed("walk", self.file_finder.find_files(args.file))
+        for file_path, future in reader.read(file_paths, self.can_skip_file):
+            # Files read ahead may become skippable while earlier ones are
+            # searched, so check again before waiting on them.
+            if future is None or self.can_skip_file(file_path):
+                if future is not None:
+                    future.cancel()
+                yield file_path, None
+                continue
+
+            try:
+                # Only the time spent waiting on a read counts here; reads
+                # that finished while earlier files were searched are free.
+                with self.stage("read"):
+                    data = future.result()
+                content = self.decode_file(data, prefilter)
+            except (IOError, UnicodeDecodeError) as e:
+                print(f"Error reading file {file_path}: {e}", file=sys.stderr)
+                continue
+            yield file_path, content
+
+    def read_file(
+        self, file_path: str, prefilter: Optional[TermPrefilter] = None
+    ) -> Optional[str]:
+
+        with self.stage("read"):
+            data = ReadAheadReader.read_file(file_path)
+        return self.decode_file(data, prefilter)
+
+    def decode_file(
+        self, data: bytes, prefilter: Optional[TermPrefilter] = None
+    ) -> Optional[str]:
+
+        self.count("files_read")
+        self.count("bytes_read", len(data))
+
+        if prefilter is not None:
+            with self.stage("prefilter"):
+                may_match = prefilter.may_match(data)
+            if not may_match:
+                self.count("files_prefiltered")
+                return None
+
+        with self.stage("decode"):
+            return data.decode("utf-8")
+
+    def search_text(
+        self,
+        file_path: Optional[str],
+        text: str,
+        query_terms: List[str],
+        window_size: int,
+        min_window: Optional[int] = None,
+        max_results: int = 5,
+    ) -> List[SearchMatch]:
+
+        cache_key = file_key(file_path) if file_path else None
+
+        with self.stage("match"):
+            if min_window is not None:
+                matches = list(
+                    self.search_strategy.search_window_sizes(
+                        text,
+                        query_terms,
+                        self.search_strategy.window_sizes(window_size, min_window),
+                        cache_key,
+                    )
+                )
+            else:
+                matches = list(
+                    self.search_strategy.search(
+                        text, query_terms, window_size, cache_key
+                    )
+                )
+        self.count("matches", len(matches))
+
+        for match in matches:
+            match.file_path = file_path
+
+        return self.rank_matches(matches, max_results)
+
+    def rank_matches(
+        self, matches: List[SearchMatch], max_results: int
+    ) -> List[SearchMatch]:
+
+        matches.sort(key=lambda x: (-x.score, x.start_pos))
+        return matches[:max_results]
+
+    def build_index(self, args):
+
+        self.file_finder = self.create_file_finder(args)
+
+        if args.update and os.path.exists(args.output):
+            index = self.load_index(args.output)
+            root = os.path.abspath(args.path)
+            moved = index.root != root
+            index.root = root
+            changes = index.diff(self.file_finder, args.hash)
+            # A refresh that finds nothing to do leaves the index file alone,
+            # and one that does appends only what changed.
+            if changes or changes.touched or moved:
+                index.save_changes(args.output, changes, args.hash)
+            index.close()
+            counts = changes.counts
+
+            print(
+                f"Updated {args.output}: {counts['added']} added, "
+                f"{counts['changed']} changed, {counts['removed']} removed, "
+                f"{counts['unchanged']} unchanged"
+            )
+            return
+
+        index = SearchIndex.build(args.path, self.file_finder, args.hash)
+        index.save(args.output)
+
+        print(
+            f"Indexed {len(index.files)} files ({len(index.postings)} terms) "
+            f"into {args.output}"
+        )
+
+    def serve(self, args):
+
+        if args.socket:
+            try:
+                is_socket = stat.S_ISSOCK(os.lstat(args.socket).st_mode)
+            except FileNotFoundError:
+                is_socket = None
+            if is_socket is False:
+                print(
+                    f"Error: {args.socket} exists and is not a socket", file=sys.stderr
+                )
+                sys.exit(1)
+            if is_socket:
+                # Left behind by a previous server that did not shut down cleanly.
+                os.unlink(args.socket)
+
+        self.file_finder = self.create_file_finder(args)
+
+        started = time.perf_counter()
+        service = SearchService(
+            args.roots, self.file_finder, args.hash, args.cache_mb * 1024 * 1024
+        )
+        status = service.status()
+        print(
+            f"Indexed {status['files']} files ({status['terms']} terms) in "
+            f"{time.perf_counter() - started:.2f}s",
+            file=sys.stderr,
+        )
+
+        if args.socket:
+            server = socketserver.ThreadingUnixStreamServer(
+                args.socket, SearchSocketHandler
+            )
+            address = args.socket
+        else:
+            server = ThreadingHTTPServer((args.host, args.port), SearchHTTPHandler)
+            address = f"http://{args.host}:{server.server_address[1]}"
+        server.daemon_threads = True
+        server.service = service
+
+        if args.poll_interval > 0:
+            service.start_watching(args.poll_interval)
+
+        print(f"Serving queries on {address}", file=sys.stderr)
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            service.close()
+            server.server_close()
+            if args.socket and os.path.exists(args.socket):
+                os.unlink(args.socket)
+
+    def load_index(self, index_path: str) -> SearchIndex:
+
+        try:
+            with self.stage("index_load"):
+                return SearchIndex.load(index_path)
+        except (IOError, struct.error, ValueError) as e:
+            print(f"Error loading index {index_path}: {e}", file=sys.stderr)
+            sys.exit(1)
+
+    def search_index(
+        self, index: SearchIndex, args
+    ) -> Iterator[Tuple[str, List[SearchMatch]]]:
+
+        if args.clauses is not None:
+            yield from self.search_index_query(index, args)
+            return
+
+        if args.scorer == "bm25":
+            normalized_terms = [term.lower() for term in args.query]
+            self.search_strategy.scorer = BM25Scorer(
+                CorpusStats.from_index(index, normalized_terms)
+            )
+
+        index_search = IndexSearch(index, self.search_strategy)
+        for file_path, matches in self.timed(
+            "index_search",
+            index_search.search(
+                args.query, args.window, args.min_window, self.collector
+            ),
+        ):
+            self.count("matches", len(matches))
+            yield file_path, self.rank_matches(matches, args.max_results)
+        self.files_skipped += index_search.files_skipped
+
+    def search_index_query(
+        self, index: SearchIndex, args
+    ) -> Iterator[Tuple[str, List[SearchMatch]]]:
+
+        executor = QueryExecutor(index, args.clauses)
+        if args.scorer == "bm25":
+            stats = CorpusStats.from_index(index, [])
+            stats.document_frequency = executor.document_frequency()
+            self.search_strategy.scorer = BM25Scorer(stats)
+
+        query_search = QuerySearch(executor, self.search_strategy)
+        for file_path, matches in self.timed(
+            "index_search",
+            query_search.search(args.window, args.min_window, self.collector),
+        ):
+            self.count("matches", len(matches))
+            yield file_path, self.rank_matches(matches, args.max_results)
+        self.files_skipped += query_search.files_skipped
+
+    def scan_files(self, args) -> Iterator[Tuple[Optional[str], List[SearchMatch]]]:
+
+        for file_path, content in self.read_input(args):
+            self.files_searched += 1
+            if content is None:
+                yield file_path, []
+                continue
+
+            yield file_path, self.search_text(
+                file_path,
+                content,
+                args.query,
+                args.window,
+                args.min_window,
+                args.max_results,
+            )
+
+    def stream_files(self, args) -> Iterator[Tuple[Optional[str], List[SearchMatch]]]:
+
+        streaming_search = StreamingWindowSearch(
+            args.query, args.window, self.create_prefilter(args)
+        )
+
+        if not args.file:
+            self.files_searched += 1
+            with self.stage("stream_search"):
+                matches = self.collect_matches(
+                    streaming_search.search_stream(sys.stdin.buffer),
+                    None,
+                    args.max_results,
+                )
+            yield None, matches
+            return
+
+        self.file_finder = self.create_file_finder(args)
+        for file_path in self.timed("walk", self.file_finder.find_files(args.file)):
+            if self.can_skip_file(file_path):
+                self.files_searched += 1
+                continue
+
+            try:
+                with self.stage("stream_search"):
+                    matches = self.collect_matches(
+                        streaming_search.search_file(file_path),
+                        file_path,
+                        args.max_results,
+                    )
+            except (IOError, ValueError) as e:
+                print(f"Error reading file {file_path}: {e}", file=sys.stderr)
+                continue
+
+            self.files_searched += 1
+            yield file_path, matches
+
+    def can_skip_file(self, file_path: str) -> bool:
+
+        if self.collector is None or not self.collector.can_skip(
+            self.score_bound, file_path
+        ):
+            return False
+
+        self.files_skipped += 1
+        return True
+
+    def collect_matches(
+        self, matches: Iterator[SearchMatch], file_path: Optional[str], max_results: int
+    ) -> List[SearchMatch]:
+
+        collector = MatchCollector(max_results)
+        for match in matches:
+            match.file_path = file_path
+            collector.add(match)
+        return collector.results()
+
+    def scan_files_parallel(
+        self, args
+    ) -> Iterator[Tuple[Optional[str], List[SearchMatch]]]:
+
+        self.file_finder = self.create_file_finder(args)
+
+        # Consumed by the pool's task thread while results are merged here.
+        file_paths = (
+            file_path
+            for file_path in self.timed("walk", self.file_finder.find_files(args.file))
+            if not self.can_skip_file(file_path)
+        )
+
+        with mp.Pool(
+            args.jobs, initializer=_init_search_worker, initargs=(args,)
+        ) as pool:
+            for file_path, matches, worker_stats in pool.imap_unordered(
+                _search_file_worker, file_paths, 16
+            ):
+                if worker_stats is not None and self.stats is not None:
+                    self.stats.merge(worker_stats)
+                if matches is None:
+                    continue
+                self.files_searched += 1
+                yield file_path, matches
+
+        self.files_searched += self.files_skipped
+
+    def run(self):
+
+        args = self.parse_args()
+
+        if args.command == "index":
+            self.build_index(args)
+            return
+        if args.command == "serve":
+            self.serve(args)
+            return
+
+        if args.stats and self.stats is None:
+            self.stats = PipelineStats()
+
+        profiler = None
+        if args.profile:
+            profiler = cProfile.Profile()
+            profiler.enable()
+        if args.tracemalloc:
+            tracemalloc.start()
+
+        try:
+            self.search(args)
+        finally:
+            if args.tracemalloc:
+                self.print_allocations(args.tracemalloc)
+            if profiler is not None:
+                profiler.disable()
+                profiler.dump_stats(args.profile)
+                print(f"\nWrote cProfile data to {args.profile}", file=sys.stderr)
+            if args.stats:
+                self.print_stats()
+
+    def print_stats(self):
+
+        self.count("files_searched", self.files_searched)
+        self.count("files_skipped_top_k", self.files_skipped)
+        print(f"\nPipeline stats:\n{self.stats.format()}", file=sys.stderr)
+
+    def print_allocations(self, limit: int):
+
+        snapshot = tracemalloc.take_snapshot().filter_traces(
+            [
+                tracemalloc.Filter(False, tracemalloc.__file__),
+                tracemalloc.Filter(False, cProfile.__file__),
+            ]
+        )
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        print(
+            f"\nTraced memory: {current / 1e6:.1f}MB current, {peak / 1e6:.1f}MB peak",
+            file=sys.stderr,
+        )
+        for statistic in snapshot.statistics("lineno")[:limit]:
+            print(f"  {statistic}", file=sys.stderr)
+
+    def search(self, args):
+
+        self.highlighter.use_color = not args.no_color
+        self.search_strategy = self.create_search_strategy(args)
+
+        self.collector = MatchCollector(args.max_results)
+        self.score_bound = self.search_strategy.scorer.upper_bound(
+            self.search_strategy.window_sizes(args.window, args.min_window)
+        )
+        self.files_searched = 0
+        self.files_skipped = 0
+        files_with_matches = 0
+
+        if args.index:
+            index = self.load_index(args.index)
+            self.files_searched = len(index.files)
+            results = self.search_index(index, args)
+        elif args.stream:
+            results = self.stream_files(args)
+        elif args.file and args.jobs > 1:
+            results = self.scan_files_parallel(args)
+        else:
+            results = self.scan_files(args)
+
+        for file_path, matches in results:
+            if matches:
+                files_with_matches += 1
+                with self.stage("rank"):
+                    self.collector.extend(matches)
+
+        files_searched = self.files_searched
+        all_matches = self.collector.results()
+
+        if not all_matches:
+            print(f"\nNo matches found in {files_searched} files searched.")
+            return
+
+        query_info = (
+            f"query: {args.expr}"
+            if args.expr is not None
+            else f"terms: {', '.join(args.query)}"
+        )
+        skipped_info = (
+            f" ({self.files_skipped} skipped as unable to reach the top results)"
+            if self.files_skipped
+            else ""
+        )
+        print(
+            f"\nFound {len(all_matches)} matches in {files_with_matches} of {files_searched} files "
+            f"for {query_info}{skipped_info}"
+        )
+        for match in all_matches:
+            with self.stage("highlight"):
+                output = self.highlighter.format_match(match, args.query or [])
+            print(output)
+
+
+_worker_state = {}
+
+
+def _init_search_worker(args):
+    _worker_state["cli"] = WindowSearchCLI(PipelineStats() if args.stats else None)
+    _worker_state["cli"].search_strategy = _worker_state["cli"].create_search_strategy(
+        args
+    )
+    _worker_state["args"] = args
+    _worker_state["prefilter"] = _worker_state["cli"].create_prefilter(args)
+
+
+def _search_file_worker(
+    file_path: str,
+) -> Tuple[str, Optional[List[SearchMatch]], Optional[Dict[str, Any]]]:
+    cli = _worker_state["cli"]
+    args = _worker_state["args"]
+
+    matches = None
+    try:
+        content = cli.read_file(file_path, _worker_state["prefilter"])
+        if content is None:
+            matches = []
+        else:
+            matches = cli.search_text(
+                file_path,
+                content,
+                args.query,
+                args.window,
+                args.min_window,
+                args.max_results,
+            )
+    except (IOError, UnicodeDecodeError) as e:
+        print(f"Error reading file {file_path}: {e}", file=sys.stderr)
+
+    # Ship this file's figures back with its matches so the parent can total
+    # them; workers have no hook that runs when the pool shuts down.
+    worker_stats = None
+    if cli.stats is not None:
+        worker_stats = cli.stats.to_dict()
+        cli.stats.reset()
+
+    return file_path, matches, worker_stats
+
+
+def main():
+    cli = WindowSearchCLI()
+    cli.run()
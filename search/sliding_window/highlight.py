@@ -0,0 +1,83 @@
+from typing import List, Tuple
+
+from .tokens import FastTokenizer
+from .matches import SearchMatch
+
+
+class TextHighlighter:
+
+    def __init__(self, use_color: bool = True):
+        self.use_color = use_color
+        self.tokenizer = FastTokenizer(use_cache=False)
+
+    def highlight_match(self, match: SearchMatch, query_terms: List[str]) -> str:
+
+        if not self.use_color:
+            return match.text
+
+        spans = match.highlights
+        if spans is None:
+            spans = self.find_highlights(match.text, query_terms)
+
+        parts = []
+        last_end = 0
+        for start, end in spans:
+            if end <= last_end:
+                continue
+            start = max(start, last_end)
+            parts.append(match.text[last_end:start])
+            parts.append(f"\033[1;33m{match.text[start:end]}\033[0m")
+            last_end = end
+        parts.append(match.text[last_end:])
+
+        return "".join(parts)
+
+    def find_highlights(
+        self, text: str, query_terms: List[str]
+    ) -> List[Tuple[int, int]]:
+
+        tokens = self.tokenizer.tokenize(text)
+        query_ids = {
+            self.tokenizer.dictionary.lookup(term.lower()) for term in query_terms
+        }
+        query_ids.discard(None)
+
+        return [
+            (start, end)
+            for term_id, start, end in zip(tokens.term_ids, tokens.starts, tokens.ends)
+            if term_id in query_ids
+        ]
+
+    def format_match(
+        self, match: SearchMatch, query_terms: List[str], show_position: bool = True
+    ) -> str:
+
+        highlighted_text = self.highlight_match(match, query_terms)
+
+        header = f"\n{'=' * 80}\n"
+        file_info = f"File: {match.file_path}\n" if match.file_path else ""
+        if show_position:
+            span_info = (
+                f" | Minimal Span: {match.span_length} tokens "
+                f"({'bytes' if match.byte_offsets else 'characters'} "
+                f"{match.span_start}-{match.span_end})"
+                if match.span_length is not None
+                else ""
+            )
+            sizes_info = (
+                f" (fits windows {match.window_sizes[0]}-{match.window_sizes[-1]})"
+                if match.window_sizes
+                else ""
+            )
+            unit = "bytes" if match.byte_offsets else "characters"
+            header += (
+                f"{file_info}"
+                f"Window Size: {match.window_size} tokens{sizes_info} | "
+                f"Position: {unit} {match.start_pos}-{match.end_pos} | "
+                f"Score: {match.score:.3f}{span_info}\n"
+            )
+        else:
+            header += f"{file_info}Window Size: {match.window_size} tokens\n"
+        header += f"{'-' * 80}\n"
+
+        return f"{header}{highlighted_text}\n"
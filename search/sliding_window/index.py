@@ -0,0 +1,528 @@
+import hashlib
+import sys
+from dataclasses import dataclass, field, replace
+import os
+from typing import List, Tuple, Dict, Iterator, Optional, Sequence, Set
+from collections import defaultdict
+
+from .cache import file_key
+from .tokens import FastTokenizer
+from .matches import MatchCollector, SearchMatch
+from .walk import FileFinder
+from .strategies import SlidingWindowSearch
+from .vocabulary import TermVocabulary
+from .postings import IndexedFile, PackedPostings
+
+
+DEFAULT_INDEX_PATH = ".sliding_window_index"
+
+
+@dataclass
+class IndexChanges:
+
+    modified: List[Tuple[str, os.stat_result, Optional[int]]] = field(
+        default_factory=list
+    )
+    removed: List[int] = field(default_factory=list)
+    # Unchanged files whose mtime moved; only their manifest entry changes.
+    touched: List[int] = field(default_factory=list)
+    counts: Dict[str, int] = field(
+        default_factory=lambda: {"added": 0, "changed": 0, "removed": 0, "unchanged": 0}
+    )
+
+    def __bool__(self) -> bool:
+        return bool(self.modified or self.removed)
+
+
+class SearchIndex:
+
+    FORMAT_VERSION = 5
+    # Updates append a segment to the index file; once there are this many,
+    # or removed files outnumber live ones, the next update rewrites it.
+    MAX_SEGMENTS = 16
+
+    def __init__(self, root: Optional[str] = None):
+        self.root = root
+        self.files: Dict[int, IndexedFile] = {}
+        self.postings: Dict[str, Dict[int, List[int]]] = {}
+        self.packed: Optional[PackedPostings] = None
+        self.next_file_id = 0
+        self.tokenizer = FastTokenizer(use_cache=False)
+        self._vocabulary: Optional[TermVocabulary] = None
+
+    @classmethod
+    def build(
+        cls, root: str, file_finder: FileFinder, use_hash: bool = False
+    ) -> "SearchIndex":
+        index = cls(os.path.abspath(root))
+        for file_path, stat in file_finder.find_file_stats(index.root):
+            index.add_file(file_path, use_hash, stat)
+        return index
+
+    def add_file(
+        self,
+        file_path: str,
+        use_hash: bool = False,
+        stat: Optional[os.stat_result] = None,
+    ) -> Optional[int]:
+        try:
+            if stat is None:
+                stat = os.stat(file_path)
+            with open(file_path, "rb") as f:
+                data = f.read()
+            text = data.decode("utf-8")
+        except (IOError, UnicodeDecodeError) as e:
+            print(f"Error reading file {file_path}: {e}", file=sys.stderr)
+            return None
+
+        tokens = self.tokenizer.tokenize(text)
+
+        self.unpack()
+        file_id = self.next_file_id
+        self.next_file_id += 1
+
+        id_positions = defaultdict(list)
+        for i, term_id in enumerate(tokens.term_ids):
+            id_positions[term_id].append(i)
+
+        self._vocabulary = None
+        terms = []
+        for term_id, positions in id_positions.items():
+            term = tokens.dictionary[term_id]
+            self.postings.setdefault(term, {})[file_id] = positions
+            terms.append(term)
+
+        self.files[file_id] = IndexedFile(
+            file_path,
+            stat.st_mtime_ns,
+            stat.st_size,
+            len(tokens),
+            tokens.starts,
+            tokens.ends,
+            terms,
+            hashlib.sha256(data).hexdigest() if use_hash else None,
+        )
+        return file_id
+
+    def remove_file(self, file_id: int):
+        self.unpack()
+        indexed = self.files.pop(file_id)
+        self._vocabulary = None
+        for term in indexed.terms:
+            postings = self.postings.get(term)
+            if postings is None:
+                continue
+            postings.pop(file_id, None)
+            if not postings:
+                del self.postings[term]
+
+    def update(
+        self, file_finder: FileFinder, use_hash: bool = False
+    ) -> Dict[str, int]:
+        changes = self.diff(file_finder, use_hash)
+        self.apply(changes, use_hash)
+        return changes.counts
+
+    def diff(self, file_finder: FileFinder, use_hash: bool = False) -> "IndexChanges":
+        changes = IndexChanges()
+        counts = changes.counts
+        manifest = {indexed.path: file_id for file_id, indexed in self.files.items()}
+        seen = set()
+
+        for file_path, stat in file_finder.find_file_stats(self.root):
+            seen.add(file_path)
+            file_id = manifest.get(file_path)
+
+            if file_id is not None:
+                mtime_ns = self.files[file_id].mtime_ns
+                if not self._has_changed(file_id, use_hash, stat):
+                    counts["unchanged"] += 1
+                    if self.files[file_id].mtime_ns != mtime_ns:
+                        changes.touched.append(file_id)
+                    continue
+                counts["changed"] += 1
+            else:
+                counts["added"] += 1
+
+            changes.modified.append((file_path, stat, file_id))
+
+        for file_path, file_id in manifest.items():
+            if file_path not in seen:
+                changes.removed.append(file_id)
+                counts["removed"] += 1
+
+        return changes
+
+    def copy(self) -> "SearchIndex":
+        # Shares position lists, which are replaced rather than mutated, but
+        # not the dicts that add_file and remove_file change.
+        index = SearchIndex(self.root)
+        for file_id in self.files:
+            self.token_offsets(file_id)
+            self.file_terms(file_id)
+        index.files = {
+            file_id: replace(indexed) for file_id, indexed in self.files.items()
+        }
+        index.postings = {
+            term: dict(postings) for term, postings in self.postings.items()
+        }
+        index.next_file_id = self.next_file_id
+        return index
+
+    def apply(self, changes: "IndexChanges", use_hash: bool = False):
+        # The dictionary keeps every term it ever interned, including those
+        # of removed files, so each change set starts a new generation.
+        self.tokenizer = FastTokenizer(use_cache=False)
+        for file_path, stat, file_id in changes.modified:
+            keep_hash = self._keeps_hash(file_id, use_hash)
+            if file_id is not None:
+                self.remove_file(file_id)
+            self.add_file(file_path, keep_hash, stat)
+
+        for file_id in changes.removed:
+            self.remove_file(file_id)
+
+    def _keeps_hash(self, file_id: Optional[int], use_hash: bool) -> bool:
+        # Files hashed by an earlier --hash run stay hashed, so a later
+        # --hash update can still skip them when they are only touched.
+        if file_id is None:
+            return use_hash
+        return use_hash or self.files[file_id].digest is not None
+
+    def _has_changed(
+        self, file_id: int, use_hash: bool, stat: Optional[os.stat_result] = None
+    ) -> bool:
+        indexed = self.files[file_id]
+        if stat is None:
+            try:
+                stat = os.stat(indexed.path)
+            except OSError:
+                return True
+
+        if stat.st_mtime_ns == indexed.mtime_ns and stat.st_size == indexed.size:
+            return False
+
+        if not use_hash or indexed.digest is None or stat.st_size != indexed.size:
+            return True
+
+        sha256_hash = hashlib.sha256()
+        try:
+            with open(indexed.path, "rb") as f:
+                for block in iter(lambda: f.read(1 << 20), b""):
+                    sha256_hash.update(block)
+        except IOError:
+            return True
+
+        if sha256_hash.hexdigest() != indexed.digest:
+            return True
+
+        indexed.mtime_ns = stat.st_mtime_ns
+        return False
+
+    def candidate_files(self, normalized_terms: List[str]) -> List[int]:
+
+        term_postings = [self.postings.get(term, {}) for term in normalized_terms]
+        if not term_postings or not all(term_postings):
+            return []
+
+        term_postings.sort(key=len)
+        candidates = set(term_postings[0])
+        for postings in term_postings[1:]:
+            candidates.intersection_update(postings)
+        return sorted(candidates)
+
+    def vocabulary(self) -> TermVocabulary:
+
+        if self._vocabulary is None:
+            self._vocabulary = TermVocabulary(self.postings)
+        return self._vocabulary
+
+    def term_positions(
+        self, file_id: int, normalized_terms: List[str]
+    ) -> Dict[str, List[int]]:
+
+        return {term: self.postings[term][file_id] for term in normalized_terms}
+
+    def token_offsets(self, file_id: int) -> Tuple[Sequence[int], Sequence[int]]:
+
+        indexed = self.files[file_id]
+        if indexed.starts is None:
+            indexed.starts, indexed.ends = self.packed.file_block(indexed.block)
+        return indexed.starts, indexed.ends
+
+    def file_terms(self, file_id: int) -> List[str]:
+
+        indexed = self.files[file_id]
+        if indexed.terms is None:
+            indexed.terms = self.packed.file_terms(indexed.block)
+        return indexed.terms
+
+    def unpack(self):
+        # Mutations need plain dicts, so decode whatever is still packed and
+        # release the mapping before the index file can be replaced.
+        packed = self.packed
+        if packed is None:
+            return
+        self.postings = packed.decode_all()
+        for file_id in self.files:
+            self.token_offsets(file_id)
+            self.file_terms(file_id)
+        self.packed = None
+        packed.close()
+
+    def close(self):
+
+        if self.packed is not None:
+            self.packed.close()
+            self.packed = None
+            self.postings = {}
+
+    def is_stale(self, file_id: int) -> bool:
+
+        indexed = self.files[file_id]
+        try:
+            stat = os.stat(indexed.path)
+        except OSError:
+            return True
+        return stat.st_mtime_ns != indexed.mtime_ns or stat.st_size != indexed.size
+
+    def stale_files(self) -> Set[int]:
+        # Files changed on disk since they were indexed; deleted files are
+        # left out since they cannot match.
+        stale = set()
+        for file_id, indexed in self.files.items():
+            try:
+                stat = os.stat(indexed.path)
+            except OSError:
+                continue
+            if stat.st_mtime_ns != indexed.mtime_ns or stat.st_size != indexed.size:
+                stale.add(file_id)
+        return stale
+
+    def save(self, index_path: str):
+        self.unpack()
+        metadata = {"root": self.root, "next_file_id": self.next_file_id}
+        tmp_path = f"{index_path}.tmp"
+        with open(tmp_path, "wb") as f:
+            PackedPostings.write(
+                f, metadata, self.files, self.postings, self.FORMAT_VERSION
+            )
+        os.replace(tmp_path, index_path)
+
+    def save_changes(
+        self, index_path: str, changes: IndexChanges, use_hash: bool = False
+    ):
+        packed = self.packed
+        removed = len(changes.removed) + len(changes.modified)
+        if (
+            packed is None
+            or os.path.abspath(packed.path) != os.path.abspath(index_path)
+            or len(packed.segments) >= self.MAX_SEGMENTS
+            or len(packed.removed) + removed > len(self.files)
+        ):
+            self.apply(changes, use_hash)
+            self.save(index_path)
+            return
+
+        # Tokenize only the added and changed files, into an index of their
+        # own, and append it with the ids it replaces or drops.
+        delta = SearchIndex(self.root)
+        delta.next_file_id = self.next_file_id
+        removed_ids = list(changes.removed)
+        for file_path, stat, file_id in changes.modified:
+            if file_id is not None:
+                removed_ids.append(file_id)
+            delta.add_file(file_path, self._keeps_hash(file_id, use_hash), stat)
+        files = {file_id: self.files[file_id] for file_id in changes.touched}
+        files.update(delta.files)
+        metadata = {
+            "root": self.root,
+            "next_file_id": delta.next_file_id,
+            "removed": removed_ids,
+        }
+
+        with open(index_path, "r+b") as f:
+            # Drop whatever an interrupted update left after the last segment.
+            f.truncate(packed.end)
+            f.seek(packed.end)
+            PackedPostings.write(
+                f, metadata, files, delta.postings, self.FORMAT_VERSION, packed
+            )
+
+        self.close()
+        index = self.load(index_path)
+        self.files = index.files
+        self.postings = index.postings
+        self.packed = index.packed
+        self.next_file_id = index.next_file_id
+        self._vocabulary = None
+
+    @classmethod
+    def load(cls, index_path: str) -> "SearchIndex":
+        with open(index_path, "rb") as f:
+            magic = f.read(len(PackedPostings.MAGIC))
+        if magic != PackedPostings.MAGIC:
+            raise ValueError(
+                f"{index_path} is not a search index or was built by an older "
+                f"version; rebuild it with the index command"
+            )
+
+        packed = PackedPostings(index_path)
+        if packed.version != cls.FORMAT_VERSION:
+            packed.close()
+            raise ValueError(
+                f"Unsupported index format version {packed.version} in {index_path}"
+            )
+
+        metadata = packed.metadata()
+        index = cls(metadata["root"])
+        index.files = metadata["files"]
+        index.postings = packed
+        index.packed = packed
+        index.next_file_id = metadata["next_file_id"]
+        return index
+
+
+class IndexSearch:
+
+    def __init__(self, index: SearchIndex, search_strategy: SlidingWindowSearch):
+        self.index = index
+        self.search_strategy = search_strategy
+        self.files_skipped = 0
+
+    def search_file(
+        self,
+        file_id: int,
+        query_terms: List[str],
+        window_size: int,
+        min_window: Optional[int] = None,
+    ) -> List[SearchMatch]:
+        indexed = self.index.files[file_id]
+        if self.index.is_stale(file_id):
+            return self.search_changed_file(
+                indexed.path, query_terms, window_size, min_window
+            )
+
+        normalized_terms = [term.lower() for term in query_terms]
+        term_positions = self.index.term_positions(file_id, normalized_terms)
+
+        if min_window is not None:
+            windows = list(
+                self.search_strategy.find_windows_for_sizes(
+                    term_positions,
+                    normalized_terms,
+                    indexed.token_count,
+                    self.search_strategy.window_sizes(window_size, min_window),
+                )
+            )
+        else:
+            windows = [
+                (window_size, window)
+                for window in self.search_strategy.find_windows(
+                    term_positions, normalized_terms, indexed.token_count, window_size
+                )
+            ]
+        if not windows:
+            return []
+
+        try:
+            with open(indexed.path, "r", encoding="utf-8") as f:
+                text = f.read()
+        except (IOError, UnicodeDecodeError) as e:
+            print(f"Error reading file {indexed.path}: {e}", file=sys.stderr)
+            return []
+
+        starts, ends = self.index.token_offsets(file_id)
+        return self.search_strategy.build_matches(
+            text,
+            starts,
+            ends,
+            windows,
+            term_positions,
+            normalized_terms,
+            indexed.token_count,
+            indexed.path,
+        )
+
+    def search_changed_file(
+        self,
+        file_path: str,
+        query_terms: List[str],
+        window_size: int,
+        min_window: Optional[int] = None,
+    ) -> List[SearchMatch]:
+        print(
+            f"Warning: {file_path} changed since it was indexed, "
+            f"searching its current contents",
+            file=sys.stderr,
+        )
+        try:
+            with open(file_path, "r", encoding="utf-8") as f:
+                text = f.read()
+        except (IOError, UnicodeDecodeError) as e:
+            print(f"Error reading file {file_path}: {e}", file=sys.stderr)
+            return []
+
+        cache_key = file_key(file_path)
+        if min_window is not None:
+            matches = list(
+                self.search_strategy.search_window_sizes(
+                    text,
+                    query_terms,
+                    self.search_strategy.window_sizes(window_size, min_window),
+                    cache_key,
+                )
+            )
+        else:
+            matches = list(
+                self.search_strategy.search(text, query_terms, window_size, cache_key)
+            )
+        for match in matches:
+            match.file_path = file_path
+        return matches
+
+    def search(
+        self,
+        query_terms: List[str],
+        window_size: int,
+        min_window: Optional[int] = None,
+        collector: Optional[MatchCollector] = None,
+    ) -> Iterator[Tuple[str, List[SearchMatch]]]:
+        normalized_terms = [term.lower() for term in query_terms]
+        terms = list(dict.fromkeys(normalized_terms))
+        window_sizes = self.search_strategy.window_sizes(window_size, min_window)
+        scorer = self.search_strategy.scorer
+
+        # Files edited since indexing may now contain the terms whatever their
+        # old postings say, so they are searched too.
+        stale = self.index.stale_files()
+        candidates = []
+        for file_id in stale.union(self.index.candidate_files(normalized_terms)):
+            indexed = self.index.files[file_id]
+            if file_id in stale:
+                # Nothing bounds what the current contents score.
+                bound = float("inf")
+            else:
+                term_counts = {
+                    term: len(positions)
+                    for term, positions in self.index.term_positions(
+                        file_id, terms
+                    ).items()
+                }
+                bound = scorer.upper_bound(
+                    window_sizes, term_counts, indexed.token_count
+                )
+            candidates.append((-bound, indexed.path, file_id))
+
+        # Best bounds first, so once one file cannot make the top k none of
+        # the remaining ones can either.
+        candidates.sort()
+
+        for i, (neg_bound, file_path, file_id) in enumerate(candidates):
+            if collector is not None and collector.can_skip(-neg_bound, file_path):
+                self.files_skipped = len(candidates) - i
+                break
+
+            matches = self.search_file(file_id, query_terms, window_size, min_window)
+            if matches:
+                yield file_path, matches
@@ -0,0 +1,106 @@
+import heapq
+import threading
+from dataclasses import dataclass
+from typing import List, Tuple, Optional, Sequence
+
+
+@dataclass
+class SearchMatch:
+
+    window_size: int
+    start_pos: int
+    end_pos: int
+    text: str
+    score: float = 0.0
+    file_path: Optional[str] = None
+    span_start: Optional[int] = None
+    span_end: Optional[int] = None
+    span_length: Optional[int] = None
+    window_sizes: Optional[List[int]] = None
+    byte_offsets: bool = False
+    highlights: Optional[List[Tuple[int, int]]] = None
+
+
+@dataclass
+class TokenWindow:
+
+    first: int
+    last: int
+    span_first: Optional[int] = None
+    span_last: Optional[int] = None
+    window_sizes: Optional[List[int]] = None
+
+    def to_match(
+        self,
+        text: str,
+        starts: Sequence[int],
+        ends: Sequence[int],
+        window_size: int,
+        file_path: Optional[str] = None,
+        score: Optional[float] = None,
+    ) -> SearchMatch:
+        start_pos = starts[self.first]
+        end_pos = ends[self.last]
+        match = SearchMatch(
+            window_size,
+            start_pos,
+            end_pos,
+            text[start_pos:end_pos],
+            1.0 / window_size if score is None else score,
+            file_path,
+        )
+
+        if self.span_first is not None:
+            match.span_start = starts[self.span_first]
+            match.span_end = ends[self.span_last]
+            match.span_length = self.span_last - self.span_first + 1
+
+        match.window_sizes = self.window_sizes
+        return match
+
+
+class MatchCollector:
+
+    def __init__(self, max_results: int):
+        self.max_results = max_results
+        self.heap: List["_RankedMatch"] = []
+        self.lock = threading.Lock()
+
+    def add(self, match: SearchMatch):
+        if self.max_results <= 0:
+            return
+
+        entry = _RankedMatch(match)
+        with self.lock:
+            if len(self.heap) < self.max_results:
+                heapq.heappush(self.heap, entry)
+            elif entry.key < self.heap[0].key:
+                heapq.heapreplace(self.heap, entry)
+
+    def can_skip(self, score_bound: float, file_path: Optional[str]) -> bool:
+        if self.max_results <= 0:
+            return True
+
+        best_key = (-score_bound, file_path or "", 0)
+        with self.lock:
+            return len(self.heap) == self.max_results and best_key >= self.heap[0].key
+
+    def extend(self, matches: List[SearchMatch]):
+        for match in matches:
+            self.add(match)
+
+    def results(self) -> List[SearchMatch]:
+        return [entry.match for entry in sorted(self.heap, key=lambda e: e.key)]
+
+
+class _RankedMatch:
+
+    __slots__ = ("key", "match")
+
+    def __init__(self, match: SearchMatch):
+        self.key = (-match.score, match.file_path or "", match.start_pos)
+        self.match = match
+
+    def __lt__(self, other: "_RankedMatch") -> bool:
+        # Inverted so the heap root is the worst match kept so far.
+        return self.key > other.key
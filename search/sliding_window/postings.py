@@ -0,0 +1,444 @@
+import bisect
+import heapq
+import json
+import itertools
+import mmap
+import operator
+import sys
+from array import array
+from dataclasses import dataclass
+import struct
+from typing import (
+    Any,
+    BinaryIO,
+    List,
+    Tuple,
+    Dict,
+    Iterator,
+    Optional,
+    Sequence,
+    Set,
+)
+from collections.abc import Mapping
+
+
+# Array typecodes indexed by the number of bytes a value needs.
+PACKED_TYPECODES = "BBHIIQQQQ"
+
+
+@dataclass
+class IndexedFile:
+
+    path: str
+    mtime_ns: int
+    size: int
+    token_count: int
+    starts: Optional[Sequence[int]]
+    ends: Optional[Sequence[int]]
+    terms: Optional[List[str]]
+    digest: Optional[str] = None
+    block: Optional[int] = None
+
+
+def write_varint(out: bytearray, value: int):
+    while value >= 0x80:
+        out.append(value & 0x7F | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def read_varint(data: bytes, pos: int) -> Tuple[int, int]:
+    result = shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        result |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return result, pos
+        shift += 7
+
+
+def little_endian(values: array) -> array:
+    if sys.byteorder == "big":
+        values.byteswap()
+    return values
+
+
+def pack_values(out: bytearray, values: Sequence[int], delta: bool = True):
+    # Each run is stored at the narrowest fixed width that fits its largest
+    # (delta) value, so decoding stays a single array copy plus accumulate.
+    if delta and len(values) > 1:
+        values = list(map(operator.sub, values, itertools.chain((0,), values)))
+    typecode = PACKED_TYPECODES[max(values, default=0).bit_length() + 7 >> 3]
+    out.append(ord(typecode))
+    out += little_endian(array(typecode, values))
+
+
+def unpack_values(
+    data: bytes, pos: int, count: int, delta: bool = True
+) -> Tuple[Sequence[int], int]:
+    values = array(chr(data[pos]))
+    end = pos + 1 + count * values.itemsize
+    values.frombytes(data[pos + 1 : end])
+    little_endian(values)
+    return (itertools.accumulate(values) if delta else values), end
+
+
+def skip_values(data: bytes, pos: int, count: int) -> int:
+    return pos + 1 + count * array(chr(data[pos])).itemsize
+
+
+class PackedSegment:
+
+    def __init__(self, buffer: mmap.mmap, start: int):
+        self.buffer = buffer
+        self.start = start
+        (
+            magic,
+            self.version,
+            self.term_count,
+            meta_offset,
+            dictionary_offset,
+            blob_offset,
+            postings_offset,
+            files_offset,
+            self.length,
+        ) = PackedPostings.HEADER.unpack_from(buffer, start)
+        if magic != PackedPostings.MAGIC or not 0 < self.length <= len(buffer) - start:
+            raise ValueError(f"incomplete index segment at offset {start}")
+        self.meta_offset = start + meta_offset
+        self.dictionary_offset = start + dictionary_offset
+        self.blob_offset = start + blob_offset
+        self.postings_offset = start + postings_offset
+        self.files_offset = start + files_offset
+        table_bytes = (self.term_count + 1) * 8
+        self.term_offsets = self.table(self.dictionary_offset, table_bytes)
+        self.postings_offsets = self.table(
+            self.dictionary_offset + table_bytes, table_bytes
+        )
+
+    def table(self, offset: int, length: int) -> Sequence[int]:
+        if sys.byteorder == "little":
+            return memoryview(self.buffer)[offset : offset + length].cast("Q")
+        return little_endian(array("Q", self.buffer[offset : offset + length]))
+
+    def metadata(self) -> Dict[str, Any]:
+        return json.loads(self.buffer[self.meta_offset : self.dictionary_offset])
+
+    def term_bytes(self, term_id: int) -> bytes:
+        start = self.blob_offset + self.term_offsets[term_id]
+        end = self.blob_offset + self.term_offsets[term_id + 1]
+        return self.buffer[start:end]
+
+    def term_id(self, term: str) -> Optional[int]:
+        # UTF-8 byte order matches code point order, so the dictionary can
+        # be searched without decoding the terms it compares against.
+        key = term.encode("utf-8")
+        low, high = 0, self.term_count
+        while low < high:
+            middle = (low + high) // 2
+            if self.term_bytes(middle) < key:
+                low = middle + 1
+            else:
+                high = middle
+        if low < self.term_count and self.term_bytes(low) == key:
+            return low
+        return None
+
+    def term(self, term_id: int) -> str:
+        return self.term_bytes(term_id).decode("utf-8")
+
+    def __iter__(self) -> Iterator[str]:
+        for term_id in range(self.term_count):
+            yield self.term(term_id)
+
+    def decode(self, term_id: int) -> Dict[int, List[int]]:
+        start = self.postings_offset + self.postings_offsets[term_id]
+        end = self.postings_offset + self.postings_offsets[term_id + 1]
+        data = self.buffer[start:end]
+        count, pos = read_varint(data, 0)
+        postings = {}
+        file_id = 0
+        for _ in range(count):
+            file_delta, pos = read_varint(data, pos)
+            file_id += file_delta
+            length, pos = read_varint(data, pos)
+            positions, pos = unpack_values(data, pos, length)
+            postings[file_id] = list(positions)
+        return postings
+
+    def close(self):
+        for table in (self.term_offsets, self.postings_offsets):
+            if isinstance(table, memoryview):
+                table.release()
+
+
+class PackedPostings(Mapping):
+
+    MAGIC = b"SWIX"
+    HEADER = struct.Struct("<4sIQQQQQQQ")
+
+    def __init__(self, index_path: str):
+        self.path = index_path
+        with open(index_path, "rb") as f:
+            self.buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        # A full write leaves one segment; each update appends another with
+        # the postings of the files it added and the ids of those it dropped.
+        self.segments: List[PackedSegment] = []
+        self.end = 0
+        while self.end + self.HEADER.size <= len(self.buffer):
+            try:
+                segment = PackedSegment(self.buffer, self.end)
+            except ValueError:
+                # Left by an interrupted update; the next one writes over it.
+                break
+            self.segments.append(segment)
+            self.end += segment.length
+        self.version = self.segments[0].version if self.segments else 0
+        self.segment_starts = [segment.start for segment in self.segments]
+
+        # Filled in by metadata(), once the caller has checked the version.
+        self.removed: Set[int] = set()
+        self.removed_blocks: List[int] = []
+        self.decoded: Dict[str, Dict[int, List[int]]] = {}
+        self._dead_terms: Optional[Set[str]] = None
+        self._length: Optional[int] = None
+
+    def metadata(self) -> Dict[str, Any]:
+        # Later segments replace and remove the entries of earlier ones.
+        files: Dict[int, IndexedFile] = {}
+        self.removed = set()
+        self.removed_blocks = []
+        for segment in self.segments:
+            metadata = segment.metadata()
+            for file_id in metadata.get("removed", ()):
+                self.removed.add(file_id)
+                indexed = files.pop(file_id, None)
+                if indexed is not None:
+                    self.removed_blocks.append(indexed.block)
+            for entry in metadata["files"]:
+                (file_id, path, mtime_ns, size, token_count, digest, number, block) = (
+                    entry
+                )
+                files[file_id] = IndexedFile(
+                    path,
+                    mtime_ns,
+                    size,
+                    token_count,
+                    None,
+                    None,
+                    None,
+                    digest,
+                    self.segments[number].files_offset + block,
+                )
+        metadata["files"] = files
+        metadata.pop("removed", None)
+        return metadata
+
+    def segment_at(self, offset: int) -> int:
+        return bisect.bisect_right(self.segment_starts, offset) - 1
+
+    def __getitem__(self, term: str) -> Dict[int, List[int]]:
+        postings = self.decoded.get(term)
+        if postings is not None:
+            return postings
+
+        postings = {}
+        for segment in self.segments:
+            term_id = segment.term_id(term)
+            if term_id is not None:
+                postings.update(segment.decode(term_id))
+        if self.removed:
+            postings = {
+                file_id: positions
+                for file_id, positions in postings.items()
+                if file_id not in self.removed
+            }
+        if not postings:
+            raise KeyError(term)
+
+        self.decoded[term] = postings
+        return postings
+
+    def decode_all(self) -> Dict[str, Dict[int, List[int]]]:
+        postings: Dict[str, Dict[int, List[int]]] = {}
+        for segment in self.segments:
+            for term_id in range(segment.term_count):
+                decoded = segment.decode(term_id)
+                for file_id in self.removed.intersection(decoded):
+                    del decoded[file_id]
+                if decoded:
+                    postings.setdefault(segment.term(term_id), {}).update(decoded)
+        return postings
+
+    def dead_terms(self) -> Set[str]:
+        # Terms left only in the postings of removed files; just their terms
+        # need checking, so this costs as much as the removals did.
+        if self._dead_terms is None:
+            candidates = set()
+            for block in self.removed_blocks:
+                candidates.update(self.file_terms(block))
+            self._dead_terms = {term for term in candidates if term not in self}
+        return self._dead_terms
+
+    def __contains__(self, term: object) -> bool:
+        if term in self.decoded:
+            return True
+        if not isinstance(term, str):
+            return False
+        if self.removed:
+            return self.get(term) is not None
+        return any(segment.term_id(term) is not None for segment in self.segments)
+
+    def __iter__(self) -> Iterator[str]:
+        if len(self.segments) == 1:
+            yield from self.segments[0]
+            return
+        dead = self.dead_terms()
+        for term, _ in itertools.groupby(heapq.merge(*self.segments)):
+            if term not in dead:
+                yield term
+
+    def __len__(self) -> int:
+        if len(self.segments) == 1:
+            return self.segments[0].term_count
+        if self._length is None:
+            self._length = sum(1 for _ in self)
+        return self._length
+
+    def file_block(self, offset: int) -> Tuple[Sequence[int], Sequence[int]]:
+        data = self.buffer
+        count, pos = read_varint(data, offset)
+        starts, pos = unpack_values(data, pos, count)
+        starts = array("Q", starts)
+        lengths, pos = unpack_values(data, pos, count, delta=False)
+        ends = array("Q", map(operator.add, starts, lengths))
+        return starts, ends
+
+    def file_terms(self, offset: int) -> List[str]:
+        # Only changing the index needs a file's terms, so queries never
+        # decode them. Term ids refer to the segment the block is in.
+        segment = self.segments[self.segment_at(offset)]
+        data = self.buffer
+        count, pos = read_varint(data, offset)
+        pos = skip_values(data, skip_values(data, pos, count), count)
+        term_count, pos = read_varint(data, pos)
+        term_ids, _ = unpack_values(data, pos, term_count)
+        return [segment.term(term_id) for term_id in term_ids]
+
+    def close(self):
+        for segment in self.segments:
+            segment.close()
+        self.buffer.close()
+
+    @classmethod
+    def write(
+        cls,
+        f: BinaryIO,
+        metadata: Dict[str, Any],
+        files: Dict[int, IndexedFile],
+        postings: Dict[str, Dict[int, List[int]]],
+        version: int,
+        packed: Optional["PackedPostings"] = None,
+    ):
+        # Writes one segment at the current position. With packed, the
+        # segment is appended to that index: files that already have a block
+        # in it keep that block and only their manifest entry is written.
+        number = len(packed.segments) if packed is not None else 0
+        terms = sorted(postings)
+        term_ids = {term: term_id for term_id, term in enumerate(terms)}
+
+        blob = bytearray()
+        term_offsets = array("Q", [0])
+        for term in terms:
+            blob += term.encode("utf-8")
+            term_offsets.append(len(blob))
+
+        postings_data = bytearray()
+        postings_offsets = array("Q", [0])
+        for term in terms:
+            file_postings = postings[term]
+            write_varint(postings_data, len(file_postings))
+            previous = 0
+            for file_id in sorted(file_postings):
+                positions = file_postings[file_id]
+                write_varint(postings_data, file_id - previous)
+                write_varint(postings_data, len(positions))
+                pack_values(postings_data, positions)
+                previous = file_id
+            postings_offsets.append(len(postings_data))
+
+        # File metadata is stored as JSON, so loading an index never runs
+        # code from the file.
+        files_data = bytearray()
+        stored_files = []
+        for file_id, indexed in files.items():
+            if packed is not None and indexed.block is not None:
+                block_segment = packed.segment_at(indexed.block)
+                block = indexed.block - packed.segments[block_segment].files_offset
+                stored_files.append(
+                    (
+                        file_id,
+                        indexed.path,
+                        indexed.mtime_ns,
+                        indexed.size,
+                        indexed.token_count,
+                        indexed.digest,
+                        block_segment,
+                        block,
+                    )
+                )
+                continue
+            stored_files.append(
+                (
+                    file_id,
+                    indexed.path,
+                    indexed.mtime_ns,
+                    indexed.size,
+                    indexed.token_count,
+                    indexed.digest,
+                    number,
+                    len(files_data),
+                )
+            )
+            write_varint(files_data, len(indexed.starts))
+            pack_values(files_data, indexed.starts)
+            pack_values(
+                files_data,
+                list(map(operator.sub, indexed.ends, indexed.starts)),
+                delta=False,
+            )
+            write_varint(files_data, len(indexed.terms))
+            pack_values(files_data, sorted(map(term_ids.__getitem__, indexed.terms)))
+
+        meta = json.dumps(dict(metadata, files=stored_files)).encode("ascii")
+        # Pad the metadata so the offset tables that follow are 8-byte aligned,
+        # and the segment so the next one appended starts aligned too.
+        meta += b" " * (-(cls.HEADER.size + len(meta)) % 8)
+        meta_offset = cls.HEADER.size
+        dictionary_offset = meta_offset + len(meta)
+        blob_offset = dictionary_offset + 2 * len(term_offsets) * 8
+        postings_offset = blob_offset + len(blob)
+        files_offset = postings_offset + len(postings_data)
+        files_data += bytes(-(files_offset + len(files_data)) % 8)
+
+        f.write(
+            cls.HEADER.pack(
+                cls.MAGIC,
+                version,
+                len(terms),
+                meta_offset,
+                dictionary_offset,
+                blob_offset,
+                postings_offset,
+                files_offset,
+                files_offset + len(files_data),
+            )
+        )
+        f.write(meta)
+        f.write(little_endian(term_offsets).tobytes())
+        f.write(little_endian(postings_offsets).tobytes())
+        f.write(blob)
+        f.write(postings_data)
+        f.write(files_data)
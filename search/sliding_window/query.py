@@ -0,0 +1,474 @@
+import bisect
+import heapq
+import itertools
+import operator
+import sys
+from dataclasses import dataclass, field
+import re
+from typing import List, Tuple, Dict, Iterator, Optional, Set
+from collections import defaultdict
+
+from .tokens import FastTokenizer, TextTokenizer
+from .matches import MatchCollector, SearchMatch, TokenWindow
+from .strategies import SlidingWindowSearch
+from .index import SearchIndex
+
+
+class QueryError(ValueError):
+    pass
+
+
+@dataclass(frozen=True)
+class QueryTerm:
+
+    kind: str
+    words: Tuple[str, ...]
+    distance: int = 0
+
+    def __str__(self) -> str:
+        if self.kind == "phrase":
+            return '"' + " ".join(self.words) + '"'
+        if self.kind == "prefix":
+            return f"{self.words[0]}*"
+        if self.kind == "fuzzy":
+            return f"{self.words[0]}~{self.distance}"
+        return self.words[0]
+
+
+@dataclass
+class QueryClause:
+
+    slots: List[Tuple[QueryTerm, ...]] = field(default_factory=list)
+    excluded: List[QueryTerm] = field(default_factory=list)
+
+    @staticmethod
+    def label(slot: Tuple[QueryTerm, ...]) -> str:
+        return " OR ".join(str(term) for term in slot)
+
+    def combine(self, other: "QueryClause") -> "QueryClause":
+        return QueryClause(self.slots + other.slots, self.excluded + other.excluded)
+
+
+class QueryParser:
+
+    TOKEN = re.compile(r'"[^"]*"?|[()]|[^\s()"]+')
+    FUZZY = re.compile(r"^(.+)~(\d*)$")
+    MAX_CLAUSES = 64
+
+    def __init__(self, tokenizer: Optional[TextTokenizer] = None):
+        self.tokenizer = (
+            tokenizer if tokenizer is not None else FastTokenizer(use_cache=False)
+        )
+        self.tokens: List[str] = []
+        self.pos = 0
+
+    def parse(self, expression: str) -> List[QueryClause]:
+        self.tokens = self.TOKEN.findall(expression)
+        self.pos = 0
+
+        clauses = self._parse_or()
+        if self.pos < len(self.tokens):
+            raise QueryError(f"unexpected {self.tokens[self.pos]!r}")
+        if not all(clause.slots for clause in clauses):
+            raise QueryError(
+                "every alternative needs at least one term that is not negated"
+            )
+        return clauses
+
+    def _peek(self) -> Optional[str]:
+        return self.tokens[self.pos] if self.pos < len(self.tokens) else None
+
+    def _parse_or(self) -> List[QueryClause]:
+        alternatives = [self._parse_and()]
+        while self._peek() == "OR":
+            self.pos += 1
+            alternatives.append(self._parse_and())
+
+        clauses = [clause for alternative in alternatives for clause in alternative]
+        if len(alternatives) > 1 and all(
+            len(clause.slots) == 1 and not clause.excluded for clause in clauses
+        ):
+            # Alternatives for a single slot: a window needs any one of them.
+            return [QueryClause([sum((clause.slots[0] for clause in clauses), ())])]
+        return clauses
+
+    def _parse_and(self) -> List[QueryClause]:
+        clauses = [QueryClause()]
+        parsed = False
+
+        while self._peek() not in (None, ")", "OR"):
+            if self._peek() == "AND":
+                self.pos += 1
+                continue
+
+            negated, part = self._parse_unary()
+            if negated:
+                excluded = self._excluded_terms(part)
+                clauses = [
+                    QueryClause(clause.slots, clause.excluded + excluded)
+                    for clause in clauses
+                ]
+            else:
+                clauses = [left.combine(right) for left in clauses for right in part]
+            if len(clauses) > self.MAX_CLAUSES:
+                raise QueryError("query expands to too many alternatives")
+            parsed = True
+
+        if not parsed:
+            found = self._peek()
+            raise QueryError(
+                f"expected a term before {found!r}"
+                if found
+                else "expected a term at end of query"
+            )
+        return clauses
+
+    def _parse_unary(self) -> Tuple[bool, List[QueryClause]]:
+        token = self._peek()
+        if token in ("NOT", "-"):
+            self.pos += 1
+            return True, self._parse_atom()
+        if token.startswith("-"):
+            self.tokens[self.pos] = token[1:]
+            return True, self._parse_atom()
+        return False, self._parse_atom()
+
+    def _parse_atom(self) -> List[QueryClause]:
+        token = self._peek()
+        if token is None:
+            raise QueryError("expected a term at end of query")
+        self.pos += 1
+
+        if token == "(":
+            clauses = self._parse_or()
+            if self._peek() != ")":
+                raise QueryError("missing closing parenthesis")
+            self.pos += 1
+            return clauses
+        if token in (")", "OR", "AND", "NOT"):
+            raise QueryError(f"expected a term before {token!r}")
+
+        if token.startswith('"'):
+            if len(token) < 2 or not token.endswith('"'):
+                raise QueryError(f"unterminated phrase {token}")
+            words = self._words(token[1:-1], token)
+            term = QueryTerm("phrase" if len(words) > 1 else "term", words)
+        elif token.endswith("*") and len(token) > 1:
+            term = QueryTerm("prefix", self._word(token[:-1], token))
+        elif self.FUZZY.match(token):
+            word, distance = self.FUZZY.match(token).groups()
+            term = QueryTerm("fuzzy", self._word(word, token), int(distance or 1))
+        else:
+            words = self._words(token, token)
+            term = QueryTerm("phrase" if len(words) > 1 else "term", words)
+
+        return [QueryClause([(term,)])]
+
+    def _words(self, text: str, token: str) -> Tuple[str, ...]:
+        tokens = self.tokenizer.tokenize(text)
+        if not len(tokens):
+            raise QueryError(f"{token!r} contains no searchable words")
+        return tuple(tokens.normalized(i) for i in range(len(tokens)))
+
+    def _word(self, text: str, token: str) -> Tuple[str, ...]:
+        words = self._words(text, token)
+        if len(words) > 1:
+            raise QueryError(
+                f"{token!r}: prefix and fuzzy operators take a single word"
+            )
+        return words
+
+    @staticmethod
+    def _excluded_terms(clauses: List[QueryClause]) -> List[QueryTerm]:
+        if len(clauses) != 1 or len(clauses[0].slots) != 1 or clauses[0].excluded:
+            raise QueryError("NOT applies to a term, a phrase or an OR of them")
+        return list(clauses[0].slots[0])
+
+
+class QueryExecutor:
+
+    def __init__(self, index: SearchIndex, clauses: List[QueryClause]):
+        self.index = index
+        self.clauses = clauses
+        self.expansions: Dict[QueryTerm, List[str]] = {}
+        self.file_sets: Dict[QueryTerm, Set[int]] = {}
+
+    def expand(self, term: QueryTerm) -> List[str]:
+        terms = self.expansions.get(term)
+        if terms is None:
+            if term.kind == "prefix":
+                terms = self.index.vocabulary().prefix(term.words[0])
+            elif term.kind == "fuzzy":
+                terms = self.index.vocabulary().fuzzy(term.words[0], term.distance)
+            else:
+                terms = list(term.words)
+            self.expansions[term] = terms
+        return terms
+
+    def files(self, term: QueryTerm) -> Set[int]:
+        files = self.file_sets.get(term)
+        if files is None:
+            postings = [self.index.postings.get(word, {}) for word in self.expand(term)]
+            if term.kind == "phrase":
+                postings.sort(key=len)
+                files = set(postings[0])
+                for word_postings in postings[1:]:
+                    files.intersection_update(word_postings)
+            else:
+                files = set().union(*postings)
+            self.file_sets[term] = files
+        return files
+
+    def candidate_files(self) -> Dict[int, List[int]]:
+        candidates = defaultdict(list)
+        for clause_id, clause in enumerate(self.clauses):
+            files = None
+            for slot in clause.slots:
+                slot_files = set().union(*(self.files(term) for term in slot))
+                files = slot_files if files is None else files & slot_files
+                if not files:
+                    break
+            for term in clause.excluded:
+                files -= self.files(term)
+            for file_id in files:
+                candidates[file_id].append(clause_id)
+        return candidates
+
+    def intervals(self, term: QueryTerm, file_id: int) -> List[Tuple[int, int]]:
+        postings = self.index.postings
+
+        if term.kind == "phrase":
+            first = postings[term.words[0]][file_id]
+            following = [set(postings[word][file_id]) for word in term.words[1:]]
+            length = len(term.words) - 1
+            return [
+                (position, position + length)
+                for position in first
+                if all(
+                    position + offset in positions
+                    for offset, positions in enumerate(following, 1)
+                )
+            ]
+
+        positions = [
+            postings[word][file_id]
+            for word in self.expand(term)
+            if file_id in postings.get(word, {})
+        ]
+        return [(position, position) for position in heapq.merge(*positions)]
+
+    def slot_intervals(
+        self, clause: QueryClause, file_id: int
+    ) -> List[List[Tuple[int, int]]]:
+        return [
+            sorted(
+                interval
+                for term in slot
+                if file_id in self.files(term)
+                for interval in self.intervals(term, file_id)
+            )
+            for slot in clause.slots
+        ]
+
+    def occurrence_bounds(self, file_id: int, clause_ids: List[int]) -> Dict[str, int]:
+        # Phrase hits never outnumber their rarest word, which keeps this
+        # cheap while still bounding the real term frequencies from above.
+        postings = self.index.postings
+        counts = {}
+        for clause_id in clause_ids:
+            for slot in self.clauses[clause_id].slots:
+                count = 0
+                for term in slot:
+                    words = [
+                        len(postings[word][file_id])
+                        for word in self.expand(term)
+                        if file_id in postings.get(word, {})
+                    ]
+                    if term.kind == "phrase":
+                        count += min(words) if len(words) == len(term.words) else 0
+                    else:
+                        count += sum(words)
+                counts[QueryClause.label(slot)] = count
+        return counts
+
+    def document_frequency(self) -> Dict[str, int]:
+        return {
+            QueryClause.label(slot): len(
+                set().union(*(self.files(term) for term in slot))
+            )
+            for clause in self.clauses
+            for slot in clause.slots
+        }
+
+
+class QuerySearch:
+
+    def __init__(self, executor: QueryExecutor, search_strategy: SlidingWindowSearch):
+        self.executor = executor
+        self.index = executor.index
+        self.search_strategy = search_strategy
+        self.files_skipped = 0
+
+    @staticmethod
+    def find_windows(
+        slot_intervals: List[List[Tuple[int, int]]], window_sizes: List[int]
+    ) -> Iterator[Tuple[int, TokenWindow]]:
+
+        sizes = sorted(window_sizes)
+        if not sizes or not all(slot_intervals):
+            return
+
+        # For each slot, the earliest end among intervals starting at or
+        # after a given start; a span starting at s ends at the max of those.
+        slot_starts = []
+        slot_ends = []
+        for intervals in slot_intervals:
+            ends = [end for _, end in intervals]
+            for i in range(len(ends) - 2, -1, -1):
+                ends[i] = min(ends[i], ends[i + 1])
+            slot_starts.append([start for start, _ in intervals])
+            slot_ends.append(ends)
+
+        spans = []
+        next_end = None
+        for start in sorted(
+            {start for intervals in slot_intervals for start, _ in intervals},
+            reverse=True,
+        ):
+            end = start
+            for starts, ends in zip(slot_starts, slot_ends):
+                i = bisect.bisect_left(starts, start)
+                if i == len(starts):
+                    break
+                end = max(end, ends[i])
+            else:
+                # A later start reaching the same end gives a tighter span.
+                if next_end is None or end < next_end:
+                    spans.append((start, end))
+                next_end = end
+
+        for span_first, span_last in reversed(spans):
+            satisfied = sizes[bisect.bisect_left(sizes, span_last - span_first + 1) :]
+            if satisfied:
+                yield satisfied[0], TokenWindow(
+                    span_first, span_last, span_first, span_last, satisfied
+                )
+
+    def search_file(
+        self,
+        executor: QueryExecutor,
+        file_id: int,
+        clause_ids: List[int],
+        window_sizes: List[int],
+    ) -> List[SearchMatch]:
+
+        indexed = executor.index.files[file_id]
+        if executor.index.is_stale(file_id):
+            print(
+                f"Warning: {indexed.path} changed since it was indexed, "
+                f"re-tokenizing its current contents",
+                file=sys.stderr,
+            )
+            scratch = SearchIndex()
+            file_id = scratch.add_file(indexed.path)
+            if file_id is None:
+                return []
+            executor = QueryExecutor(scratch, executor.clauses)
+            clause_ids = executor.candidate_files().get(file_id, [])
+            indexed = scratch.files[file_id]
+
+        clause_windows = []
+        for clause_id in clause_ids:
+            clause = executor.clauses[clause_id]
+            slot_intervals = executor.slot_intervals(clause, file_id)
+            windows = list(self.find_windows(slot_intervals, window_sizes))
+            if windows:
+                clause_windows.append((clause, slot_intervals, windows))
+        if not clause_windows:
+            return []
+
+        try:
+            with open(indexed.path, "r", encoding="utf-8") as f:
+                text = f.read()
+        except (IOError, UnicodeDecodeError) as e:
+            print(f"Error reading file {indexed.path}: {e}", file=sys.stderr)
+            return []
+
+        starts, ends = executor.index.token_offsets(file_id)
+        best = {}
+        for clause, slot_intervals, windows in clause_windows:
+            labels = [QueryClause.label(slot) for slot in clause.slots]
+            slot_positions = {
+                label: [start for start, _ in intervals]
+                for label, intervals in zip(labels, slot_intervals)
+            }
+            matches = self.search_strategy.build_matches(
+                text,
+                starts,
+                ends,
+                windows,
+                slot_positions,
+                labels,
+                indexed.token_count,
+                indexed.path,
+            )
+
+            hits = sorted(set(itertools.chain.from_iterable(slot_intervals)))
+            hit_starts = [start for start, _ in hits]
+            for match, (_, window) in zip(matches, windows):
+                first = bisect.bisect_left(hit_starts, window.first)
+                last = bisect.bisect_right(hit_starts, window.last)
+                match.highlights = [
+                    (
+                        starts[start] - match.start_pos,
+                        ends[end] - match.start_pos,
+                    )
+                    for start, end in hits[first:last]
+                    if end <= window.last
+                ]
+
+                key = (match.start_pos, match.end_pos)
+                if key not in best or match.score > best[key].score:
+                    best[key] = match
+
+        return list(best.values())
+
+    def search(
+        self,
+        window_size: int,
+        min_window: Optional[int] = None,
+        collector: Optional[MatchCollector] = None,
+    ) -> Iterator[Tuple[str, List[SearchMatch]]]:
+        window_sizes = self.search_strategy.window_sizes(window_size, min_window)
+        scorer = self.search_strategy.scorer
+
+        # Files edited since indexing are re-tokenized by search_file, which
+        # works out their clauses afresh, so they are searched whatever their
+        # old postings say.
+        candidate_files = self.executor.candidate_files()
+        stale = self.index.stale_files()
+        candidates = []
+        for file_id in stale.union(candidate_files):
+            indexed = self.index.files[file_id]
+            clause_ids = candidate_files.get(file_id, [])
+            if file_id in stale:
+                bound = float("inf")
+            else:
+                bound = scorer.upper_bound(
+                    window_sizes,
+                    self.executor.occurrence_bounds(file_id, clause_ids),
+                    indexed.token_count,
+                )
+            candidates.append((-bound, indexed.path, file_id, clause_ids))
+        candidates.sort(key=operator.itemgetter(0, 1))
+
+        for i, (neg_bound, file_path, file_id, clause_ids) in enumerate(candidates):
+            if collector is not None and collector.can_skip(-neg_bound, file_path):
+                self.files_skipped = len(candidates) - i
+                break
+
+            matches = self.search_file(
+                self.executor, file_id, clause_ids, window_sizes
+            )
+            if matches:
+                yield file_path, matches
@@ -0,0 +1,192 @@
+import bisect
+import itertools
+import math
+import operator
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, List, Tuple, Dict, Optional, Sequence
+
+from .matches import TokenWindow
+
+if TYPE_CHECKING:
+    from .index import SearchIndex
+
+
+@dataclass
+class CorpusStats:
+
+    document_count: int
+    average_length: float
+    document_frequency: Dict[str, int]
+
+    @classmethod
+    def from_index(cls, index: "SearchIndex", terms: List[str]) -> "CorpusStats":
+        return cls.from_indexes([index], terms)
+
+    @classmethod
+    def from_indexes(
+        cls, indexes: Sequence["SearchIndex"], terms: List[str]
+    ) -> "CorpusStats":
+        document_count = sum(len(index.files) for index in indexes)
+        total_tokens = sum(
+            indexed.token_count
+            for index in indexes
+            for indexed in index.files.values()
+        )
+        return cls(
+            document_count,
+            total_tokens / document_count if document_count else 0.0,
+            {
+                term: sum(len(index.postings.get(term, {})) for index in indexes)
+                for term in terms
+            },
+        )
+
+    def idf(self, term: str) -> float:
+        df = self.document_frequency.get(term, 0)
+        return math.log(1 + (self.document_count - df + 0.5) / (df + 0.5))
+
+
+class Scorer(ABC):
+
+    @abstractmethod
+    def upper_bound(
+        self,
+        window_sizes: List[int],
+        term_counts: Optional[Dict[str, int]] = None,
+        token_count: Optional[int] = None,
+    ) -> float:
+
+        pass
+
+    @abstractmethod
+    def score_windows(
+        self,
+        windows: List[Tuple[int, TokenWindow]],
+        term_positions: Dict[str, Sequence[int]],
+        normalized_terms: List[str],
+        token_count: int,
+    ) -> List[float]:
+
+        pass
+
+
+class WindowScorer(Scorer):
+
+    def upper_bound(
+        self,
+        window_sizes: List[int],
+        term_counts: Optional[Dict[str, int]] = None,
+        token_count: Optional[int] = None,
+    ) -> float:
+
+        # With no usable window size nothing can match.
+        if not window_sizes or min(window_sizes) < 1:
+            return 0.0
+        return 1.0 / min(window_sizes)
+
+    def score_windows(
+        self,
+        windows: List[Tuple[int, TokenWindow]],
+        term_positions: Dict[str, Sequence[int]],
+        normalized_terms: List[str],
+        token_count: int,
+    ) -> List[float]:
+
+        return [1.0 / size for size, _ in windows]
+
+
+class BM25Scorer(Scorer):
+
+    def __init__(self, stats: CorpusStats, k1: float = 1.2, b: float = 0.75):
+        self.stats = stats
+        self.k1 = k1
+        self.b = b
+
+    def upper_bound(
+        self,
+        window_sizes: List[int],
+        term_counts: Optional[Dict[str, int]] = None,
+        token_count: Optional[int] = None,
+    ) -> float:
+
+        if term_counts is None or token_count is None:
+            return float("inf")
+        # Tightness and term order both top out at 1.0.
+        return self.document_score(term_counts, token_count)
+
+    def document_score(self, term_counts: Dict[str, int], token_count: int) -> float:
+
+        length_norm = 1 - self.b
+        if self.stats.average_length:
+            length_norm += self.b * token_count / self.stats.average_length
+
+        score = 0.0
+        for term, tf in term_counts.items():
+            score += (
+                self.stats.idf(term)
+                * tf
+                * (self.k1 + 1)
+                / (tf + self.k1 * length_norm)
+            )
+        return score
+
+    def score_windows(
+        self,
+        windows: List[Tuple[int, TokenWindow]],
+        term_positions: Dict[str, Sequence[int]],
+        normalized_terms: List[str],
+        token_count: int,
+    ) -> List[float]:
+
+        terms = list(dict.fromkeys(normalized_terms))
+        document_score = self.document_score(
+            {term: len(term_positions.get(term, ())) for term in terms}, token_count
+        )
+
+        # Scores every window at once, a column of first hits per term, so
+        # the per-window work runs in map and bisect rather than Python code.
+        spans = [window for _, window in windows]
+        firsts = [w.first if w.span_first is None else w.span_first for w in spans]
+        lasts = [w.last if w.span_first is None else w.span_last for w in spans]
+        columns = []
+        for term in terms:
+            positions = term_positions[term]
+            hits = map(bisect.bisect_left, itertools.repeat(positions), firsts)
+            columns.append(list(map(positions.__getitem__, hits)))
+
+        # Query slots can match the same token (foo foo*), so count the
+        # positions they cover; tightness must stay within the 1.0 that
+        # upper_bound assumes.
+        lengths = map(
+            operator.add, map(operator.sub, lasts, firsts), itertools.repeat(1)
+        )
+        tightness = map(
+            min,
+            itertools.repeat(1.0),
+            map(operator.truediv, map(len, map(set, zip(*columns))), lengths),
+        )
+        if len(terms) > 1:
+            in_order = [0] * len(spans)
+            for before, after in zip(columns, columns[1:]):
+                in_order = list(
+                    map(operator.add, in_order, map(operator.lt, before, after))
+                )
+            order = map(operator.truediv, in_order, itertools.repeat(len(terms) - 1))
+        else:
+            order = itertools.repeat(1.0)
+        weights = map(
+            operator.add,
+            itertools.repeat(0.5),
+            map(operator.mul, itertools.repeat(0.5), order),
+        )
+        return list(
+            map(
+                operator.mul,
+                map(operator.mul, itertools.repeat(document_score), tightness),
+                weights,
+            )
+        )
+
+
+SCORERS = {"window": WindowScorer, "bm25": BM25Scorer}
@@ -0,0 +1,239 @@
+import json
+import sys
+import threading
+import time
+from dataclasses import asdict
+import socketserver
+from http.server import BaseHTTPRequestHandler
+from typing import Any, List, Dict, Optional
+from collections import Counter
+from urllib.parse import parse_qs, urlparse
+
+from .cache import DEFAULT_CACHE_BYTES
+from .tokens import FastTokenizer
+from .matches import MatchCollector
+from .scoring import BM25Scorer, CorpusStats, SCORERS
+from .walk import FileFinder
+from .strategies import MinimumWindowSearch
+from .index import IndexSearch, SearchIndex
+from .query import QueryExecutor, QueryParser, QuerySearch
+
+
+DEFAULT_SERVE_PORT = 8765
+
+
+class SearchService:
+
+    def __init__(
+        self,
+        roots: List[str],
+        file_finder: FileFinder,
+        use_hash: bool = False,
+        cache_bytes: int = DEFAULT_CACHE_BYTES,
+    ):
+        self.file_finder = file_finder
+        self.use_hash = use_hash
+        self.cache_bytes = cache_bytes
+        self.tokenizer = FastTokenizer(cache_bytes=cache_bytes)
+        self.indexes = [
+            SearchIndex.build(root, file_finder, use_hash) for root in roots
+        ]
+        # Queries read whichever list of indexes is current without locking.
+        # Refreshes apply changes to copies and take this lock only to swap
+        # the updated copy into a new list.
+        self.lock = threading.Lock()
+        self.stop_event = threading.Event()
+        self.last_refresh = time.time()
+        self.refresh_counts = {"added": 0, "changed": 0, "removed": 0}
+
+    def refresh(self) -> Dict[str, int]:
+        totals = {"added": 0, "changed": 0, "removed": 0, "unchanged": 0}
+        for i, index in enumerate(self.indexes):
+            changes = index.diff(self.file_finder, self.use_hash)
+            if changes:
+                updated = index.copy()
+                updated.apply(changes, self.use_hash)
+                with self.lock:
+                    indexes = list(self.indexes)
+                    indexes[i] = updated
+                    self.indexes = indexes
+                    # Start a new term dictionary with the new generation so
+                    # terms from old file contents do not pile up.
+                    self.tokenizer = FastTokenizer(cache_bytes=self.cache_bytes)
+            for key, count in changes.counts.items():
+                totals[key] += count
+
+        self.last_refresh = time.time()
+        for key in self.refresh_counts:
+            self.refresh_counts[key] += totals[key]
+        return totals
+
+    def watch(self, interval: float):
+        while not self.stop_event.wait(interval):
+            try:
+                self.refresh()
+            except Exception as e:
+                print(f"Error refreshing index: {e}", file=sys.stderr)
+
+    def start_watching(self, interval: float) -> threading.Thread:
+        thread = threading.Thread(target=self.watch, args=(interval,), daemon=True)
+        thread.start()
+        return thread
+
+    def close(self):
+        self.stop_event.set()
+
+    def status(self) -> Dict[str, Any]:
+        indexes = self.indexes
+        return {
+            "roots": [index.root for index in indexes],
+            "files": sum(len(index.files) for index in indexes),
+            "terms": sum(len(index.postings) for index in indexes),
+            "last_refresh": self.last_refresh,
+            "refreshed": dict(self.refresh_counts),
+        }
+
+    def search(
+        self,
+        query_terms: List[str],
+        window_size: int = 50,
+        min_window: Optional[int] = None,
+        max_results: int = 5,
+        scorer: str = "window",
+        expression: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        clauses = QueryParser().parse(expression) if expression is not None else None
+        if clauses is None and not query_terms:
+            raise ValueError("query must contain at least one term")
+        if window_size < 1 or (min_window is not None and min_window < 1):
+            raise ValueError("window sizes must be at least 1")
+        if scorer not in SCORERS:
+            raise ValueError(f"unknown scorer {scorer!r}")
+
+        started = time.perf_counter()
+        normalized_terms = [term.lower() for term in query_terms]
+        collector = MatchCollector(max_results)
+        files_searched = 0
+        files_with_matches = 0
+        files_skipped = 0
+
+        # A refresh swaps in a new list, so this query keeps a consistent view.
+        indexes = self.indexes
+        executors = (
+            [QueryExecutor(index, clauses) for index in indexes]
+            if clauses is not None
+            else None
+        )
+        if scorer == "bm25":
+            stats = CorpusStats.from_indexes(indexes, normalized_terms)
+            if executors is not None:
+                stats.document_frequency = Counter()
+                for executor in executors:
+                    stats.document_frequency.update(executor.document_frequency())
+            ranking = BM25Scorer(stats)
+        else:
+            ranking = SCORERS[scorer]()
+        strategy = MinimumWindowSearch(tokenizer=self.tokenizer, scorer=ranking)
+
+        for i, index in enumerate(indexes):
+            if executors is not None:
+                index_search = QuerySearch(executors[i], strategy)
+                results = index_search.search(window_size, min_window, collector)
+            else:
+                index_search = IndexSearch(index, strategy)
+                results = index_search.search(
+                    query_terms, window_size, min_window, collector
+                )
+            for _, matches in results:
+                files_with_matches += 1
+                collector.extend(matches)
+            files_searched += len(index.files)
+            files_skipped += index_search.files_skipped
+
+        return {
+            "query": expression if expression is not None else query_terms,
+            "files_searched": files_searched,
+            "files_with_matches": files_with_matches,
+            "files_skipped": files_skipped,
+            "elapsed_ms": (time.perf_counter() - started) * 1000,
+            "matches": [asdict(match) for match in collector.results()],
+        }
+
+    def handle(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        query = request.get("query") or request.get("q") or []
+        if isinstance(query, str):
+            query = query.split()
+        if not isinstance(query, list) or not all(isinstance(t, str) for t in query):
+            raise ValueError("query must be a string or a list of strings")
+        expression = request.get("expr")
+        if expression is not None and not isinstance(expression, str):
+            raise ValueError("expr must be a string")
+
+        min_window = request.get("min_window")
+        return self.search(
+            query,
+            int(request.get("window", request.get("w", 50))),
+            int(min_window) if min_window is not None else None,
+            int(request.get("max_results", 5)),
+            request.get("scorer", "window"),
+            expression,
+        )
+
+
+class SearchHTTPHandler(BaseHTTPRequestHandler):
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        service = self.server.service
+
+        if url.path == "/status":
+            self.send_json(200, service.status())
+            return
+        if url.path != "/search":
+            self.send_json(404, {"error": f"unknown endpoint {url.path}"})
+            return
+
+        params = parse_qs(url.query)
+        request = {key: values[-1] for key, values in params.items()}
+        request["query"] = [
+            term for value in params.get("q", []) for term in value.split()
+        ]
+        try:
+            self.send_json(200, service.handle(request))
+        except ValueError as e:
+            self.send_json(400, {"error": str(e)})
+
+    def send_json(self, status: int, payload: Dict[str, Any]):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args):
+        pass
+
+
+class SearchSocketHandler(socketserver.StreamRequestHandler):
+
+    def handle(self):
+        service = self.server.service
+
+        for line in self.rfile:
+            if not line.strip():
+                continue
+            try:
+                request = json.loads(line)
+                if not isinstance(request, dict):
+                    raise ValueError("request must be a JSON object")
+                response = (
+                    service.status()
+                    if request.get("command") == "status"
+                    else service.handle(request)
+                )
+            except ValueError as e:
+                response = {"error": str(e)}
+
+            self.wfile.write(json.dumps(response).encode("utf-8") + b"\n")
+            self.wfile.flush()
@@ -0,0 +1,106 @@
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, Iterable, Iterator, Optional
+from collections import Counter
+
+
+@dataclass
+class StageStats:
+
+    calls: int = 0
+    wall: float = 0.0
+    cpu: float = 0.0
+
+
+class PipelineStats:
+
+    def __init__(self):
+        self.stages: Dict[str, StageStats] = {}
+        self.counters: Dict[str, int] = Counter()
+        self.lock = threading.Lock()
+        self.local = threading.local()
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        # Stages nest: time spent in an inner stage is only charged to it, so
+        # the per-stage figures add up to the total.
+        stack = getattr(self.local, "stack", None)
+        if stack is None:
+            stack = self.local.stack = []
+        frame = [0.0, 0.0]
+        stack.append(frame)
+        wall = time.perf_counter()
+        cpu = time.process_time()
+        try:
+            yield
+        finally:
+            wall = time.perf_counter() - wall
+            cpu = time.process_time() - cpu
+            stack.pop()
+            if stack:
+                stack[-1][0] += wall
+                stack[-1][1] += cpu
+            with self.lock:
+                stats = self.stages.setdefault(name, StageStats())
+                stats.calls += 1
+                stats.wall += wall - frame[0]
+                stats.cpu += cpu - frame[1]
+
+    def iterate(self, name: str, iterable: Iterable) -> Iterator:
+        iterator = iter(iterable)
+        while True:
+            with self.stage(name):
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    return
+            yield item
+
+    def count(self, name: str, amount: int = 1):
+        with self.lock:
+            self.counters[name] += amount
+
+    def merge(self, other: Dict[str, Any]):
+        with self.lock:
+            for name, values in other["stages"].items():
+                stats = self.stages.setdefault(name, StageStats())
+                stats.calls += values["calls"]
+                stats.wall += values["wall"]
+                stats.cpu += values["cpu"]
+            self.counters.update(other["counters"])
+
+    def to_dict(self) -> Dict[str, Any]:
+        with self.lock:
+            return {
+                "stages": {name: asdict(stats) for name, stats in self.stages.items()},
+                "counters": dict(self.counters),
+            }
+
+    def reset(self):
+        with self.lock:
+            self.stages.clear()
+            self.counters.clear()
+
+    def format(self) -> str:
+        lines = [f"{'Stage':<16}{'Calls':>10}{'Wall (s)':>12}{'CPU (s)':>12}"]
+        for name, stats in self.stages.items():
+            lines.append(
+                f"{name:<16}{stats.calls:>10}{stats.wall:>12.4f}{stats.cpu:>12.4f}"
+            )
+        lines.append(
+            f"{'total':<16}{'':>10}"
+            f"{sum(s.wall for s in self.stages.values()):>12.4f}"
+            f"{sum(s.cpu for s in self.stages.values()):>12.4f}"
+        )
+        if self.counters:
+            lines.append("")
+            width = max(len(name) for name in self.counters)
+            for name, value in sorted(self.counters.items()):
+                lines.append(f"{name:<{width}}  {value:>12}")
+        return "\n".join(lines)
+
+
+def stage_timer(stats: Optional[PipelineStats], name: str):
+    return stats.stage(name) if stats is not None else nullcontext()
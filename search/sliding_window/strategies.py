@@ -0,0 +1,407 @@
+import bisect
+import heapq
+import itertools
+from abc import ABC, abstractmethod
+from array import array
+from typing import List, Tuple, Dict, Hashable, Iterator, Optional, Sequence
+from collections import defaultdict
+
+from .cache import content_key, DEFAULT_CACHE_BYTES, LRUCache
+from .stats import PipelineStats, stage_timer
+from .tokens import FastTokenizer, TextTokenizer, TokenArray
+from .matches import SearchMatch, TokenWindow
+from .scoring import Scorer, WindowScorer
+
+
+class SearchStrategy(ABC):
+
+    @abstractmethod
+    def search(
+        self,
+        text: str,
+        query_terms: List[str],
+        window_size: int,
+        cache_key: Optional[Hashable] = None,
+    ) -> Iterator[SearchMatch]:
+
+        pass
+
+
+class SlidingWindowSearch(SearchStrategy):
+
+    def __init__(
+        self,
+        cache_bytes: int = DEFAULT_CACHE_BYTES,
+        tokenizer: Optional[TextTokenizer] = None,
+        scorer: Optional[Scorer] = None,
+    ):
+        self.tokenizer = (
+            tokenizer
+            if tokenizer is not None
+            else FastTokenizer(cache_bytes=cache_bytes)
+        )
+        self.scorer = scorer if scorer is not None else WindowScorer()
+
+        self.term_positions = LRUCache(cache_bytes)
+        self.stats: Optional[PipelineStats] = None
+
+    def _build_term_index(
+        self, tokens: TokenArray, query_terms: List[str]
+    ) -> Dict[str, Sequence[int]]:
+
+        wanted = {}
+        for term in query_terms:
+            term_id = tokens.dictionary.lookup(term)
+            if term_id is not None:
+                wanted[term_id] = term
+
+        term_positions = defaultdict(lambda: array("I"))
+        if not wanted:
+            return term_positions
+
+        for i, term_id in enumerate(tokens.term_ids):
+            if term_id in wanted:
+                term_positions[wanted[term_id]].append(i)
+        return term_positions
+
+    @staticmethod
+    def _next_position(positions: List[int], pos: int) -> float:
+
+        j = bisect.bisect_left(positions, pos)
+        return positions[j] if j < len(positions) else float("inf")
+
+    def find_windows(
+        self,
+        term_positions: Dict[str, List[int]],
+        normalized_terms: List[str],
+        token_count: int,
+        window_size: int,
+    ) -> Iterator[TokenWindow]:
+
+        if token_count < window_size:
+            return
+
+        if not all(term_positions.get(term) for term in normalized_terms):
+            return
+
+        i = min(term_positions[term][0] for term in normalized_terms)
+
+        while i <= token_count - window_size:
+            window_end = i + window_size
+
+            if all(
+                self._next_position(term_positions[term], i) < window_end
+                for term in normalized_terms
+            ):
+                yield TokenWindow(i, window_end - 1)
+
+                last_occurrence = max(
+                    term_positions[term][
+                        bisect.bisect_left(term_positions[term], window_end) - 1
+                    ]
+                    for term in normalized_terms
+                )
+                i = last_occurrence + 1
+            else:
+
+                next_pos = min(
+                    self._next_position(term_positions[term], window_end)
+                    for term in normalized_terms
+                )
+
+                if next_pos == float("inf"):
+                    break
+
+                i = next_pos - window_size + 1
+
+    @staticmethod
+    def window_sizes(window_size: int, min_window: Optional[int]) -> List[int]:
+
+        if min_window is not None:
+            return list(range(min_window, window_size + 1, 10))
+        return [window_size]
+
+    def find_windows_for_sizes(
+        self,
+        term_positions: Dict[str, List[int]],
+        normalized_terms: List[str],
+        token_count: int,
+        window_sizes: List[int],
+    ) -> Iterator[Tuple[int, TokenWindow]]:
+
+        for size in window_sizes:
+            for window in self.find_windows(
+                term_positions, normalized_terms, token_count, size
+            ):
+                yield size, window
+
+    def _prepare(
+        self,
+        text: str,
+        normalized_terms: List[str],
+        cache_key: Optional[Hashable] = None,
+    ) -> Tuple[TokenArray, Dict[str, Sequence[int]]]:
+
+        cache_key = cache_key if cache_key is not None else content_key(text)
+        cache_hits = self.tokenizer.token_cache.hits
+        with stage_timer(self.stats, "tokenize"):
+            tokens = self.tokenizer.tokenize(text, cache_key)
+
+        if self.stats is not None:
+            self.stats.count("tokens", len(tokens))
+            self.stats.count(
+                "token_cache_hits"
+                if self.tokenizer.token_cache.hits > cache_hits
+                else "token_cache_misses"
+            )
+
+        positions_key = (cache_key, tuple(sorted(set(normalized_terms))))
+        term_positions = self.term_positions.get(positions_key)
+        if term_positions is None:
+            with stage_timer(self.stats, "term_index"):
+                term_positions = self._build_term_index(tokens, normalized_terms)
+            self.term_positions.put(
+                positions_key,
+                term_positions,
+                sum(
+                    positions.itemsize * len(positions)
+                    for positions in term_positions.values()
+                ),
+            )
+        return tokens, term_positions
+
+    def search(
+        self,
+        text: str,
+        query_terms: List[str],
+        window_size: int,
+        cache_key: Optional[Hashable] = None,
+    ) -> Iterator[SearchMatch]:
+        normalized_terms = [term.lower() for term in query_terms]
+        tokens, term_positions = self._prepare(text, normalized_terms, cache_key)
+
+        if len(tokens) < window_size:
+            return
+
+        windows = [
+            (window_size, window)
+            for window in self.find_windows(
+                term_positions, normalized_terms, len(tokens), window_size
+            )
+        ]
+        yield from self.build_matches(
+            text,
+            tokens.starts,
+            tokens.ends,
+            windows,
+            term_positions,
+            normalized_terms,
+            len(tokens),
+        )
+
+    def search_window_sizes(
+        self,
+        text: str,
+        query_terms: List[str],
+        window_sizes: List[int],
+        cache_key: Optional[Hashable] = None,
+    ) -> Iterator[SearchMatch]:
+        normalized_terms = [term.lower() for term in query_terms]
+        tokens, term_positions = self._prepare(text, normalized_terms, cache_key)
+
+        windows = list(
+            self.find_windows_for_sizes(
+                term_positions, normalized_terms, len(tokens), window_sizes
+            )
+        )
+        yield from self.build_matches(
+            text,
+            tokens.starts,
+            tokens.ends,
+            windows,
+            term_positions,
+            normalized_terms,
+            len(tokens),
+        )
+
+    def build_matches(
+        self,
+        text: str,
+        starts: Sequence[int],
+        ends: Sequence[int],
+        windows: List[Tuple[int, TokenWindow]],
+        term_positions: Dict[str, Sequence[int]],
+        normalized_terms: List[str],
+        token_count: int,
+        file_path: Optional[str] = None,
+    ) -> List[SearchMatch]:
+
+        if not windows:
+            return []
+
+        scores = self.scorer.score_windows(
+            windows, term_positions, normalized_terms, token_count
+        )
+        position_lists = [
+            term_positions[term]
+            for term in dict.fromkeys(normalized_terms)
+            if term in term_positions
+        ]
+
+        matches = []
+        for (size, window), score in zip(windows, scores):
+            match = window.to_match(text, starts, ends, size, file_path, score)
+
+            hits = []
+            for positions in position_lists:
+                lo = bisect.bisect_left(positions, window.first)
+                hi = bisect.bisect_right(positions, window.last)
+                hits.extend(positions[lo:hi])
+            hits.sort()
+            match.highlights = [
+                (starts[p] - match.start_pos, ends[p] - match.start_pos) for p in hits
+            ]
+            matches.append(match)
+        return matches
+
+
+class MinimumWindowSearch(SlidingWindowSearch):
+
+    def find_windows(
+        self,
+        term_positions: Dict[str, List[int]],
+        normalized_terms: List[str],
+        token_count: int,
+        window_size: int,
+    ) -> Iterator[TokenWindow]:
+
+        if token_count < window_size:
+            return
+
+        terms = list(dict.fromkeys(normalized_terms))
+        if not all(term_positions.get(term) for term in terms):
+            return
+
+        occurrences = self._merge_occurrences(term_positions, terms)
+
+        counts = [0] * len(terms)
+        covered = 0
+        head = tail = 0
+        i = occurrences[0][0]
+
+        while i <= token_count - window_size:
+            window_end = i + window_size
+
+            while tail < len(occurrences) and occurrences[tail][0] < window_end:
+                k = occurrences[tail][1]
+                counts[k] += 1
+                if counts[k] == 1:
+                    covered += 1
+                tail += 1
+
+            while head < tail and occurrences[head][0] < i:
+                k = occurrences[head][1]
+                counts[k] -= 1
+                if counts[k] == 0:
+                    covered -= 1
+                head += 1
+
+            if covered == len(terms):
+                span_first, span_last = self._minimal_span(
+                    occurrences, head, tail, len(terms)
+                )
+                yield TokenWindow(i, window_end - 1, span_first, span_last)
+
+                i = occurrences[tail - 1][0] + 1
+            else:
+                if tail == len(occurrences):
+                    break
+
+                i = occurrences[tail][0] - window_size + 1
+
+    def find_windows_for_sizes(
+        self,
+        term_positions: Dict[str, List[int]],
+        normalized_terms: List[str],
+        token_count: int,
+        window_sizes: List[int],
+    ) -> Iterator[Tuple[int, TokenWindow]]:
+
+        sizes = sorted(size for size in window_sizes if size <= token_count)
+        terms = list(dict.fromkeys(normalized_terms))
+        if not sizes or not all(term_positions.get(term) for term in terms):
+            return
+
+        occurrences = self._merge_occurrences(term_positions, terms)
+
+        counts = [0] * len(terms)
+        covered = 0
+        left = 0
+
+        for right in range(len(occurrences)):
+            k = occurrences[right][1]
+            counts[k] += 1
+            if counts[k] == 1:
+                covered += 1
+
+            if covered < len(terms):
+                continue
+
+            while counts[occurrences[left][1]] > 1:
+                counts[occurrences[left][1]] -= 1
+                left += 1
+
+            span_first = occurrences[left][0]
+            span_last = occurrences[right][0]
+            satisfied = sizes[bisect.bisect_left(sizes, span_last - span_first + 1) :]
+            if satisfied:
+                yield satisfied[0], TokenWindow(
+                    span_first, span_last, span_first, span_last, satisfied
+                )
+
+            counts[occurrences[left][1]] -= 1
+            covered -= 1
+            left += 1
+
+    @staticmethod
+    def _merge_occurrences(
+        term_positions: Dict[str, List[int]], terms: List[str]
+    ) -> List[Tuple[int, int]]:
+
+        return list(
+            heapq.merge(
+                *(
+                    zip(term_positions[term], itertools.repeat(k))
+                    for k, term in enumerate(terms)
+                )
+            )
+        )
+
+    @staticmethod
+    def _minimal_span(
+        occurrences: List[Tuple[int, int]], head: int, tail: int, term_count: int
+    ) -> Tuple[int, int]:
+
+        counts = [0] * term_count
+        covered = 0
+        best = None
+        left = head
+
+        for right in range(head, tail):
+            k = occurrences[right][1]
+            counts[k] += 1
+            if counts[k] == 1:
+                covered += 1
+
+            while covered == term_count:
+                span = (occurrences[left][0], occurrences[right][0])
+                if best is None or span[1] - span[0] < best[1] - best[0]:
+                    best = span
+
+                k = occurrences[left][1]
+                counts[k] -= 1
+                if counts[k] == 0:
+                    covered -= 1
+                left += 1
+
+        return best
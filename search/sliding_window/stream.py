@@ -0,0 +1,212 @@
+import mmap
+import os
+import re
+from typing import BinaryIO, List, Tuple, Iterator, Optional
+from collections import deque
+
+from .matches import SearchMatch
+from .strategies import MinimumWindowSearch
+
+
+class _ChunkedReader:
+
+    def __init__(self, stream: BinaryIO, chunk_size: int):
+        self.stream = stream
+        self.chunk_size = chunk_size
+        self.buffer = bytearray()
+        self.buffer_offset = 0
+        self.keep_from = 0
+
+    def tokens(self, pattern: "re.Pattern") -> Iterator[Tuple[int, int, bytes]]:
+        scan_from = 0
+        eof = False
+
+        while not eof:
+            chunk = self.stream.read(self.chunk_size)
+            eof = not chunk
+
+            drop = min(self.keep_from, scan_from) - self.buffer_offset
+            if drop > 0:
+                del self.buffer[:drop]
+                self.buffer_offset += drop
+            self.buffer += chunk
+
+            for match in pattern.finditer(self.buffer, scan_from - self.buffer_offset):
+                if not eof and match.end() == len(self.buffer):
+                    # The token may continue in the next chunk.
+                    scan_from = self.buffer_offset + match.start()
+                    break
+                scan_from = self.buffer_offset + match.end()
+                yield scan_from - len(match.group()), scan_from, match.group()
+            else:
+                scan_from = self.buffer_offset + len(self.buffer)
+
+    def text(self, start: int, end: int) -> bytes:
+        return bytes(self.buffer[start - self.buffer_offset : end - self.buffer_offset])
+
+
+class TermPrefilter:
+
+    # U+0130 and U+212A are the only non-ASCII characters whose lowercase
+    # form contains an ASCII letter ("i" and "k"); a byte scan cannot see them.
+    NON_ASCII_LOWER_SOURCES = {"i", "k"}
+    NON_ASCII_BYTE = re.compile(rb"[\x80-\xff]")
+
+    def __init__(self, query_terms: List[str]):
+        self.patterns = []
+        for term in dict.fromkeys(term.lower() for term in query_terms):
+            if not term.isascii():
+                # Bytes patterns only fold ASCII case, so a miss proves nothing.
+                continue
+            self.patterns.append(
+                (
+                    re.compile(re.escape(term.encode("ascii")), re.IGNORECASE),
+                    bool(self.NON_ASCII_LOWER_SOURCES.intersection(term)),
+                )
+            )
+
+    def may_match(self, data) -> bool:
+        if not self.patterns:
+            return True
+
+        is_ascii = None
+        for pattern, needs_ascii in self.patterns:
+            if pattern.search(data):
+                continue
+            if needs_ascii:
+                if is_ascii is None:
+                    is_ascii = self.NON_ASCII_BYTE.search(data) is None
+                if not is_ascii:
+                    continue
+            return False
+        return True
+
+
+class StreamingWindowSearch:
+
+    # Byte-level twin of TextTokenizer; only ASCII whitespace separates tokens.
+    WORD = re.compile(rb"[^\s.,;:!?\"'()\[\]{}]+")
+    CHUNK_SIZE = 1 << 20
+
+    def __init__(
+        self,
+        query_terms: List[str],
+        window_size: int,
+        prefilter: Optional[TermPrefilter] = None,
+    ):
+        self.window_size = window_size
+        self.terms = list(dict.fromkeys(term.lower() for term in query_terms))
+        self.term_lookup = {
+            term.encode("utf-8"): k for k, term in enumerate(self.terms)
+        }
+        self.prefilter = prefilter
+
+    def search_file(self, file_path: str) -> Iterator[SearchMatch]:
+        with open(file_path, "rb") as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                if self.prefilter is not None and not self.prefilter.may_match(mm):
+                    return
+                scanner = self.WORD.finditer(mm)
+                try:
+                    yield from self._search_tokens(
+                        (
+                            (match.start(), match.end(), match.group())
+                            for match in scanner
+                        ),
+                        lambda start, end: mm[start:end],
+                    )
+                finally:
+                    # The scanner holds a buffer export that blocks mm.close().
+                    del scanner
+
+    def search_stream(
+        self, stream: BinaryIO, chunk_size: int = CHUNK_SIZE
+    ) -> Iterator[SearchMatch]:
+        reader = _ChunkedReader(stream, chunk_size)
+        yield from self._search_tokens(reader.tokens(self.WORD), reader.text, reader)
+
+    def _term_index(self, token: bytes) -> int:
+        if token.isascii():
+            return self.term_lookup.get(token.lower(), -1)
+        normalized = token.decode("utf-8", "replace").lower().encode("utf-8")
+        return self.term_lookup.get(normalized, -1)
+
+    def _search_tokens(
+        self,
+        tokens: Iterator[Tuple[int, int, bytes]],
+        text_at,
+        reader: Optional[_ChunkedReader] = None,
+    ) -> Iterator[SearchMatch]:
+        window_size = self.window_size
+        term_count = len(self.terms)
+
+        window = deque(maxlen=window_size)
+        hits = deque()
+        counts = [0] * term_count
+        covered = 0
+        boundary = None
+        last_hit = -1
+
+        for index, (start, end, token) in enumerate(tokens):
+            if (
+                len(window) == window_size
+                and hits
+                and hits[0][0] == index - window_size
+            ):
+                k = hits.popleft()[1]
+                counts[k] -= 1
+                if counts[k] == 0:
+                    covered -= 1
+
+            window.append((start, end))
+            if reader is not None:
+                reader.keep_from = window[0][0]
+
+            k = self._term_index(token)
+            if k >= 0:
+                hits.append((index, k))
+                counts[k] += 1
+                if counts[k] == 1:
+                    covered += 1
+                last_hit = index
+                if boundary is None:
+                    boundary = index
+
+            first = index - window_size + 1
+            if (
+                covered == term_count
+                and len(window) == window_size
+                and first >= boundary
+            ):
+                span_first, span_last = MinimumWindowSearch._minimal_span(
+                    list(hits), 0, len(hits), term_count
+                )
+                window_start = window[0][0]
+                window_end = window[-1][1]
+                raw = text_at(window_start, window_end)
+
+                highlights = None
+                if raw.isascii():
+                    highlights = [
+                        (
+                            window[hit - first][0] - window_start,
+                            window[hit - first][1] - window_start,
+                        )
+                        for hit, _ in hits
+                    ]
+
+                yield SearchMatch(
+                    window_size,
+                    window_start,
+                    window_end,
+                    raw.decode("utf-8", "replace"),
+                    1.0 / window_size,
+                    span_start=window[span_first - first][0],
+                    span_end=window[span_last - first][1],
+                    span_length=span_last - span_first + 1,
+                    byte_offsets=True,
+                    highlights=highlights,
+                )
+                boundary = last_hit + 1
@@ -0,0 +1,190 @@
+import itertools
+import operator
+import sys
+import threading
+from array import array
+from dataclasses import dataclass
+import re
+from typing import List, Dict, Hashable, Iterator, Optional
+
+from .cache import content_key, DEFAULT_CACHE_BYTES, LRUCache
+
+
+@dataclass
+class Token:
+
+    text: str
+    start: int
+    end: int
+    normalized: str
+
+    @classmethod
+    def from_text(cls, text: str, start: int, end: int) -> "Token":
+        return cls(text, start, end, text.lower())
+
+
+class _TermIdMap(dict):
+
+    def __init__(self, terms: List[str]):
+        super().__init__()
+        self.terms = terms
+        self.lock = threading.Lock()
+
+    def __missing__(self, term: str) -> int:
+        # Hits never lock; new terms are numbered under the lock, and the
+        # term is listed before its id is published to other threads.
+        with self.lock:
+            term_id = self.get(term)
+            if term_id is None:
+                term_id = len(self.terms)
+                self.terms.append(term)
+                self[term] = term_id
+            return term_id
+
+
+class TermDictionary:
+
+    def __init__(self):
+        self.terms: List[str] = []
+        self.term_ids: Dict[str, int] = _TermIdMap(self.terms)
+
+    def intern(self, term: str) -> int:
+        return self.term_ids[term]
+
+    def lookup(self, term: str) -> Optional[int]:
+        return self.term_ids.get(term)
+
+    def __getitem__(self, term_id: int) -> str:
+        return self.terms[term_id]
+
+    def __len__(self) -> int:
+        return len(self.terms)
+
+
+class TokenArray:
+
+    __slots__ = ("text", "starts", "ends", "term_ids", "dictionary")
+
+    def __init__(self, text: str, dictionary: TermDictionary):
+        self.text = text
+        self.starts = array(self.offset_type(text))
+        self.ends = array(self.offset_type(text))
+        self.term_ids = array("I")
+        self.dictionary = dictionary
+
+    @staticmethod
+    def offset_type(text: str) -> str:
+        return "I" if len(text) < 2**32 else "Q"
+
+    def append(self, start: int, end: int):
+        self.starts.append(start)
+        self.ends.append(end)
+        self.term_ids.append(self.dictionary.intern(self.text[start:end].lower()))
+
+    def normalized(self, i: int) -> str:
+        return self.dictionary[self.term_ids[i]]
+
+    @property
+    def nbytes(self) -> int:
+        return sum(
+            values.itemsize * len(values)
+            for values in (self.starts, self.ends, self.term_ids)
+        )
+
+    def __len__(self) -> int:
+        return len(self.term_ids)
+
+    def __getitem__(self, i: int) -> Token:
+        start = self.starts[i]
+        end = self.ends[i]
+        return Token(self.text[start:end], start, end, self.normalized(i))
+
+    def __iter__(self) -> Iterator[Token]:
+        for i in range(len(self)):
+            yield self[i]
+
+
+class TextTokenizer:
+
+    def __init__(
+        self,
+        use_cache: bool = True,
+        dictionary: Optional[TermDictionary] = None,
+        cache_bytes: int = DEFAULT_CACHE_BYTES,
+    ):
+        self.use_cache = use_cache
+        self.dictionary = dictionary if dictionary is not None else TermDictionary()
+        self.token_cache = LRUCache(cache_bytes)
+
+    def tokenize(self, text: str, cache_key: Optional[Hashable] = None) -> TokenArray:
+
+        if self.use_cache:
+            cache_key = cache_key if cache_key is not None else content_key(text)
+            cached = self.token_cache.get(cache_key)
+            if cached is not None:
+                return cached
+
+        tokens = self._split(text)
+
+        if self.use_cache:
+            self.token_cache.put(cache_key, tokens, tokens.nbytes + sys.getsizeof(text))
+        return tokens
+
+    def _split(self, text: str) -> TokenArray:
+
+        tokens = TokenArray(text, self.dictionary)
+        token_start = None
+
+        for i, char in enumerate(text):
+            if char.isspace() or char in ".,;:!?\"'()[]{}":
+                if token_start is not None:
+                    tokens.append(token_start, i)
+                    token_start = None
+            elif token_start is None:
+                token_start = i
+
+        if token_start is not None:
+            tokens.append(token_start, len(text))
+
+        return tokens
+
+
+class FastTokenizer(TextTokenizer):
+
+    PUNCTUATION = ".,;:!?\"'()[]{}"
+    # str.isspace() has no matches outside the Basic Multilingual Plane.
+    SEPARATOR_TABLE = str.maketrans(
+        dict.fromkeys(
+            PUNCTUATION + "".join(c for c in map(chr, range(0x10000)) if c.isspace()),
+            " ",
+        )
+    )
+    WORD = re.compile(r"[^\s.,;:!?\"'()\[\]{}]+")
+
+    def _split(self, text: str) -> TokenArray:
+
+        tokens = TokenArray(text, self.dictionary)
+        lowered = text.lower()
+
+        if len(lowered) != len(text) or "\u03a3" in text:
+            # Some characters expand when lowercased, so offsets into the
+            # lowered copy would drift, and capital sigma lowercases to a
+            # final or medial form depending on its neighbours, which differ
+            # between the whole text and one token. Normalize token by token.
+            for match in self.WORD.finditer(text):
+                tokens.append(*match.span())
+            return tokens
+
+        # Every separator becomes a single space, so splitting on " " keeps
+        # one (possibly empty) part per gap and part lengths give offsets.
+        parts = lowered.translate(self.SEPARATOR_TABLE).split(" ")
+        bounds = itertools.accumulate(map((1).__add__, map(len, parts)), initial=0)
+        words = list(filter(None, parts))
+
+        tokens.starts.extend(itertools.compress(bounds, parts))
+        tokens.ends.extend(map(operator.add, tokens.starts, map(len, words)))
+        tokens.term_ids.extend(map(self.dictionary.term_ids.__getitem__, words))
+        return tokens
+
+
+TOKENIZERS = {"python": TextTokenizer, "fast": FastTokenizer}
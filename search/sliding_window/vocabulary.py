@@ -0,0 +1,90 @@
+import bisect
+from typing import List, Dict, Iterator, Optional, Sequence
+from collections import Counter, defaultdict
+
+
+def edit_distance(a: str, b: str, limit: Optional[int] = None) -> int:
+    if len(a) < len(b):
+        a, b = b, a
+    if limit is not None and len(a) - len(b) > limit:
+        return limit + 1
+
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            current.append(
+                min(
+                    previous[j] + 1,
+                    current[j - 1] + 1,
+                    previous[j - 1] + (ca != cb),
+                )
+            )
+        if limit is not None and min(current) > limit:
+            return limit + 1
+        previous = current
+    return previous[-1]
+
+
+class TrigramIndex:
+
+    def __init__(self, terms: Sequence[str]):
+        self.terms = terms
+        self.by_length: Dict[int, List[int]] = defaultdict(list)
+        self.postings: Dict[str, List[int]] = defaultdict(list)
+
+        for term_id, term in enumerate(terms):
+            self.by_length[len(term)].append(term_id)
+            for gram in set(self.grams(term)):
+                self.postings[gram].append(term_id)
+
+    @staticmethod
+    def grams(term: str) -> List[str]:
+        padded = f"$${term}$$"
+        return [padded[i : i + 3] for i in range(len(padded) - 2)]
+
+    def search(self, term: str, max_distance: int) -> List[str]:
+        grams = set(self.grams(term))
+        # Each edit destroys at most three of the query's trigrams.
+        threshold = len(grams) - 3 * max_distance
+
+        if threshold > 0:
+            counts = Counter()
+            for gram in grams:
+                counts.update(self.postings.get(gram, ()))
+            candidates = [
+                term_id for term_id, count in counts.items() if count >= threshold
+            ]
+        else:
+            candidates = [
+                term_id
+                for length in range(
+                    len(term) - max_distance, len(term) + max_distance + 1
+                )
+                for term_id in self.by_length.get(length, ())
+            ]
+
+        return sorted(
+            self.terms[term_id]
+            for term_id in candidates
+            if edit_distance(term, self.terms[term_id], max_distance) <= max_distance
+        )
+
+
+class TermVocabulary:
+
+    def __init__(self, terms: Iterator[str]):
+        self.terms = sorted(terms)
+        self.trigrams: Optional[TrigramIndex] = None
+
+    def prefix(self, prefix: str) -> List[str]:
+        start = bisect.bisect_left(self.terms, prefix)
+        end = bisect.bisect_left(
+            self.terms, prefix[:-1] + chr(ord(prefix[-1]) + 1), start
+        )
+        return self.terms[start:end]
+
+    def fuzzy(self, term: str, max_distance: int) -> List[str]:
+        if self.trigrams is None:
+            self.trigrams = TrigramIndex(self.terms)
+        return self.trigrams.search(term, max_distance)
@@ -0,0 +1,445 @@
+from concurrent.futures import Future, ThreadPoolExecutor
+import os
+import re
+from typing import (
+    Callable,
+    Deque,
+    List,
+    Tuple,
+    Iterable,
+    Iterator,
+    Optional,
+    Sequence,
+    Set,
+)
+from collections import deque
+
+
+DEFAULT_READ_AHEAD_BYTES = 32 * 1024 * 1024
+
+
+class IgnoreFile:
+
+    FILENAMES = (".gitignore", ".ignore")
+
+    def __init__(self, base: str, lines: Iterator[str], prefix: str = ""):
+        self.base = base
+        self.prefix = prefix
+        self.rules: List[Tuple[re.Pattern, bool, bool]] = []
+
+        for line in lines:
+            rule = self.compile_rule(line)
+            if rule is not None:
+                self.rules.append(rule)
+
+    @classmethod
+    def load(
+        cls,
+        directory: str,
+        base: str,
+        prefix: str = "",
+        names: Sequence[str] = FILENAMES,
+    ) -> List["IgnoreFile"]:
+        ignore_files = []
+        for name in names:
+            try:
+                with open(
+                    os.path.join(directory, name), encoding="utf-8", errors="replace"
+                ) as f:
+                    ignore_file = cls(base, f, prefix)
+            except OSError:
+                continue
+            if ignore_file.rules:
+                ignore_files.append(ignore_file)
+        return ignore_files
+
+    @classmethod
+    def compile_rule(cls, line: str) -> Optional[Tuple[re.Pattern, bool, bool]]:
+        line = line.rstrip("\n").rstrip("\r")
+        if not line.endswith("\\ "):
+            line = line.rstrip(" ")
+        if not line or line.startswith("#"):
+            return None
+
+        negate = line.startswith("!")
+        if negate:
+            line = line[1:]
+        elif line.startswith("\\#") or line.startswith("\\!"):
+            line = line[1:]
+
+        dir_only = line.endswith("/")
+        line = line.rstrip("/")
+        if not line:
+            return None
+
+        anchored = "/" in line
+        line = line.lstrip("/")
+
+        regex = cls.translate(line)
+        if not anchored:
+            regex = "(?:.*/)?" + regex
+        return re.compile(regex, re.DOTALL), negate, dir_only
+
+    @staticmethod
+    def translate(pattern: str) -> str:
+        parts = []
+        i = 0
+        n = len(pattern)
+
+        while i < n:
+            c = pattern[i]
+            if c == "*":
+                if pattern.startswith("**/", i) and (i == 0 or pattern[i - 1] == "/"):
+                    parts.append("(?:.*/)?")
+                    i += 3
+                    continue
+                if pattern.startswith("**", i) and (i == 0 or pattern[i - 1] == "/"):
+                    parts.append(".*")
+                    i += 2
+                    continue
+                parts.append("[^/]*")
+            elif c == "?":
+                parts.append("[^/]")
+            elif c == "[":
+                j = pattern.find("]", i + 2)
+                if j == -1:
+                    parts.append(re.escape(c))
+                else:
+                    body = pattern[i + 1 : j].replace("\\", "\\\\")
+                    if body[0] in "!^":
+                        body = "^" + body[1:]
+                    parts.append(f"[{body}]")
+                    i = j
+            elif c == "\\" and i + 1 < n:
+                i += 1
+                parts.append(re.escape(pattern[i]))
+            else:
+                parts.append(re.escape(c))
+            i += 1
+
+        return "".join(parts)
+
+    def match(self, path: str, is_dir: bool) -> Optional[bool]:
+        relative = path[len(self.base) :].lstrip(os.sep)
+        if os.sep != "/":
+            relative = relative.replace(os.sep, "/")
+        if self.prefix:
+            relative = f"{self.prefix}/{relative}"
+
+        for regex, negate, dir_only in reversed(self.rules):
+            if dir_only and not is_dir:
+                continue
+            if regex.fullmatch(relative):
+                return not negate
+        return None
+
+
+class FileFinder:
+
+    DEFAULT_IGNORE_DIRS = {
+        "__pycache__",
+        "node_modules",
+        ".git",
+        ".svn",
+        ".hg",
+        ".idea",
+        ".vscode",
+        ".tox",
+        "venv",
+        ".env",
+        "venv",
+        "bin",
+        "env",
+        "dist",
+        "build",
+        "target",
+        "vendor",
+    }
+
+    DEFAULT_IGNORE_EXTENSIONS = {
+        ".pyc",
+        ".pyo",
+        ".pyd",
+        ".class",
+        ".jar",
+        ".o",
+        ".so",
+        ".dll",
+        ".exe",
+        ".bin",
+        ".zip",
+        ".tar",
+        ".gz",
+        ".DS_Store",
+        ".bz2",
+        ".7z",
+        ".rar",
+        ".jpg",
+        ".jpeg",
+        ".png",
+        ".gif",
+        ".bmp",
+        ".ico",
+        ".mp3",
+        ".mp4",
+        ".avi",
+        ".mov",
+        ".wmv",
+        ".pdf",
+        ".doc",
+        ".docx",
+        ".xls",
+        ".xlsx",
+        ".ppt",
+        ".pptx",
+        ".db",
+        ".sqlite",
+        ".sqlite3",
+        ".mdb",
+        ".bin",
+        ".dat",
+        ".pkl",
+        ".pickle",
+        ".cache",
+        ".log",
+    }
+
+    BINARY_SNIFF_BYTES = 8192
+
+    def __init__(
+        self,
+        file_pattern: Optional[str] = None,
+        ignore_dirs: Optional[Set[str]] = None,
+        ignore_extensions: Optional[Set[str]] = None,
+        no_ignore: bool = False,
+        skip_binary: bool = True,
+        threads: Optional[int] = None,
+    ):
+        self.pattern = re.compile(file_pattern) if file_pattern else None
+
+        self.ignore_dirs = (
+            set()
+            if no_ignore
+            else (ignore_dirs if ignore_dirs is not None else self.DEFAULT_IGNORE_DIRS)
+        )
+        self.ignore_extensions = (
+            set()
+            if no_ignore
+            else (
+                ignore_extensions
+                if ignore_extensions is not None
+                else self.DEFAULT_IGNORE_EXTENSIONS
+            )
+        )
+        self.use_ignore_files = not no_ignore
+        self.skip_binary = skip_binary
+        self.threads = threads
+
+    def should_process_file(self, file_path: str) -> bool:
+
+        return self.should_process_name(os.path.basename(file_path))
+
+    def should_process_name(self, name: str) -> bool:
+
+        stem = name.lstrip(".")
+        dot = stem.rfind(".")
+        if dot != -1 and stem[dot:].lower() in self.ignore_extensions:
+            return False
+
+        if self.pattern and not self.pattern.search(name):
+            return False
+
+        return True
+
+    def should_process_dir(self, dir_path: str) -> bool:
+
+        dir_name = os.path.basename(dir_path)
+        return dir_name not in self.ignore_dirs
+
+    @staticmethod
+    def is_ignored(ignore_files: Sequence[IgnoreFile], path: str, is_dir: bool) -> bool:
+
+        if not ignore_files:
+            return False
+        for ignore_file in reversed(ignore_files):
+            ignored = ignore_file.match(path, is_dir)
+            if ignored is not None:
+                return ignored
+        return False
+
+    @classmethod
+    def is_binary(cls, file_path: str) -> bool:
+
+        try:
+            with open(file_path, "rb") as f:
+                return b"\0" in f.read(cls.BINARY_SNIFF_BYTES)
+        except OSError:
+            return False
+
+    def parent_ignore_files(self, root: str) -> List[IgnoreFile]:
+
+        if not self.use_ignore_files:
+            return []
+
+        directory = os.path.abspath(root)
+        parents = []
+        while True:
+            if os.path.exists(os.path.join(directory, ".git")):
+                break
+            parent = os.path.dirname(directory)
+            if parent == directory:
+                return []
+            directory = parent
+            parents.append(directory)
+
+        top = os.path.abspath(root)
+        ignore_files = []
+        for parent in reversed(parents):
+            prefix = os.path.relpath(top, parent).replace(os.sep, "/")
+            ignore_files.extend(IgnoreFile.load(parent, root, prefix))
+        return ignore_files
+
+    def scan_dir(
+        self, dir_path: str, ignore_files: Tuple[IgnoreFile, ...]
+    ) -> Tuple[List[os.DirEntry], List[Tuple[str, Tuple]]]:
+
+        try:
+            with os.scandir(dir_path) as it:
+                entries = list(it)
+        except OSError:
+            return [], []
+
+        if self.use_ignore_files:
+            names = [e.name for e in entries if e.name in IgnoreFile.FILENAMES]
+            if names:
+                names.sort(key=IgnoreFile.FILENAMES.index)
+                ignore_files += tuple(IgnoreFile.load(dir_path, dir_path, "", names))
+
+        files = []
+        subdirs = []
+        for entry in entries:
+            try:
+                if entry.is_dir():
+                    if (
+                        entry.is_symlink()
+                        or entry.name in self.ignore_dirs
+                        or self.is_ignored(ignore_files, entry.path, True)
+                    ):
+                        continue
+                    subdirs.append((entry.path, ignore_files))
+                    continue
+
+                if not self.should_process_name(entry.name):
+                    continue
+                if self.is_ignored(ignore_files, entry.path, False):
+                    continue
+            except OSError:
+                continue
+
+            if self.skip_binary and self.is_binary(entry.path):
+                continue
+            files.append(entry)
+
+        return files, subdirs
+
+    def find_entries(self, path: str) -> Iterator[os.DirEntry]:
+
+        pool = ThreadPoolExecutor(self.threads)
+        try:
+            pending = [
+                pool.submit(self.scan_dir, path, tuple(self.parent_ignore_files(path)))
+            ]
+            while pending:
+                files, subdirs = pending.pop().result()
+                pending.extend(
+                    reversed(
+                        [
+                            pool.submit(self.scan_dir, subdir, ignore_files)
+                            for subdir, ignore_files in subdirs
+                        ]
+                    )
+                )
+                yield from files
+        finally:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    def find_file_stats(self, path: str) -> Iterator[Tuple[str, os.stat_result]]:
+
+        if os.path.isfile(path):
+            if self.should_process_file(path):
+                yield path, os.stat(path)
+            return
+
+        for entry in self.find_entries(path):
+            try:
+                yield entry.path, entry.stat()
+            except OSError:
+                continue
+
+    def find_files(self, path: str) -> Iterator[str]:
+
+        if os.path.isfile(path):
+            if self.should_process_file(path):
+                yield path
+            return
+
+        for entry in self.find_entries(path):
+            yield entry.path
+
+
+class ReadAheadReader:
+
+    def __init__(
+        self,
+        max_bytes: int = DEFAULT_READ_AHEAD_BYTES,
+        threads: Optional[int] = None,
+    ):
+        self.max_bytes = max_bytes
+        self.threads = threads or min(32, (os.cpu_count() or 1) + 4)
+
+    @staticmethod
+    def read_file(file_path: str) -> bytes:
+
+        with open(file_path, "rb") as f:
+            return f.read()
+
+    def read(
+        self,
+        file_paths: Iterable[str],
+        skip: Optional[Callable[[str], bool]] = None,
+    ) -> Iterator[Tuple[str, Optional["Future[bytes]"]]]:
+        # Reads of upcoming files run on the pool while the caller works on
+        # the current one. Files are handed back in the order given, and new
+        # reads wait while the bytes in flight would exceed the budget (one
+        # file is always admitted, so larger files still get read). Skipped
+        # files are passed through with no future.
+        pending: Deque[Tuple[str, int, Optional["Future[bytes]"]]] = deque()
+        in_flight = 0
+        pool = ThreadPoolExecutor(self.threads)
+        try:
+            for file_path in file_paths:
+                if skip is not None and skip(file_path):
+                    pending.append((file_path, 0, None))
+                    continue
+                try:
+                    size = os.stat(file_path).st_size
+                except OSError:
+                    size = 0
+
+                while pending and (
+                    in_flight + size > self.max_bytes
+                    or len(pending) >= 4 * self.threads
+                ):
+                    queued_path, queued_size, future = pending.popleft()
+                    in_flight -= queued_size
+                    yield queued_path, future
+
+                future = pool.submit(self.read_file, file_path)
+                pending.append((file_path, size, future))
+                in_flight += size
+
+            while pending:
+                queued_path, _, future = pending.popleft()
+                yield queued_path, future
+        finally:
+            pool.shutdown(wait=False, cancel_futures=True)
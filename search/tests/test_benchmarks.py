@@ -0,0 +1,90 @@
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(
+    0,
+    os.path.join(
+        os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks"
+    ),
+)
+
+from bench_search import bench_corpus, latency_stats, make_queries, percentile
+from corpus import cumulative_weights, generate_corpus, make_vocabulary
+
+
+class CorpusTest(unittest.TestCase):
+
+    def read(self, paths):
+        contents = []
+        for path in paths:
+            with open(path, encoding="utf-8") as f:
+                contents.append(f.read())
+        return contents
+
+    def test_corpus_is_deterministic_per_seed(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            first = generate_corpus(os.path.join(tmp, "a"), 3, 2000, seed=1)
+            again = generate_corpus(os.path.join(tmp, "b"), 3, 2000, seed=1)
+            other = generate_corpus(os.path.join(tmp, "c"), 3, 2000, seed=2)
+
+            self.assertEqual(self.read(first), self.read(again))
+            self.assertNotEqual(self.read(first), self.read(other))
+            for text in self.read(first):
+                self.assertGreaterEqual(len(text), 2000)
+                self.assertLess(len(text), 2100)
+
+    def test_vocabulary_and_weights(self):
+        vocabulary = make_vocabulary(300, seed=3)
+        self.assertEqual(len(set(vocabulary)), 300)
+        self.assertEqual(make_vocabulary(300, seed=3), vocabulary)
+        self.assertIsNone(cumulative_weights(10, "uniform"))
+        weights = cumulative_weights(10, "zipf")
+        self.assertEqual(weights, sorted(weights))
+        with self.assertRaises(ValueError):
+            cumulative_weights(10, "normal")
+
+
+class BenchSearchTest(unittest.TestCase):
+
+    def test_latency_percentiles(self):
+        latencies = [i / 1000 for i in range(1, 101)]
+        self.assertEqual(percentile(latencies, 0.5), 0.05)
+        self.assertEqual(percentile(latencies, 0.99), 0.099)
+        self.assertEqual(
+            latency_stats(latencies),
+            {"queries": 100, "p50_ms": 50.0, "p99_ms": 99.0, "mean_ms": 50.5},
+        )
+
+    def test_bench_corpus_reports_every_stage(self):
+        vocabulary = make_vocabulary(5000)
+        queries = make_queries(vocabulary, 3, 0)
+        with tempfile.TemporaryDirectory() as root:
+            generate_corpus(root, 4, 3000)
+            stages, _ = bench_corpus(root, queries, 10, 1)
+
+        self.assertEqual(
+            sorted(stages),
+            [
+                "highlight",
+                "index_build",
+                "index_load",
+                "index_query",
+                "index_save",
+                "read",
+                "search",
+                "tokenize.fast",
+                "tokenize.python",
+                "walk",
+            ],
+        )
+        self.assertEqual(stages["walk"]["files"], 4)
+        self.assertEqual(
+            stages["tokenize.fast"]["tokens"], stages["tokenize.python"]["tokens"]
+        )
+        self.assertEqual(stages["search"]["queries"], 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,97 @@
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sliding_window import LRUCache, MinimumWindowSearch
+from sliding_window.cache import content_key, file_key
+
+
+class LRUCacheTest(unittest.TestCase):
+
+    def test_evicts_least_recently_used_to_stay_in_budget(self):
+        cache = LRUCache(10)
+        cache.put("a", 1, 4)
+        cache.put("b", 2, 4)
+        self.assertEqual(cache.get("a"), 1)
+        cache.put("c", 3, 4)
+
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("a"), 1)
+        self.assertEqual(cache.get("c"), 3)
+        self.assertEqual(
+            cache.stats(),
+            {
+                "entries": 2,
+                "bytes": 8,
+                "max_bytes": 10,
+                "hits": 3,
+                "misses": 1,
+                "evictions": 1,
+            },
+        )
+
+    def test_replacing_a_key_updates_its_size(self):
+        cache = LRUCache(10)
+        cache.put("a", 1, 4)
+        cache.put("a", 2, 6)
+        self.assertEqual((cache.get("a"), cache.current_bytes, len(cache)), (2, 6, 1))
+
+    def test_entries_larger_than_the_budget_are_not_kept(self):
+        cache = LRUCache(10)
+        cache.put("a", 1, 4)
+        cache.put("a", 2, 11)
+        cache.put("b", 3, 11)
+        self.assertEqual((len(cache), cache.current_bytes), (0, 0))
+
+    def test_clear(self):
+        cache = LRUCache(10)
+        cache.put("a", 1, 4)
+        cache.clear()
+        self.assertEqual((len(cache), cache.current_bytes), (0, 0))
+
+
+class CacheKeyTest(unittest.TestCase):
+
+    def test_content_key_depends_on_text_only(self):
+        self.assertEqual(content_key("alpha"), content_key("alpha"))
+        self.assertNotEqual(content_key("alpha"), content_key("alpha "))
+        self.assertIsNotNone(content_key("\ud800 lone surrogate"))
+
+    def test_file_key_changes_with_the_file(self):
+        with tempfile.TemporaryDirectory() as root:
+            path = os.path.join(root, "a.txt")
+            self.assertIsNone(file_key(path))
+            with open(path, "w") as f:
+                f.write("alpha")
+            key = file_key(path)
+            self.assertEqual(file_key(path), key)
+            stat = os.stat(path)
+            os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+            self.assertNotEqual(file_key(path), key)
+
+
+class StrategyCacheBudgetTest(unittest.TestCase):
+
+    def test_search_caches_stay_within_budget(self):
+        search = MinimumWindowSearch(cache_bytes=4096)
+        texts = [" ".join(["alpha beta gamma"] * 50) + f" {i}" for i in range(20)]
+        for text in texts:
+            self.assertTrue(list(search.search(text, ["alpha", "gamma"], 5)))
+
+        for cache in (search.tokenizer.token_cache, search.term_positions):
+            self.assertLessEqual(cache.current_bytes, 4096)
+            self.assertGreater(cache.evictions, 0)
+        # Repeating the last text hits both caches.
+        hits = search.tokenizer.token_cache.hits, search.term_positions.hits
+        list(search.search(texts[-1], ["gamma", "alpha"], 5))
+        self.assertEqual(
+            (search.tokenizer.token_cache.hits, search.term_positions.hits),
+            (hits[0] + 1, hits[1] + 1),
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,83 @@
+import contextlib
+import io
+import os
+import random
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sliding_window import FileFinder, SearchService, WindowSearchCLI
+
+
+class WindowArgsTest(unittest.TestCase):
+
+    def parse(self, *argv):
+        return WindowSearchCLI().parse_args(["-q", "foo", *argv])
+
+    def assertRejected(self, *argv):
+        with contextlib.redirect_stderr(io.StringIO()):
+            with self.assertRaises(SystemExit):
+                self.parse(*argv)
+
+    def test_window_must_be_positive(self):
+        self.assertRejected("-w", "0")
+        self.assertRejected("-w", "-3")
+
+    def test_min_window_must_fit_in_window(self):
+        self.assertRejected("-w", "10", "--min-window", "20")
+        self.assertRejected("-w", "10", "--min-window", "0")
+
+    def test_valid_windows_are_accepted(self):
+        args = self.parse("-w", "30", "--min-window", "10")
+        self.assertEqual((args.window, args.min_window), (30, 10))
+
+
+class ServiceWindowTest(unittest.TestCase):
+
+    def test_min_window_above_window_finds_nothing(self):
+        with tempfile.TemporaryDirectory() as root:
+            with open(os.path.join(root, "a.txt"), "w") as f:
+                f.write("foo bar baz")
+            service = SearchService([root], FileFinder())
+
+            result = service.search(["foo", "bar"], 5, 10)
+            self.assertEqual(result["matches"], [])
+
+
+class SearchModeTest(unittest.TestCase):
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.root = tmp.name
+        rng = random.Random(3)
+        words = "alpha beta gamma delta eps zeta".split()
+        for i in range(12):
+            with open(os.path.join(self.root, f"f{i}.txt"), "w") as f:
+                f.write(" ".join(rng.choice(words) for _ in range(60)))
+
+    def matches(self, *argv):
+        cli = WindowSearchCLI()
+        args = cli.parse_args(
+            ["-f", self.root, "-q", "alpha", "beta", "--no-color", *argv]
+        )
+        with contextlib.redirect_stdout(io.StringIO()) as out:
+            cli.search(args)
+        # The summary line counts files skipped by the top-k bound, which
+        # depends on the order files finish in.
+        return out.getvalue().split("\n", 2)[2]
+
+    def test_jobs_find_the_same_matches(self):
+        for argv in (["-w", "3"], ["-w", "20", "--min-window", "2"]):
+            with self.subTest(argv=argv):
+                expected = self.matches("--max-results", "8", *argv)
+                self.assertIn("File:", expected)
+                self.assertEqual(
+                    self.matches("--max-results", "8", "-j", "2", *argv), expected
+                )
+
+
+if __name__ == "__main__":
+    unittest.main()
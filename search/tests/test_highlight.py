@@ -0,0 +1,79 @@
+import os
+import random
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sliding_window import (
+    FileFinder,
+    IndexSearch,
+    MatchCollector,
+    MinimumWindowSearch,
+    SearchIndex,
+    SearchMatch,
+    TextHighlighter,
+)
+
+
+def mark(text):
+    return f"\033[1;33m{text}\033[0m"
+
+
+class TextHighlighterTest(unittest.TestCase):
+
+    def test_recorded_spans_match_tokenizing_the_window(self):
+        rng = random.Random(6)
+        vocabulary = ["alpha", "Alpha", "alphabet", "beta", "gamma,", "(beta)", "é"]
+        highlighter = TextHighlighter()
+        for _ in range(300):
+            text = " ".join(rng.choice(vocabulary) for _ in range(rng.randint(0, 40)))
+            terms = rng.sample(["alpha", "beta", "é"], rng.randint(1, 2))
+            for match in MinimumWindowSearch().search(text, terms, rng.randint(1, 8)):
+                self.assertEqual(
+                    match.highlights,
+                    highlighter.find_highlights(match.text, terms),
+                    (text, terms),
+                )
+
+    def test_index_matches_record_the_same_spans(self):
+        with tempfile.TemporaryDirectory() as root:
+            with open(os.path.join(root, "a.txt"), "w") as f:
+                f.write("Alpha alphabet beta, gamma alpha (beta) delta")
+            index = SearchIndex.build(root, FileFinder())
+            search = IndexSearch(index, MinimumWindowSearch())
+            results = list(search.search(["alpha", "beta"], 3, None, MatchCollector(5)))
+
+        highlighter = TextHighlighter()
+        matches = [match for _, file_matches in results for match in file_matches]
+        self.assertTrue(matches)
+        for match in matches:
+            self.assertEqual(
+                match.highlights,
+                highlighter.find_highlights(match.text, ["alpha", "beta"]),
+            )
+
+    def test_highlights_whole_terms_only(self):
+        match = SearchMatch(3, 0, 20, "Alpha alphabet beta")
+        self.assertEqual(
+            TextHighlighter().highlight_match(match, ["alpha", "beta"]),
+            f"{mark('Alpha')} alphabet {mark('beta')}",
+        )
+
+    def test_overlapping_spans_are_merged(self):
+        match = SearchMatch(2, 0, 9, "abcdefghi", highlights=[(0, 3), (2, 5), (3, 4)])
+        self.assertEqual(
+            TextHighlighter().highlight_match(match, []),
+            f"{mark('abc')}{mark('de')}fghi",
+        )
+
+    def test_without_color_text_is_unchanged(self):
+        match = SearchMatch(1, 0, 5, "alpha", highlights=[(0, 5)])
+        self.assertEqual(
+            TextHighlighter(use_color=False).highlight_match(match, ["alpha"]), "alpha"
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
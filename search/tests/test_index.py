@@ -0,0 +1,271 @@
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sliding_window import (
+    FileFinder,
+    IndexSearch,
+    MinimumWindowSearch,
+    SearchIndex,
+    WindowSearchCLI,
+)
+
+
+class IndexTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.root = os.path.join(self.tmp.name, "docs")
+        self.index_path = os.path.join(self.tmp.name, "docs.idx")
+        os.mkdir(self.root)
+
+    def write(self, name: str, text: str, mtime_ns: int = 0):
+        path = os.path.join(self.root, name)
+        with open(path, "w") as f:
+            f.write(text)
+        if mtime_ns:
+            os.utime(path, ns=(mtime_ns, mtime_ns))
+        return path
+
+    def load(self) -> SearchIndex:
+        index = SearchIndex.load(self.index_path)
+        self.addCleanup(index.close)
+        return index
+
+    def files_by_name(self, index: SearchIndex):
+        return {
+            os.path.basename(indexed.path): indexed for indexed in index.files.values()
+        }
+
+    def postings_by_name(self, index: SearchIndex, term: str):
+        return {
+            os.path.basename(index.files[file_id].path): positions
+            for file_id, positions in index.postings.get(term, {}).items()
+        }
+
+
+class IndexRoundTripTest(IndexTestCase):
+
+    def test_saved_index_loads_the_same_postings(self):
+        self.write("a.txt", "alpha beta alpha")
+        self.write("b.txt", "beta gamma")
+        built = SearchIndex.build(self.root, FileFinder())
+        built.save(self.index_path)
+
+        index = self.load()
+        self.assertEqual(sorted(index.postings), ["alpha", "beta", "gamma"])
+        self.assertEqual(self.postings_by_name(index, "alpha"), {"a.txt": [0, 2]})
+        self.assertEqual(
+            self.postings_by_name(index, "beta"), {"a.txt": [1], "b.txt": [0]}
+        )
+        a = self.files_by_name(index)["a.txt"]
+        self.assertEqual(a.token_count, 3)
+        file_id = next(i for i, f in index.files.items() if f is a)
+        self.assertEqual(list(index.token_offsets(file_id)[0]), [0, 6, 11])
+
+    def test_update_applies_added_changed_and_removed_files(self):
+        self.write("a.txt", "alpha beta")
+        self.write("b.txt", "beta gamma")
+        self.write("c.txt", "gamma omega")
+        SearchIndex.build(self.root, FileFinder()).save(self.index_path)
+
+        self.write("a.txt", "alpha epsilon alpha")
+        os.remove(os.path.join(self.root, "c.txt"))
+        self.write("d.txt", "delta beta")
+        index = SearchIndex.load(self.index_path)
+        counts = index.update(FileFinder())
+        index.save(self.index_path)
+        index.close()
+
+        self.assertEqual(
+            (counts["added"], counts["changed"], counts["removed"]), (1, 1, 1)
+        )
+        index = self.load()
+        self.assertEqual(sorted(self.files_by_name(index)), ["a.txt", "b.txt", "d.txt"])
+        self.assertEqual(self.postings_by_name(index, "alpha"), {"a.txt": [0, 2]})
+        self.assertEqual(
+            self.postings_by_name(index, "beta"), {"b.txt": [0], "d.txt": [1]}
+        )
+        self.assertEqual(self.postings_by_name(index, "delta"), {"d.txt": [0]})
+
+
+class IndexCommandTest(IndexTestCase):
+
+    def run_index(self, *argv):
+        cli = WindowSearchCLI()
+        args = cli.parse_args(["index", self.root, "-o", self.index_path, *argv])
+        with contextlib.redirect_stdout(io.StringIO()) as out:
+            cli.build_index(args)
+        return out.getvalue()
+
+    def test_update_without_changes_leaves_the_file_alone(self):
+        self.write("a.txt", "alpha beta")
+        self.run_index()
+        before = os.stat(self.index_path)
+
+        output = self.run_index("-u")
+        after = os.stat(self.index_path)
+        self.assertIn("0 added, 0 changed, 0 removed, 1 unchanged", output)
+        self.assertEqual(
+            (before.st_ino, before.st_mtime_ns), (after.st_ino, after.st_mtime_ns)
+        )
+
+    def test_update_with_changes_is_saved(self):
+        self.write("a.txt", "alpha beta")
+        self.run_index()
+        self.write("b.txt", "gamma")
+
+        self.assertIn("1 added", self.run_index("-u"))
+        self.assertEqual(self.postings_by_name(self.load(), "gamma"), {"b.txt": [0]})
+
+    def test_touched_mtime_is_saved(self):
+        self.write("a.txt", "alpha beta", 10**18)
+        self.run_index("--hash")
+        self.write("a.txt", "alpha beta", 2 * 10**18)
+
+        self.run_index("-u", "--hash")
+        self.assertEqual(self.files_by_name(self.load())["a.txt"].mtime_ns, 2 * 10**18)
+
+
+class IndexAppendTest(IndexTestCase):
+
+    def update(self):
+        index = SearchIndex.load(self.index_path)
+        changes = index.diff(FileFinder())
+        index.save_changes(self.index_path, changes)
+        index.close()
+        return changes.counts
+
+    def assertMatchesFreshBuild(self):
+        index = self.load()
+        fresh = SearchIndex.build(self.root, FileFinder())
+        self.assertEqual(sorted(index.postings), sorted(fresh.postings))
+        self.assertEqual(len(index.postings), len(fresh.postings))
+        for term in fresh.postings:
+            self.assertEqual(
+                self.postings_by_name(index, term), self.postings_by_name(fresh, term)
+            )
+        for file_id, indexed in index.files.items():
+            fresh_id = next(i for i, f in fresh.files.items() if f.path == indexed.path)
+            self.assertEqual(
+                [list(offsets) for offsets in index.token_offsets(file_id)],
+                [list(offsets) for offsets in fresh.token_offsets(fresh_id)],
+            )
+            self.assertEqual(
+                sorted(index.file_terms(file_id)), sorted(fresh.file_terms(fresh_id))
+            )
+        return index
+
+    def test_updates_append_segments(self):
+        self.write("a.txt", "alpha beta")
+        self.write("b.txt", "beta gamma")
+        self.write("c.txt", "gamma omega")
+        SearchIndex.build(self.root, FileFinder()).save(self.index_path)
+        size = os.path.getsize(self.index_path)
+
+        self.write("a.txt", "alpha epsilon alpha")
+        self.update()
+        self.assertGreater(os.path.getsize(self.index_path), size)
+        os.remove(os.path.join(self.root, "c.txt"))
+        self.write("d.txt", "delta zeta")
+        self.update()
+
+        index = self.assertMatchesFreshBuild()
+        self.assertEqual(len(index.packed.segments), 3)
+        self.assertNotIn("omega", index.postings)
+        index.unpack()
+        self.assertEqual(self.postings_by_name(index, "zeta"), {"d.txt": [1]})
+
+    def test_interrupted_append_is_ignored_and_overwritten(self):
+        self.write("a.txt", "alpha beta")
+        SearchIndex.build(self.root, FileFinder()).save(self.index_path)
+        with open(self.index_path, "ab") as f:
+            f.write(b"SWIX partial segment")
+
+        self.assertEqual(self.postings_by_name(self.load(), "alpha"), {"a.txt": [0]})
+        self.write("b.txt", "alpha")
+        self.update()
+        self.assertMatchesFreshBuild()
+
+    def test_many_segments_are_compacted(self):
+        self.write("a.txt", "alpha")
+        SearchIndex.build(self.root, FileFinder()).save(self.index_path)
+        for i in range(SearchIndex.MAX_SEGMENTS + 1):
+            self.write(f"f{i}.txt", f"beta term{i}")
+            self.update()
+
+        index = self.assertMatchesFreshBuild()
+        self.assertLess(len(index.packed.segments), SearchIndex.MAX_SEGMENTS)
+
+
+class StaleFileSearchTest(IndexTestCase):
+
+    def search(self, *terms):
+        index = SearchIndex.build(self.root, FileFinder())
+        return lambda: {
+            os.path.basename(path): [match.text for match in matches]
+            for path, matches in IndexSearch(index, MinimumWindowSearch()).search(
+                list(terms), 2
+            )
+        }
+
+    def test_file_edited_to_contain_the_terms_is_found(self):
+        self.write("a.txt", "alpha beta", 10**18)
+        self.write("b.txt", "gamma delta", 10**18)
+        search = self.search("gamma", "zeta")
+        self.assertEqual(search(), {})
+
+        self.write("b.txt", "gamma zeta", 2 * 10**18)
+        with contextlib.redirect_stderr(io.StringIO()):
+            self.assertEqual(search(), {"b.txt": ["gamma zeta"]})
+
+    def test_file_edited_to_lose_the_terms_is_not_reported(self):
+        self.write("a.txt", "alpha beta", 10**18)
+        search = self.search("alpha", "beta")
+        self.assertEqual(search(), {"a.txt": ["alpha beta"]})
+
+        self.write("a.txt", "alpha gamma", 2 * 10**18)
+        with contextlib.redirect_stderr(io.StringIO()):
+            self.assertEqual(search(), {})
+
+
+class IndexDigestTest(IndexTestCase):
+
+    def test_update_without_hash_keeps_digests(self):
+        self.write("a.txt", "alpha beta", 10**18)
+        self.write("b.txt", "beta gamma", 10**18)
+        SearchIndex.build(self.root, FileFinder(), use_hash=True).save(
+            self.index_path
+        )
+
+        self.write("a.txt", "alpha beta delta", 2 * 10**18)
+        index = SearchIndex.load(self.index_path)
+        index.update(FileFinder())
+        index.save(self.index_path)
+        index.close()
+
+        files = self.files_by_name(self.load())
+        self.assertIsNotNone(files["a.txt"].digest)
+        self.assertIsNotNone(files["b.txt"].digest)
+
+    def test_touched_file_with_digest_is_not_reindexed(self):
+        self.write("a.txt", "alpha beta", 10**18)
+        SearchIndex.build(self.root, FileFinder(), use_hash=True).save(
+            self.index_path
+        )
+
+        self.write("a.txt", "alpha beta", 2 * 10**18)
+        index = SearchIndex.load(self.index_path)
+        counts = index.update(FileFinder(), use_hash=True)
+        index.close()
+        self.assertEqual((counts["changed"], counts["unchanged"]), (0, 1))
+
+
+if __name__ == "__main__":
+    unittest.main()
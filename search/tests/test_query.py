@@ -0,0 +1,135 @@
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sliding_window import (
+    FileFinder,
+    MinimumWindowSearch,
+    QueryClause,
+    QueryError,
+    QueryExecutor,
+    QueryParser,
+    QuerySearch,
+    QueryTerm,
+    SearchIndex,
+)
+
+
+class QueryParserTest(unittest.TestCase):
+
+    def parse(self, expression):
+        return QueryParser().parse(expression)
+
+    def test_terms_are_anded_into_slots(self):
+        self.assertEqual(
+            self.parse("Alpha beta"),
+            [
+                QueryClause(
+                    [(QueryTerm("term", ("alpha",)),), (QueryTerm("term", ("beta",)),)]
+                )
+            ],
+        )
+
+    def test_operators(self):
+        [clause] = self.parse('"big data" optim* color~2 -legacy')
+        self.assertEqual(
+            clause.slots,
+            [
+                (QueryTerm("phrase", ("big", "data")),),
+                (QueryTerm("prefix", ("optim",)),),
+                (QueryTerm("fuzzy", ("color",), 2),),
+            ],
+        )
+        self.assertEqual(clause.excluded, [QueryTerm("term", ("legacy",))])
+
+    def test_or_of_single_terms_is_one_slot(self):
+        [clause] = self.parse("alpha OR beta")
+        self.assertEqual(
+            clause.slots,
+            [(QueryTerm("term", ("alpha",)), QueryTerm("term", ("beta",)))],
+        )
+
+    def test_or_distributes_over_and(self):
+        clauses = self.parse("(alpha beta OR gamma) delta")
+        self.assertEqual(
+            [[QueryClause.label(slot) for slot in clause.slots] for clause in clauses],
+            [["alpha", "beta", "delta"], ["gamma", "delta"]],
+        )
+
+    def test_invalid_expressions(self):
+        invalid = ["", "NOT alpha", "(alpha", '"alpha', "alpha OR", '"" alpha']
+        for expression in invalid:
+            with self.subTest(expression=expression):
+                with self.assertRaises(QueryError):
+                    self.parse(expression)
+
+
+class QuerySearchTest(unittest.TestCase):
+
+    TEXTS = {
+        "a.txt": "big data pipelines optimize throughput",
+        "b.txt": "data is big but pipelines are legacy",
+        "c.txt": "colour theory for optimal palettes",
+    }
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.root = tmp.name
+        for name, text in self.TEXTS.items():
+            self.write(name, text, 10**18)
+
+    def write(self, name, text, mtime_ns):
+        path = os.path.join(self.root, name)
+        with open(path, "w") as f:
+            f.write(text)
+        os.utime(path, ns=(mtime_ns, mtime_ns))
+
+    def search(self, expression, window=4, index=None):
+        if index is None:
+            index = SearchIndex.build(self.root, FileFinder())
+        executor = QueryExecutor(index, QueryParser().parse(expression))
+        return {
+            os.path.basename(path): sorted(match.text for match in matches)
+            for path, matches in QuerySearch(executor, MinimumWindowSearch()).search(
+                window
+            )
+        }
+
+    def test_phrase_needs_adjacent_words(self):
+        self.assertEqual(self.search('"big data"'), {"a.txt": ["big data"]})
+
+    def test_prefix_and_fuzzy(self):
+        self.assertEqual(
+            self.search("optim* pipelines"),
+            {"a.txt": ["pipelines optimize"]},
+        )
+        self.assertEqual(self.search("color~1 theory"), {"c.txt": ["colour theory"]})
+
+    def test_or_and_not(self):
+        self.assertEqual(
+            sorted(self.search("pipelines (big OR legacy)")), ["a.txt", "b.txt"]
+        )
+        self.assertEqual(
+            sorted(self.search("pipelines big NOT legacy")), ["a.txt"]
+        )
+
+    def test_file_edited_to_match_is_found(self):
+        index = SearchIndex.build(self.root, FileFinder())
+        self.assertEqual(self.search('"optimal palettes" colour', index=index), {})
+
+        self.write("b.txt", "optimal palettes in colour", 2 * 10**18)
+        with contextlib.redirect_stderr(io.StringIO()):
+            self.assertEqual(
+                self.search('"optimal palettes" colour', index=index),
+                {"b.txt": ["optimal palettes in colour"]},
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,79 @@
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sliding_window import (
+    BM25Scorer,
+    CorpusStats,
+    FileFinder,
+    MinimumWindowSearch,
+    QueryExecutor,
+    QueryParser,
+    QuerySearch,
+    SearchIndex,
+    TokenWindow,
+    WindowScorer,
+)
+
+
+class BM25OverlappingSlotsTest(unittest.TestCase):
+
+    def test_overlapping_slots_stay_within_upper_bound(self):
+        scorer = BM25Scorer(CorpusStats(10, 20.0, {"foo": 3, "bar": 2, "foo*": 4}))
+        term_positions = {"foo": [5], "bar": [6], "foo*": [5]}
+        windows = [(2, TokenWindow(5, 6, 5, 6, [2]))]
+
+        [score] = scorer.score_windows(
+            windows, term_positions, ["foo", "bar", "foo*"], 20
+        )
+        bound = scorer.upper_bound([2], {"foo": 1, "bar": 1, "foo*": 1}, 20)
+        self.assertGreater(score, 0.0)
+        self.assertLessEqual(score, bound)
+
+    def test_query_scores_stay_within_file_bounds(self):
+        texts = [
+            "foo bar baz qux",
+            "foo foobar bar foo food quux",
+            "foolish idea with foo in it and more words after",
+        ]
+        with tempfile.TemporaryDirectory() as root:
+            for i, text in enumerate(texts):
+                with open(os.path.join(root, f"doc{i}.txt"), "w") as f:
+                    f.write(text)
+            index = SearchIndex.build(root, FileFinder())
+
+            executor = QueryExecutor(index, QueryParser().parse("foo bar foo*"))
+            stats = CorpusStats.from_index(index, [])
+            stats.document_frequency = executor.document_frequency()
+            scorer = BM25Scorer(stats)
+            search = QuerySearch(executor, MinimumWindowSearch(scorer=scorer))
+
+            checked = 0
+            for file_id, clause_ids in executor.candidate_files().items():
+                bound = scorer.upper_bound(
+                    [1, 2, 3],
+                    executor.occurrence_bounds(file_id, clause_ids),
+                    index.files[file_id].token_count,
+                )
+                matches = search.search_file(executor, file_id, clause_ids, [1, 2, 3])
+                for match in matches:
+                    self.assertLessEqual(match.score, bound + 1e-9)
+                    checked += 1
+            self.assertGreater(checked, 0)
+
+
+class WindowScorerBoundTest(unittest.TestCase):
+
+    def test_bound_is_zero_without_usable_sizes(self):
+        self.assertEqual(WindowScorer().upper_bound([]), 0.0)
+        self.assertEqual(WindowScorer().upper_bound([0]), 0.0)
+
+    def test_bound_uses_smallest_size(self):
+        self.assertEqual(WindowScorer().upper_bound([20, 4, 10]), 0.25)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,96 @@
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sliding_window import FileFinder, SearchService
+
+
+class SearchServiceRefreshTest(unittest.TestCase):
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.root = tmp.name
+        self.write("a.txt", "alpha beta gamma")
+        self.write("b.txt", "alpha delta")
+        self.service = SearchService([self.root], FileFinder())
+        self.addCleanup(self.service.close)
+
+    def write(self, name, content):
+        path = os.path.join(self.root, name)
+        existed = os.path.exists(path)
+        with open(path, "w") as f:
+            f.write(content)
+        if existed:
+            # Make the change visible even when the clock has not ticked.
+            stat = os.stat(path)
+            os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+    def found(self, *terms):
+        result = self.service.search(list(terms), 2)
+        return sorted(
+            os.path.basename(match["file_path"]) for match in result["matches"]
+        )
+
+    def test_refresh_picks_up_added_changed_and_removed_files(self):
+        self.assertEqual(self.found("alpha"), ["a.txt", "b.txt"])
+
+        self.write("c.txt", "alpha omega")
+        self.write("a.txt", "epsilon zeta")
+        os.remove(os.path.join(self.root, "b.txt"))
+        counts = self.service.refresh()
+
+        self.assertEqual(
+            counts, {"added": 1, "changed": 1, "removed": 1, "unchanged": 0}
+        )
+        self.assertEqual(self.found("alpha"), ["c.txt"])
+        self.assertEqual(self.found("epsilon"), ["a.txt"])
+        self.assertEqual(self.found("delta"), [])
+        status = self.service.status()
+        self.assertEqual(status["files"], 2)
+        self.assertEqual(status["refreshed"], {"added": 1, "changed": 1, "removed": 1})
+
+    def test_refresh_without_changes_keeps_indexes(self):
+        indexes = self.service.indexes
+        counts = self.service.refresh()
+        self.assertEqual(
+            counts, {"added": 0, "changed": 0, "removed": 0, "unchanged": 2}
+        )
+        self.assertIs(self.service.indexes, indexes)
+
+    def test_refresh_leaves_earlier_snapshot_untouched(self):
+        indexes = self.service.indexes
+        index = indexes[0]
+        files = dict(index.files)
+
+        self.write("a.txt", "epsilon zeta")
+        os.remove(os.path.join(self.root, "b.txt"))
+        self.service.refresh()
+
+        self.assertIsNot(self.service.indexes, indexes)
+        self.assertIs(indexes[0], index)
+        self.assertEqual(index.files, files)
+        self.assertIn("alpha", index.postings)
+        self.assertEqual(self.found("alpha"), [])
+
+    def test_handle_parses_requests(self):
+        result = self.service.handle({"q": "alpha beta", "w": "2"})
+        self.assertEqual(result["query"], ["alpha", "beta"])
+        self.assertEqual(len(result["matches"]), 1)
+
+        result = self.service.handle({"expr": '"alpha delta"', "window": 2})
+        self.assertEqual(
+            [os.path.basename(m["file_path"]) for m in result["matches"]], ["b.txt"]
+        )
+
+        for request in ({}, {"q": [1]}, {"q": "alpha", "scorer": "nope"}):
+            with self.subTest(request=request):
+                with self.assertRaises(ValueError):
+                    self.service.handle(request)
+
+
+if __name__ == "__main__":
+    unittest.main()
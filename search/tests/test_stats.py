@@ -0,0 +1,87 @@
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sliding_window import PipelineStats, stage_timer, WindowSearchCLI
+
+
+class PipelineStatsTest(unittest.TestCase):
+
+    def test_nested_stages_charge_time_to_the_inner_stage(self):
+        stats = PipelineStats()
+        with stats.stage("outer"):
+            with stats.stage("inner"):
+                time.sleep(0.05)
+
+        self.assertGreaterEqual(stats.stages["inner"].wall, 0.05)
+        self.assertLess(stats.stages["outer"].wall, 0.05)
+        self.assertEqual(stats.stages["outer"].calls, 1)
+        self.assertEqual(stats.stages["inner"].calls, 1)
+
+    def test_iterate_times_each_step(self):
+        stats = PipelineStats()
+        self.assertEqual(list(stats.iterate("walk", range(3))), [0, 1, 2])
+        # Three items plus the call that finds the iterator exhausted.
+        self.assertEqual(stats.stages["walk"].calls, 4)
+
+    def test_merge_adds_worker_stats(self):
+        worker = PipelineStats()
+        with worker.stage("tokenize"):
+            pass
+        worker.count("tokens", 5)
+
+        stats = PipelineStats()
+        with stats.stage("tokenize"):
+            pass
+        stats.count("tokens", 2)
+        stats.merge(worker.to_dict())
+
+        self.assertEqual(stats.stages["tokenize"].calls, 2)
+        self.assertEqual(stats.counters["tokens"], 7)
+        stats.reset()
+        self.assertEqual(stats.to_dict(), {"stages": {}, "counters": {}})
+
+    def test_format_lists_stages_total_and_counters(self):
+        stats = PipelineStats()
+        with stage_timer(stats, "read"):
+            pass
+        stats.count("files_read", 3)
+        lines = stats.format().splitlines()
+        self.assertEqual(lines[0].split()[:2], ["Stage", "Calls"])
+        self.assertEqual(lines[1].split()[:2], ["read", "1"])
+        self.assertEqual(lines[2].split()[0], "total")
+        self.assertEqual(lines[-1].split(), ["files_read", "3"])
+
+    def test_stage_timer_without_stats_does_nothing(self):
+        with stage_timer(None, "read"):
+            pass
+
+
+class StatsOptionTest(unittest.TestCase):
+
+    def test_stats_are_printed_to_stderr(self):
+        with tempfile.TemporaryDirectory() as root:
+            with open(os.path.join(root, "a.txt"), "w") as f:
+                f.write("alpha beta gamma")
+            argv = ["prog", "-f", root, "-q", "alpha", "beta", "-w", "2", "--stats"]
+            with contextlib.ExitStack() as stack:
+                stack.enter_context(mock.patch.object(sys, "argv", argv))
+                out = stack.enter_context(contextlib.redirect_stdout(io.StringIO()))
+                err = stack.enter_context(contextlib.redirect_stderr(io.StringIO()))
+                WindowSearchCLI().run()
+
+        self.assertIn("alpha", out.getvalue())
+        self.assertIn("Pipeline stats:", err.getvalue())
+        for name in ("walk", "tokenize", "files_searched", "tokens"):
+            self.assertIn(name, err.getvalue())
+
+
+if __name__ == "__main__":
+    unittest.main()
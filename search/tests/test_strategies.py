@@ -0,0 +1,121 @@
+import os
+import random
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sliding_window import MinimumWindowSearch, SlidingWindowSearch, TextTokenizer
+
+
+VOCABULARY = "alpha beta gamma delta eps zeta".split()
+
+
+def random_cases(seed, count, max_tokens=60, max_window=15):
+    rng = random.Random(seed)
+    for _ in range(count):
+        text = " ".join(
+            rng.choice(VOCABULARY) + rng.choice(["", "", ",", "."])
+            for _ in range(rng.randint(0, max_tokens))
+        )
+        terms = rng.sample(VOCABULARY[:4], rng.randint(1, 3))
+        yield text, terms, rng.randint(1, max_window)
+
+
+def covers(tokens, terms, first, last):
+    return set(terms) <= {tokens[i].normalized for i in range(first, last + 1)}
+
+
+class MinimumWindowSearchTest(unittest.TestCase):
+
+    def windows(self, strategy, text, terms, window_size):
+        return [
+            (match.start_pos, match.end_pos, match.text)
+            for match in strategy.search(text, terms, window_size)
+        ]
+
+    def test_finds_the_same_windows_as_sliding_search(self):
+        for text, terms, window_size in random_cases(1, 500):
+            with self.subTest(text=text, terms=terms, window_size=window_size):
+                self.assertEqual(
+                    self.windows(MinimumWindowSearch(), text, terms, window_size),
+                    self.windows(SlidingWindowSearch(), text, terms, window_size),
+                )
+
+    def test_span_is_the_shortest_cover_inside_the_window(self):
+        for text, terms, window_size in random_cases(2, 300):
+            tokens = TextTokenizer(use_cache=False).tokenize(text)
+            for match in MinimumWindowSearch().search(text, terms, window_size):
+                inside = [
+                    i
+                    for i, token in enumerate(tokens)
+                    if match.start_pos <= token.start and token.end <= match.end_pos
+                ]
+                shortest = min(
+                    last - first + 1
+                    for first in inside
+                    for last in inside
+                    if first <= last and covers(tokens, terms, first, last)
+                )
+                self.assertEqual(match.span_length, shortest, (text, terms, match))
+                span = [
+                    token.normalized
+                    for token in tokens
+                    if match.span_start <= token.start and token.end <= match.span_end
+                ]
+                self.assertEqual(len(span), match.span_length)
+                self.assertIn(span[0], terms)
+                self.assertIn(span[-1], terms)
+
+    def test_repeated_terms_and_case(self):
+        text = "Alpha x x beta alpha"
+        terms = ["ALPHA", "alpha", "Beta"]
+        matches = list(MinimumWindowSearch().search(text, terms, 3))
+        self.assertEqual([match.text for match in matches], ["x beta alpha"])
+        self.assertEqual(matches[0].span_length, 2)
+
+
+class WindowSizeSweepTest(unittest.TestCase):
+
+    def test_window_sizes_step_from_min_window(self):
+        self.assertEqual(SlidingWindowSearch.window_sizes(50, None), [50])
+        self.assertEqual(SlidingWindowSearch.window_sizes(35, 5), [5, 15, 25, 35])
+        self.assertEqual(SlidingWindowSearch.window_sizes(7, 7), [7])
+
+    def test_sweep_reports_every_minimal_cover_with_the_sizes_it_fits(self):
+        for text, terms, window_size in random_cases(3, 300, max_window=40):
+            min_window = random.Random(text).randint(1, window_size)
+            sizes = SlidingWindowSearch.window_sizes(window_size, min_window)
+            tokens = TextTokenizer(use_cache=False).tokenize(text)
+
+            # A cover is minimal when it is the shortest one from its first
+            # token and dropping that token loses a term.
+            expected = []
+            for first in range(len(tokens)):
+                last = next(
+                    (
+                        last
+                        for last in range(first, len(tokens))
+                        if covers(tokens, terms, first, last)
+                    ),
+                    None,
+                )
+                if last is None or (
+                    first < last and covers(tokens, terms, first + 1, last)
+                ):
+                    continue
+                length = last - first + 1
+                fits = [size for size in sizes if length <= size <= len(tokens)]
+                if fits:
+                    expected.append((tokens[first].start, length, fits[0], fits))
+
+            matches = MinimumWindowSearch().search_window_sizes(text, terms, sizes)
+            found = [
+                (m.start_pos, m.span_length, m.window_size, m.window_sizes)
+                for m in matches
+            ]
+            self.assertEqual(sorted(found), sorted(expected), (text, terms, sizes))
+
+
+if __name__ == "__main__":
+    unittest.main()
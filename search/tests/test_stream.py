@@ -0,0 +1,123 @@
+import io
+import os
+import random
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sliding_window import (
+    MinimumWindowSearch,
+    StreamingWindowSearch,
+    TermPrefilter,
+    TextTokenizer,
+    WindowSearchCLI,
+)
+
+
+def fields(matches):
+    return [
+        (m.start_pos, m.end_pos, m.text, m.span_start, m.span_end, m.span_length)
+        for m in matches
+    ]
+
+
+class StreamingWindowSearchTest(unittest.TestCase):
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.path = os.path.join(tmp.name, "input.txt")
+
+    def write(self, data):
+        with open(self.path, "wb") as f:
+            f.write(data)
+
+    def test_matches_the_in_memory_search_for_ascii_text(self):
+        rng = random.Random(11)
+        vocabulary = "a b c dd ee Ff".split()
+        for _ in range(300):
+            text = " ".join(
+                rng.choice(vocabulary) + rng.choice(["", ",", "\n"])
+                for _ in range(rng.randint(0, 60))
+            )
+            terms = rng.sample(["a", "b", "c", "ff"], rng.randint(1, 3))
+            window_size = rng.randint(1, 12)
+            chunk_size = rng.randint(1, 8)
+            with self.subTest(text=text, terms=terms, window_size=window_size):
+                expected = fields(
+                    MinimumWindowSearch().search(text, terms, window_size)
+                )
+                search = StreamingWindowSearch(terms, window_size)
+                stream = io.BytesIO(text.encode())
+                self.assertEqual(
+                    fields(search.search_stream(stream, chunk_size)), expected
+                )
+                self.write(text.encode())
+                self.assertEqual(fields(search.search_file(self.path)), expected)
+
+    def test_offsets_are_bytes_and_highlights_need_ascii(self):
+        data = "café alpha beta".encode()
+        self.write(data)
+        search = StreamingWindowSearch(["alpha", "beta"], 2)
+        (match,) = search.search_file(self.path)
+        self.assertTrue(match.byte_offsets)
+        self.assertEqual(data[match.start_pos : match.end_pos], b"alpha beta")
+        self.assertEqual(match.highlights, [(0, 5), (6, 10)])
+
+        (match,) = StreamingWindowSearch(["café", "alpha"], 2).search_file(self.path)
+        self.assertEqual(match.text, "café alpha")
+        self.assertIsNone(match.highlights)
+
+    def test_empty_file_and_early_close(self):
+        search = StreamingWindowSearch(["a"], 1)
+        self.write(b"")
+        self.assertEqual(list(search.search_file(self.path)), [])
+
+        self.write(b"a b a b a")
+        matches = search.search_file(self.path)
+        next(matches)
+        # Closing mid-file must release the mapping without raising.
+        matches.close()
+
+
+class TermPrefilterTest(unittest.TestCase):
+
+    def test_every_term_must_appear_in_any_case(self):
+        prefilter = TermPrefilter(["Alpha", "beta"])
+        self.assertTrue(prefilter.may_match(b"xx BETA yy alpha"))
+        self.assertFalse(prefilter.may_match(b"xx BETA yy alph"))
+
+    def test_non_ascii_spellings_of_ascii_terms_pass(self):
+        # Kelvin sign and dotted capital I lowercase to "k" and "i" plus a mark.
+        self.assertTrue(TermPrefilter(["kb"]).may_match("\u212ab".encode()))
+        self.assertTrue(TermPrefilter(["ix"]).may_match("\u0130x".encode()))
+        self.assertFalse(TermPrefilter(["kb"]).may_match(b"KX"))
+        self.assertFalse(TermPrefilter(["ab"]).may_match("\u212a caf\xe9".encode()))
+
+    def test_non_ascii_terms_are_not_filtered(self):
+        self.assertTrue(TermPrefilter(["été"]).may_match(b"nothing"))
+        self.assertTrue(TermPrefilter([]).may_match(b"nothing"))
+
+    def test_never_drops_text_the_tokenizer_matches(self):
+        rng = random.Random(4)
+        pieces = ["kb", "KB", "\u212ab", "\u0130x", "ix", "ÉTÉ", "été", "ab", "z"]
+        for _ in range(500):
+            text = " ".join(rng.choice(pieces) for _ in range(rng.randint(0, 6)))
+            terms = rng.sample(["kb", "ix", "été", "ab"], rng.randint(1, 2))
+            tokens = {token.normalized for token in TextTokenizer().tokenize(text)}
+            if set(terms) <= tokens:
+                self.assertTrue(
+                    TermPrefilter(terms).may_match(text.encode()), (text, terms)
+                )
+
+    def test_cli_skips_decoding_filtered_files(self):
+        cli = WindowSearchCLI()
+        prefilter = TermPrefilter(["alpha"])
+        self.assertIsNone(cli.decode_file(b"beta gamma", prefilter))
+        self.assertEqual(cli.decode_file(b"ALPHA beta", prefilter), "ALPHA beta")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,95 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sliding_window import (
+    FastTokenizer,
+    TermDictionary,
+    TextTokenizer,
+    Token,
+)
+
+
+SAMPLES = [
+    "",
+    "   ",
+    "Hello, world!",
+    "one.two,three;four:five!six?seven",
+    '"quoted" (parens) [brackets] {braces} it\'s',
+    "tabs\tnew\nlines\r\nno-break\u00a0em\u2003ideographic\u3000space",
+    "trailing punctuation...",
+    "Straße ÉCOLE naïve",
+    "ΣΑΣ ΟΔΥΣΣΕΥΣ ὈΔΥΣΣΕΎΣ",
+    "ΣΑΣ, Σ. aΣb ΑΣ ΣΑ",
+    "ΑΣ'Α ΟΔΥΣΣΕΥΣ.ΙΘΑΚΗ",
+    "İstanbul ǅemal ﬁne",
+    "\U0001d400\U0001d401 emoji \U0001f600 wide",
+]
+
+
+class TokenizerParityTest(unittest.TestCase):
+
+    def split(self, tokenizer, text):
+        tokens = tokenizer(use_cache=False).tokenize(text)
+        return [(token.start, token.end, token.normalized) for token in tokens]
+
+    def test_fast_tokenizer_matches_python_tokenizer(self):
+        for text in SAMPLES:
+            with self.subTest(text=text):
+                self.assertEqual(
+                    self.split(FastTokenizer, text), self.split(TextTokenizer, text)
+                )
+
+    def test_capital_sigma_is_normalized_per_token(self):
+        # Lowercasing the whole text would give medial sigmas here, since the
+        # apostrophe and full stop do not end a word for str.lower().
+        tokens = FastTokenizer(use_cache=False).tokenize("ΣΑΣ'Α ὈΔΥΣΣΕΎΣ.ΙΘΑΚΗ")
+        self.assertEqual(
+            [token.normalized for token in tokens], ["σας", "α", "ὀδυσσεύς", "ιθακη"]
+        )
+
+    def test_offsets_survive_characters_that_expand_when_lowercased(self):
+        text = "İİ alpha"
+        tokens = FastTokenizer(use_cache=False).tokenize(text)
+        self.assertEqual(tokens[1].text, "alpha")
+        self.assertEqual(text[tokens[1].start : tokens[1].end], "alpha")
+
+    def test_cached_tokens_are_reused(self):
+        tokenizer = FastTokenizer()
+        self.assertIs(tokenizer.tokenize("a b c"), tokenizer.tokenize("a b c"))
+
+
+class TokenArrayTest(unittest.TestCase):
+
+    def test_tokens_are_offsets_into_the_text_with_interned_terms(self):
+        tokens = TextTokenizer(use_cache=False).tokenize("Alpha, beta alpha")
+        self.assertEqual(len(tokens), 3)
+        self.assertEqual(list(tokens.starts), [0, 7, 12])
+        self.assertEqual(list(tokens.ends), [5, 11, 17])
+        self.assertEqual(tokens.term_ids[0], tokens.term_ids[2])
+        self.assertEqual(
+            list(tokens),
+            [
+                Token("Alpha", 0, 5, "alpha"),
+                Token("beta", 7, 11, "beta"),
+                Token("alpha", 12, 17, "alpha"),
+            ],
+        )
+        self.assertEqual(tokens.nbytes, 3 * (4 + 4 + 4))
+
+    def test_tokenizers_sharing_a_dictionary_share_term_ids(self):
+        dictionary = TermDictionary()
+        first = TextTokenizer(use_cache=False, dictionary=dictionary)
+        second = FastTokenizer(use_cache=False, dictionary=dictionary)
+        a = first.tokenize("gamma delta")
+        b = second.tokenize("DELTA gamma")
+        self.assertEqual(list(a.term_ids), list(reversed(b.term_ids)))
+        self.assertEqual(len(dictionary), 2)
+        self.assertEqual(dictionary[dictionary.lookup("delta")], "delta")
+        self.assertIsNone(dictionary.lookup("epsilon"))
+
+
+if __name__ == "__main__":
+    unittest.main()
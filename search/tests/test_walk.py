@@ -0,0 +1,185 @@
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sliding_window import FileFinder, IgnoreFile, ReadAheadReader
+
+
+class IgnoreRuleTest(unittest.TestCase):
+
+    def match(self, lines, path, is_dir=False):
+        ignore_file = IgnoreFile("/repo", lines)
+        return ignore_file.match(os.path.join("/repo", path), is_dir)
+
+    def test_unanchored_pattern_matches_at_any_depth(self):
+        self.assertTrue(self.match(["*.tmp"], "a.tmp"))
+        self.assertTrue(self.match(["*.tmp"], "deep/er/a.tmp"))
+        self.assertIsNone(self.match(["*.tmp"], "a.tmpx"))
+
+    def test_slash_anchors_pattern_to_the_ignore_file(self):
+        self.assertTrue(self.match(["/top.txt"], "top.txt"))
+        self.assertIsNone(self.match(["/top.txt"], "sub/top.txt"))
+        self.assertTrue(self.match(["sub/top.txt"], "sub/top.txt"))
+        self.assertIsNone(self.match(["sub/top.txt"], "other/sub/top.txt"))
+
+    def test_trailing_slash_matches_directories_only(self):
+        self.assertTrue(self.match(["out/"], "out", is_dir=True))
+        self.assertIsNone(self.match(["out/"], "out"))
+
+    def test_last_matching_rule_wins(self):
+        lines = ["*.tmp", "!keep.tmp"]
+        self.assertTrue(self.match(lines, "drop.tmp"))
+        self.assertFalse(self.match(lines, "keep.tmp"))
+        self.assertTrue(self.match(lines + ["keep.tmp"], "keep.tmp"))
+
+    def test_double_star_and_character_classes(self):
+        self.assertTrue(self.match(["docs/**/draft.txt"], "docs/draft.txt"))
+        self.assertTrue(self.match(["docs/**/draft.txt"], "docs/a/b/draft.txt"))
+        self.assertTrue(self.match(["logs/**"], "logs/a/b.txt"))
+        self.assertTrue(self.match(["file[0-9].txt"], "file7.txt"))
+        self.assertIsNone(self.match(["file[!0-9].txt"], "file7.txt"))
+        self.assertTrue(self.match(["file?.txt"], "fileA.txt"))
+        self.assertIsNone(self.match(["file?.txt"], "dir/file/A.txt"))
+
+    def test_comments_blank_lines_and_escapes(self):
+        self.assertEqual(IgnoreFile("/repo", ["# note", "", "   ", "/"]).rules, [])
+        self.assertTrue(self.match(["\\#hash"], "#hash"))
+        self.assertTrue(self.match(["\\!bang"], "!bang"))
+        self.assertTrue(self.match(["trailing\\ "], "trailing "))
+
+
+class FileFinderIgnoreTest(unittest.TestCase):
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.repo = tmp.name
+        os.mkdir(os.path.join(self.repo, ".git"))
+
+    def write(self, path, content="text\n"):
+        full = os.path.join(self.repo, path)
+        os.makedirs(os.path.dirname(full), exist_ok=True)
+        with open(full, "w") as f:
+            f.write(content)
+
+    def found(self, root=None, **options):
+        root = root or self.repo
+        return sorted(
+            os.path.relpath(path, root).replace(os.sep, "/")
+            for path in FileFinder(**options).find_files(root)
+        )
+
+    def test_nested_ignore_files_override_parents(self):
+        self.write(".gitignore", "*.tmp\nout/\n/top.txt\n")
+        self.write("sub/.gitignore", "!keep.tmp\n")
+        self.write("a.txt")
+        self.write("top.txt")
+        self.write("drop.tmp")
+        self.write("out/inside.txt")
+        self.write("sub/out")
+        self.write("sub/top.txt")
+        self.write("sub/keep.tmp")
+        self.write("sub/drop.tmp")
+        self.assertEqual(
+            self.found(),
+            [
+                ".gitignore",
+                "a.txt",
+                "sub/.gitignore",
+                "sub/keep.tmp",
+                "sub/out",
+                "sub/top.txt",
+            ],
+        )
+
+    def test_ignore_files_above_the_search_root_apply(self):
+        self.write(".gitignore", "/sub/secret.txt\n*.tmp\n")
+        self.write("sub/secret.txt")
+        self.write("sub/public.txt")
+        self.write("sub/drop.tmp")
+        self.write("sub/deeper/secret.txt")
+        root = os.path.join(self.repo, "sub")
+        self.assertEqual(self.found(root), ["deeper/secret.txt", "public.txt"])
+
+    def test_ignore_file_takes_precedence_over_gitignore(self):
+        self.write(".gitignore", "*.tmp\n")
+        self.write(".ignore", "!keep.tmp\n")
+        self.write("keep.tmp")
+        self.write("drop.tmp")
+        self.assertEqual(self.found(), [".gitignore", ".ignore", "keep.tmp"])
+
+    def test_default_dirs_binary_files_and_no_ignore(self):
+        self.write(".gitignore", "*.tmp\n")
+        self.write("a.tmp")
+        self.write("node_modules/lib.txt")
+        self.write("blob.txt", "a\0b")
+        self.write("notes.txt")
+        self.assertEqual(self.found(), [".gitignore", "notes.txt"])
+        self.assertEqual(
+            self.found(no_ignore=True, skip_binary=False),
+            [".gitignore", "a.tmp", "blob.txt", "node_modules/lib.txt", "notes.txt"],
+        )
+
+
+class ReadAheadReaderTest(unittest.TestCase):
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.paths = []
+        for i in range(20):
+            path = os.path.join(tmp.name, f"f{i:02}.txt")
+            with open(path, "wb") as f:
+                f.write(bytes([65 + i]) * 100)
+            self.paths.append(path)
+
+    def test_files_come_back_in_order_with_their_contents(self):
+        skipped = set(self.paths[3::4])
+        missing = self.paths[0] + ".missing"
+        paths = self.paths + [missing]
+
+        # Callers take each file's bytes before asking for the next file.
+        reader = ReadAheadReader(250, 2)
+        results = []
+        for path, future in reader.read(paths, skipped.__contains__):
+            if future is None:
+                results.append((path, None))
+                continue
+            try:
+                results.append((path, future.result()))
+            except OSError as e:
+                results.append((path, e))
+
+        self.assertEqual([path for path, _ in results], paths)
+        for i, (path, data) in enumerate(results[:-1]):
+            expected = None if path in skipped else bytes([65 + i]) * 100
+            self.assertEqual(data, expected)
+        self.assertIsInstance(results[-1][1], FileNotFoundError)
+
+    def test_reads_stay_within_the_byte_budget(self):
+        started = []
+
+        class RecordingReader(ReadAheadReader):
+            @staticmethod
+            def read_file(file_path):
+                started.append(file_path)
+                return ReadAheadReader.read_file(file_path)
+
+        reader = RecordingReader(max_bytes=300, threads=2)
+        for received, (_, future) in enumerate(reader.read(self.paths), 1):
+            future.result()
+            # Three 100-byte files fit in the budget beyond those handed out.
+            self.assertLessEqual(len(started), received + 3)
+        self.assertEqual(len(started), len(self.paths))
+
+    def test_files_larger_than_the_budget_are_still_read(self):
+        reader = ReadAheadReader(max_bytes=10, threads=2)
+        firsts = [future.result()[:1] for _, future in reader.read(self.paths[:3])]
+        self.assertEqual(firsts, [b"A", b"B", b"C"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -25,9 +25,9 @@ class AudioConverter:
             None  # Output placeholder
         ]
 
-    def convert_to_wav(self, input_path: Path) -> Optional[Path]:
-        """Convert single audio file to WAV format using ffmpeg."""
-        new_filename = FileUtils.sanitize_filename(input_path.name)
+    def convert_to_wav(self, input_path: Path, output_name: Optional[str] = None) -> Optional[Path]:
+        """Convert single audio file to WAV format using ffmpeg, named output_name if given."""
+        new_filename = output_name or FileUtils.sanitize_filename(input_path.name)
         output_path = self.output_dir / new_filename
 
         # Create command for this specific file
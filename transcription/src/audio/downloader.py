@@ -1,8 +1,6 @@
 import logging
 from pathlib import Path
 from typing import Iterator, Optional
-from pytubefix import YouTube, Playlist
-from pytubefix.cli import on_progress
 from utils.file_utils import FileUtils
 
 # Configure logging
@@ -19,6 +17,8 @@ class AudioDownloader:
 
     def download_single(self, url: str) -> Optional[Path]:
         """Download audio from a single YouTube URL."""
+        from pytubefix import YouTube
+        from pytubefix.cli import on_progress
         try:
             logging.info(f"Starting download for: {url}")
             yt = YouTube(
@@ -38,14 +38,20 @@ class AudioDownloader:
             logging.error(f"Error downloading {url}: {e}")
         return None
 
-    def download_playlist(self, url: str) -> Iterator[Path]:
-        """Download audio from all videos in a YouTube playlist."""
+    def playlist_urls(self, url: str) -> Iterator[str]:
+        """List the video URLs of a YouTube playlist."""
+        from pytubefix import Playlist
         try:
-            logging.info(f"Starting playlist download for: {url}")
+            logging.info(f"Listing playlist: {url}")
             playlist = Playlist(url)
-            for video in playlist.videos:
-                video_url = video.watch_url
-                logging.info(f"Downloading: {video_url}")
-                yield self.download_single(video_url)
+            for video_url in playlist.video_urls:
+                yield video_url
         except Exception as e:
             logging.error(f"Error processing playlist {url}: {e}")
+
+    def download_playlist(self, url: str) -> Iterator[Path]:
+        """Download audio from all videos in a YouTube playlist."""
+        logging.info(f"Starting playlist download for: {url}")
+        for video_url in self.playlist_urls(url):
+            logging.info(f"Downloading: {video_url}")
+            yield self.download_single(video_url)
@@ -0,0 +1,86 @@
+import wave
+from pathlib import Path
+from typing import List, Tuple
+import numpy as np
+
+# AudioConverter writes 16 kHz mono 16-bit PCM, which is also what Whisper expects.
+SAMPLE_RATE = 16000
+SAMPLE_WIDTH = 2
+FRAME_MS = 30
+FRAME_SAMPLES = SAMPLE_RATE * FRAME_MS // 1000
+
+def _open_pcm(audio_path: Path) -> wave.Wave_read:
+    wav = wave.open(str(audio_path), 'rb')
+    if (wav.getframerate(), wav.getnchannels(), wav.getsampwidth()) != (SAMPLE_RATE, 1, SAMPLE_WIDTH):
+        wav.close()
+        raise ValueError(f"{audio_path} is not 16 kHz mono 16-bit PCM")
+    return wav
+
+def read_samples(audio_path: Path, start: int, end: int) -> np.ndarray:
+    """Read samples [start, end) of a 16 kHz mono WAV as float32 in [-1, 1]."""
+    with _open_pcm(audio_path) as wav:
+        wav.setpos(start)
+        pcm = np.frombuffer(wav.readframes(end - start), dtype='<i2')
+    return pcm.astype(np.float32) / 32768.0
+
+def frame_energies(audio_path: Path, block_frames: int = 2000) -> np.ndarray:
+    """Energy in dBFS of each 30 ms frame, reading the file a block at a time."""
+    energies = []
+    with _open_pcm(audio_path) as wav:
+        while True:
+            pcm = np.frombuffer(wav.readframes(block_frames * FRAME_SAMPLES), dtype='<i2')
+            frames = len(pcm) // FRAME_SAMPLES
+            if not frames:
+                break
+            samples = pcm[:frames * FRAME_SAMPLES].astype(np.float32).reshape(frames, FRAME_SAMPLES) / 32768.0
+            energies.append(10 * np.log10(np.mean(samples * samples, axis=1) + 1e-10))
+    return np.concatenate(energies) if energies else np.zeros(0, dtype=np.float32)
+
+def speech_threshold(energies: np.ndarray, margin_db: float = 10.0, floor_db: float = -50.0) -> float:
+    """Frames this far above the noise floor (the quietest tenth of the file) count as speech.
+
+    When speech fills nearly the whole file its quietest tenth is speech too,
+    so the threshold also stays this far below the loudest tenth.
+    """
+    noise, loud = np.percentile(energies, [10, 90])
+    return max(min(float(noise), float(loud) - 2 * margin_db) + margin_db, floor_db)
+
+def _longest_run_center(mask: np.ndarray) -> int:
+    """Center of the longest run of True in mask, or -1 when there is none."""
+    edges = np.diff(np.concatenate(([0], mask.astype(np.int8), [0])))
+    starts, ends = np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)
+    if not len(starts):
+        return -1
+    longest = int(np.argmax(ends - starts))
+    return int(starts[longest] + ends[longest]) // 2
+
+def split_on_silence(audio_path: Path, chunk_seconds: float = 120.0) -> List[Tuple[int, int]]:
+    """Split a WAV into (start, end) sample ranges of at most chunk_seconds, cut at silences.
+
+    Each cut lands in the middle of the longest silent stretch in the second
+    half of the chunk, or at its quietest frame if it has no silence. Chunks
+    without any speech are left out.
+    """
+    energies = frame_energies(audio_path)
+    if not len(energies):
+        return []
+    silent = energies < speech_threshold(energies)
+    chunk_frames = max(2, int(chunk_seconds * 1000 / FRAME_MS))
+
+    cuts = [0]
+    while len(energies) - cuts[-1] > chunk_frames:
+        low, high = cuts[-1] + chunk_frames // 2, cuts[-1] + chunk_frames
+        cut = _longest_run_center(silent[low:high])
+        if cut < 0:
+            cut = int(np.argmin(energies[low:high]))
+        cuts.append(low + cut)
+    cuts.append(len(energies))
+
+    with _open_pcm(audio_path) as wav:
+        total_samples = wav.getnframes()
+    chunks = []
+    for start, end in zip(cuts, cuts[1:]):
+        if not silent[start:end].all():
+            # The last chunk also takes the samples after the final whole frame.
+            chunks.append((start * FRAME_SAMPLES, total_samples if end == len(energies) else end * FRAME_SAMPLES))
+    return chunks
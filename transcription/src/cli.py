@@ -25,6 +25,22 @@ def create_parser() -> argparse.ArgumentParser:
                       help='Directory for raw downloaded files')
     parser.add_argument('--transcripts-dir', default='./transcripts',
                       help='Directory for transcript files')
+    parser.add_argument('--download-workers', type=int, default=2,
+                      help='Concurrent downloads (default: 2)')
+    parser.add_argument('--convert-workers', type=int, default=2,
+                      help='Concurrent ffmpeg conversions (default: 2)')
+    parser.add_argument('--transcribe-workers', type=int, default=1,
+                      help='Concurrent transcriptions, each loading its own model (default: 1)')
+    parser.add_argument('--queue-size', type=int, default=4,
+                      help='Files buffered between pipeline stages (default: 4)')
+    parser.add_argument('--format-batch-size', type=int, default=8,
+                      help='Transcripts punctuated together in one model call (default: 8)')
+    parser.add_argument('--no-cache', action='store_true',
+                      help='Re-transcribe even when a cached transcript exists for the same audio and model')
+    parser.add_argument('--chunk-workers', type=int, default=0,
+                      help='Split long audio at silences and transcribe the chunks in this many CPU processes, shared by all transcribe workers (default: 0, off)')
+    parser.add_argument('--chunk-seconds', type=float, default=120.0,
+                      help='Longest chunk for --chunk-workers, in seconds (default: 120)')
     
     return parser
 
@@ -43,16 +59,12 @@ def process_local_files(processor: MediaProcessor, files: List[Path], convert: b
 
 def process_batch(processor: MediaProcessor, skip_transcription: bool) -> None:
     """Process URLs from stdin."""
-    for line in sys.stdin:
-        url = line.strip()
-        if url:
-            try:
-                print(f"\nProcessing: {url}")
-                transcription, output_path = processor.process_url(url, skip_transcription)
-                if transcription:
-                    print(f"Transcription saved to: {output_path}")
-            except Exception as e:
-                print(f"Error processing {url}: {e}", file=sys.stderr)
+    urls = (line.strip() for line in sys.stdin)
+    for transcription, output_path in processor.process_urls((url for url in urls if url), skip_transcription):
+        if transcription:
+            print(f"Transcription saved to: {output_path}")
+        elif output_path:
+            print(f"audio saved to: {output_path}")
 
 def process_playlist(processor: MediaProcessor, playlist_url: str, skip_transcription: bool) -> None:
     """Process a YouTube playlist."""
@@ -68,38 +80,57 @@ def process_playlist(processor: MediaProcessor, playlist_url: str, skip_transcri
 
 def process_urls(processor: MediaProcessor, urls: List[str], skip_transcription: bool) -> None:
     """Process a list of URLs."""
-    for url in urls:
-        try:
-            print(f"\nProcessing: {url}")
-            transcription, output_path = processor.process_url(url, skip_transcription)
-            if transcription:
-                preview = transcription[:500] + "..." if len(transcription) > 500 else transcription
-                print("\nTranscription preview:")
-                print(preview)
-        except Exception as e:
-            print(f"Error processing {url}: {e}")
+    for transcription, output_path in processor.process_urls(urls, skip_transcription):
+        if transcription:
+            preview = transcription[:500] + "..." if len(transcription) > 500 else transcription
+            print(f"\nProcessed: {output_path}")
+            print("\nTranscription preview:")
+            print(preview)
+        elif output_path:
+            print(f"audio saved to: {output_path}")
 
 def main() -> None:
     parser = create_parser()
     args = parser.parse_args()
+    for option in ('download_workers', 'convert_workers', 'transcribe_workers', 'queue_size',
+                   'format_batch_size'):
+        if getattr(args, option) < 1:
+            parser.error(f"--{option.replace('_', '-')} must be at least 1")
+    if args.chunk_workers < 0:
+        parser.error("--chunk-workers must not be negative")
+    if args.chunk_seconds < 1:
+        parser.error("--chunk-seconds must be at least 1")
 
     processor = MediaProcessor(
         model_name=args.model,
         output_dir=args.output_dir,
         raw_dir=args.raw_dir,
-        transcripts_dir=args.transcripts_dir
+        transcripts_dir=args.transcripts_dir,
+        download_workers=args.download_workers,
+        convert_workers=args.convert_workers,
+        transcribe_workers=args.transcribe_workers,
+        queue_size=args.queue_size,
+        use_cache=not args.no_cache,
+        format_batch_size=args.format_batch_size,
+        chunk_workers=args.chunk_workers,
+        chunk_seconds=args.chunk_seconds
     )
 
-    if args.files:
-        process_local_files(processor, args.files, args.convert)
-    elif args.batch:
-        if sys.stdin.isatty():
-            parser.error("No input provided for batch processing. Use pipe or redirect.")
-        process_batch(processor, args.skip_transcription)
-    elif args.playlist:
-        process_playlist(processor, args.playlist, args.skip_transcription)
-    else:
-        process_urls(processor, args.urls, args.skip_transcription)
+    # The chunk worker processes load their own models, so keep them for
+    # every input of the run and stop them once at the end.
+    try:
+        if args.files:
+            process_local_files(processor, args.files, args.convert)
+        elif args.batch:
+            if sys.stdin.isatty():
+                parser.error("No input provided for batch processing. Use pipe or redirect.")
+            process_batch(processor, args.skip_transcription)
+        elif args.playlist:
+            process_playlist(processor, args.playlist, args.skip_transcription)
+        else:
+            process_urls(processor, args.urls, args.skip_transcription)
+    finally:
+        processor.close()
 
 if __name__ == '__main__':
     main()
\ No newline at end of file
@@ -0,0 +1,69 @@
+import argparse
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import List, Tuple
+
+SRC_DIR = Path(__file__).resolve().parent
+
+# Modules that must only load once a stage actually needs them.
+HEAVY_MODULES = ('whisper', 'torch', 'transformers', 'deepmultilingualpunctuation', 'pytubefix', 'numpy')
+
+def import_times(module: str) -> List[Tuple[str, int, int]]:
+    """Import module in a fresh interpreter and return (name, self us, cumulative us) per import."""
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        cwd=SRC_DIR, capture_output=True, text=True, check=True
+    )
+    times = []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        times.append((name.strip(), int(self_us), int(cumulative_us)))
+    return times
+
+def help_wall_time(repeat: int) -> float:
+    """Best wall time in seconds of `cli.py --help` over repeat runs."""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, 'cli.py', '--help'], cwd=SRC_DIR,
+                       stdout=subprocess.DEVNULL, check=True)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Check that cli.py starts without loading heavy modules')
+    parser.add_argument('--budget-ms', type=float, default=500,
+                      help='Maximum wall time for `cli.py --help` in milliseconds (default: 500)')
+    parser.add_argument('--repeat', type=int, default=5,
+                      help='Runs of `cli.py --help`, best one kept (default: 5)')
+    parser.add_argument('--top', type=int, default=10,
+                      help='Slowest imports to list (default: 10)')
+    args = parser.parse_args()
+
+    times = import_times('cli')
+    cli_ms = next(cumulative for name, _, cumulative in times if name == 'cli') / 1000
+    help_ms = help_wall_time(args.repeat) * 1000
+
+    print(f"import cli:     {cli_ms:8.1f} ms")
+    print(f"cli.py --help:  {help_ms:8.1f} ms (budget {args.budget_ms:.0f} ms)")
+    print("\nSlowest imports by self time:")
+    for name, self_us, cumulative_us in sorted(times, key=lambda t: -t[1])[:args.top]:
+        print(f"  {name:<40} {self_us / 1000:8.1f} ms self {cumulative_us / 1000:8.1f} ms cumulative")
+
+    heavy = sorted({name for name, _, _ in times if name.split('.')[0] in HEAVY_MODULES})
+    failed = False
+    if heavy:
+        print(f"\nFAIL: heavy modules imported at startup: {', '.join(heavy)}", file=sys.stderr)
+        failed = True
+    if help_ms > args.budget_ms:
+        print(f"\nFAIL: cli.py --help took {help_ms:.1f} ms, over the {args.budget_ms:.0f} ms budget",
+              file=sys.stderr)
+        failed = True
+    sys.exit(1 if failed else 0)
+
+if __name__ == '__main__':
+    main()
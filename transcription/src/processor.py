@@ -1,83 +1,256 @@
 import logging
+import queue
+import threading
 from pathlib import Path
-from typing import Iterator, Optional, Tuple
+from typing import Iterable, Iterator, List, Optional, Set, Tuple, Union
 from audio.downloader import AudioDownloader
 from audio.converter import AudioConverter
-from transcription.transcriber import Transcriber
+from transcription.transcriber import ChunkPool, Transcriber
+from utils.file_utils import FileUtils
+from utils.pipeline import Pipeline, Stage
+from utils.text_utils import TextFormatter
+from utils.transcript_cache import TranscriptCache
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+class MediaJob:
+    """One URL or file moving through the pipeline; result is set once it is done."""
+
+    def __init__(self, source: Union[str, Path]):
+        self.source = source
+        self.path: Optional[Path] = source if isinstance(source, Path) else None
+        self.audio_hash: Optional[str] = None
+        self.text: Optional[str] = None
+        self.segments: Optional[List[dict]] = None
+        self.result: Optional[Tuple[Optional[str], Optional[Path]]] = None
+
+    def __str__(self) -> str:
+        return str(self.source)
+
 class MediaProcessor:
-    def __init__(self, 
+    def __init__(self,
                  model_name: str = 'tiny.en',
                  output_dir: str = './downloads',
                  raw_dir: str = './raw_downloads',
-                 transcripts_dir: str = './transcripts'):
+                 transcripts_dir: str = './transcripts',
+                 download_workers: int = 2,
+                 convert_workers: int = 2,
+                 transcribe_workers: int = 1,
+                 queue_size: int = 4,
+                 use_cache: bool = True,
+                 format_batch_size: int = 8,
+                 chunk_workers: int = 0,
+                 chunk_seconds: float = 120.0):
+        self.model_name = model_name
+        self.transcripts_dir = transcripts_dir
         self.downloader = AudioDownloader(raw_dir)
         self.converter = AudioConverter(output_dir)
-        self.transcriber = Transcriber(model_name, transcripts_dir)
+        self.chunk_seconds = chunk_seconds
+        # One pool for all transcribe workers, so chunk_workers bounds the
+        # Whisper processes however many files transcribe at once.
+        self.chunk_pool = ChunkPool(model_name, chunk_workers) if chunk_workers else None
+        self.transcriber = self._new_transcriber()
+        self.cache = TranscriptCache(transcripts_dir) if use_cache else None
+        self.download_workers = download_workers
+        self.convert_workers = convert_workers
+        self.transcribe_workers = transcribe_workers
+        self.queue_size = queue_size
+        self.format_batch_size = format_batch_size
+        # Whisper models are not safe to share between threads, so each
+        # concurrent transcribe worker checks out its own Transcriber.
+        self._idle_transcribers = queue.SimpleQueue()
+        self._idle_transcribers.put(self.transcriber)
+        # WAV names handed out this run, so inputs that sanitize to the same
+        # name do not overwrite each other's audio and transcripts.
+        self._wav_names: Set[str] = set()
+        self._wav_names_lock = threading.Lock()
         logger.info("MediaProcessor initialized with model: %s", model_name)
 
-    def transcribe_wav(self, wav_file: Path) -> Optional[str]:
+    def _new_transcriber(self) -> Transcriber:
+        return Transcriber(self.model_name, self.transcripts_dir, chunk_seconds=self.chunk_seconds,
+                           chunk_pool=self.chunk_pool)
+
+    def close(self) -> None:
+        """Stop the chunk worker processes shared by the transcribers; call once all inputs are done."""
+        if self.chunk_pool:
+            self.chunk_pool.close()
+
+    @property
+    def _cache_chunk_seconds(self) -> Optional[float]:
+        """Chunk length that keys cached transcripts, or None when files transcribe whole."""
+        return self.chunk_seconds if self.chunk_pool else None
+
+    def _transcribe_timed(self, wav_file: Path) -> Tuple[str, Optional[List[dict]]]:
+        try:
+            transcriber = self._idle_transcribers.get_nowait()
+        except queue.Empty:
+            transcriber = self._new_transcriber()
+        try:
+            result = transcriber.transcribe_timed(wav_file)
+        finally:
+            self._idle_transcribers.put(transcriber)
+        logger.info("Transcription completed for file: %s", wav_file)
+        return result
+
+    def _save(self, text: str, segments: Optional[List[dict]], wav_file: Path) -> Path:
+        if segments is not None:
+            self.transcriber.save_segments(segments, wav_file)
+        return self.transcriber.save(text, wav_file)
+
+    def transcribe_wav(self, wav_file: Path) -> Tuple[Optional[str], Optional[Path]]:
         """Transcribe a single WAV file."""
-        return self.transcriber.transcribe(wav_file)
+        text, segments = self._transcribe_timed(wav_file)
+        formatted_text = TextFormatter.format_transcript(text)
+        return formatted_text, self._save(formatted_text, segments, wav_file)
 
-    def transcribe_files(self, files: Iterator[Path], convert: bool) -> Iterator[Tuple[Optional[str], Optional[Path]]]:
-        """Transcribe multiple WAV files in parallel."""
-        for wav_file in files:
-            if convert:
-                wav_file = self.converter.convert_to_wav(wav_file)
-                if not wav_file:
-                    logger.error("Failed to convert file to WAV: %s", wav_file)
-                    continue
+    def _use_cached(self, job: MediaJob, audio_hash: str, wav_file: Path) -> bool:
+        """Finish the job from the transcript cache if it holds this audio."""
+        cached = self.cache.get(audio_hash, self.model_name, self._cache_chunk_seconds)
+        if cached is None:
+            return False
+        self.cache.record(True)
+        text, segments = cached
+        job.result = text, self._save(text, segments, wav_file)
+        logger.info("Using cached transcript for %s", job.source)
+        return True
 
-            yield self.transcribe_wav(wav_file)
+    def _claim_wav_name(self, audio_file: Path) -> str:
+        stem = Path(FileUtils.sanitize_filename(audio_file.name)).stem
+        name, copy = f"{stem}.wav", 1
+        with self._wav_names_lock:
+            while name in self._wav_names:
+                copy += 1
+                name = f"{stem}_{copy}.wav"
+            self._wav_names.add(name)
+        return name
 
-    def process_url(self, url: str, skip_transcription: bool = False) -> Tuple[Optional[str], Optional[Path]]:
-        """Process a single URL: download, convert, and optionally transcribe."""
-        logger.info("Processing URL: %s", url)
-        downloaded_file = self.downloader.download_single(url)
-        if not downloaded_file:
-            logger.error("Failed to download file from URL: %s", url)
-            return None, None
+    def download(self, job: MediaJob) -> Optional[MediaJob]:
+        """Download stage: fetch the audio for one URL."""
+        job.path = self.downloader.download_single(job.source)
+        if not job.path:
+            logger.error("Failed to download file from URL: %s", job.source)
+            return None
+        return job
 
-        wav_file = self.converter.convert_to_wav(downloaded_file)
+    def convert(self, job: MediaJob, cleanup: bool = True, transcribe: bool = True) -> Optional[MediaJob]:
+        """Convert stage: turn a downloaded file into 16 kHz mono WAV."""
+        audio_file = job.path
+        wav_name = self._claim_wav_name(audio_file)
+        source_hash = None
+        if transcribe and self.cache:
+            # A source converted before maps straight to its audio hash, so a
+            # cached transcript skips ffmpeg as well as Whisper.
+            source_hash = FileUtils.get_file_hash(audio_file)
+            audio_hash = self.cache.audio_hash_for_source(source_hash)
+            if audio_hash and self._use_cached(job, audio_hash, Path(wav_name)):
+                if cleanup:
+                    audio_file.unlink(missing_ok=True)
+                return job
+
+        wav_file = self.converter.convert_to_wav(audio_file, wav_name)
         if not wav_file:
-            logger.error("Failed to convert file to WAV: %s", downloaded_file)
-            return None, None
+            logger.error("Failed to convert file to WAV: %s", audio_file)
+            return None
+
+        if cleanup:
+            audio_file.unlink(missing_ok=True)
+            logger.info("Downloaded file cleaned up: %s", audio_file)
+        job.path = wav_file
+
+        if source_hash:
+            job.audio_hash = FileUtils.get_audio_hash(wav_file)
+            self.cache.remember_source(source_hash, job.audio_hash)
+        return job
+
+    def transcribe(self, job: MediaJob) -> MediaJob:
+        """Transcribe stage: run Whisper unless the transcript is cached."""
+        if job.result is not None:
+            return job
 
-        # Clean up downloaded file
-        downloaded_file.unlink(missing_ok=True)
-        logger.info("Downloaded file cleaned up: %s", downloaded_file)
+        if self.cache:
+            if job.audio_hash is None:
+                job.audio_hash = FileUtils.get_audio_hash(job.path)
+            if self._use_cached(job, job.audio_hash, job.path):
+                return job
+            self.cache.record(False)
+
+        job.text, job.segments = self._transcribe_timed(job.path)
+        return job
+
+    def format(self, jobs: List[MediaJob]) -> List[MediaJob]:
+        """Format stage: restore punctuation for every waiting transcript in one model call."""
+        pending = [job for job in jobs if job.result is None]
+        formatted = TextFormatter.format_transcripts([job.text for job in pending])
+        for job, text in zip(pending, formatted):
+            job.result = text, self._save(text, job.segments, job.path)
+            if self.cache:
+                self.cache.put(job.audio_hash, self.model_name, text, self._cache_chunk_seconds, job.segments)
+        return jobs
+
+    def _stages(self, download: bool, convert: bool, transcribe: bool) -> List[Stage]:
+        stages = []
+        if download:
+            stages.append(Stage('download', self.download, self.download_workers))
+        if convert:
+            stages.append(Stage('convert', lambda job: self.convert(job, download, transcribe),
+                                self.convert_workers))
+        if transcribe:
+            stages.append(Stage('transcribe', self.transcribe, self.transcribe_workers))
+            stages.append(Stage('format', self.format, batch_size=self.format_batch_size))
+        return stages
+
+    def _run(self, stages: List[Stage], sources: Iterable, transcribe: bool) -> Iterator[Tuple[Optional[str], Optional[Path]]]:
+        self._wav_names.clear()
+        pending = {}
+
+        def feed() -> Iterator[MediaJob]:
+            for source in sources:
+                job = MediaJob(source)
+                pending[id(job)] = job
+                yield job
+
+        jobs = Pipeline(stages, self.queue_size).run(feed())
+        try:
+            for job in jobs:
+                pending.pop(id(job), None)
+                yield job.result if transcribe else (None, job.path)
+        finally:
+            jobs.close()
+
+        # Stages drop jobs that fail, so whatever never came out failed.
+        for job in pending.values():
+            logger.error("Failed to process %s", job)
+            yield None, None
+        if transcribe and self.cache:
+            logger.info(self.cache.report())
+
+    def transcribe_files(self, files: Iterable[Path], convert: bool) -> Iterator[Tuple[Optional[str], Optional[Path]]]:
+        """Transcribe multiple files, converting the next ones while the current one transcribes."""
+        yield from self._run(self._stages(False, convert, True), files, True)
+
+    def process_url(self, url: str, skip_transcription: bool = False) -> Tuple[Optional[str], Optional[Path]]:
+        """Process a single URL: download, convert, and optionally transcribe."""
+        logger.info("Processing URL: %s", url)
+        self._wav_names.clear()
+        job = MediaJob(url)
+        for stage in self._stages(True, True, not skip_transcription):
+            job = stage.func([job])[0] if stage.batch_size else stage.func(job)
+            if job is None:
+                return None, None
 
         if skip_transcription:
             logger.info("Skipping transcription for URL: %s", url)
-            return None, wav_file
+            return None, job.path
+        return job.result
 
-        # Transcribe
-        transcription = self.transcriber.transcribe(wav_file)
-        logger.info("Transcription completed for URL: %s", url)
-        return transcription
+    def process_urls(self, urls: Iterable[str], skip_transcription: bool = False) -> Iterator[Tuple[Optional[str], Optional[Path]]]:
+        """Download, convert and transcribe URLs as overlapping stages, yielding results as they finish."""
+        stages = self._stages(True, True, not skip_transcription)
+        yield from self._run(stages, urls, not skip_transcription)
 
     def process_playlist(self, url: str, skip_transcription: bool = False) -> Iterator[Tuple[Optional[str], Optional[Path]]]:
         """Process all videos in a YouTube playlist."""
         logger.info("Processing playlist URL: %s", url)
-        for audio_file in self.downloader.download_playlist(url):
-            wav_file = self.converter.convert_to_wav(audio_file)
-            if not wav_file:
-                logger.error("Failed to convert file to WAV: %s", audio_file)
-                continue
-
-            # Clean up downloaded file
-            audio_file.unlink(missing_ok=True)
-            logger.info("Downloaded file cleaned up: %s", audio_file)
-
-            if skip_transcription:
-                logger.info("Skipping transcription for file: %s", wav_file)
-                yield None, wav_file
-            else:
-                transcription = self.transcriber.transcribe(wav_file)
-                logger.info("Transcription completed for file: %s", wav_file)
-                yield transcription
\ No newline at end of file
+        yield from self.process_urls(self.downloader.playlist_urls(url), skip_transcription)
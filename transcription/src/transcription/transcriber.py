@@ -1,26 +1,158 @@
+import logging
+import multiprocessing
+import os
+import threading
+import wave
+from concurrent.futures import Future, ProcessPoolExecutor
 from pathlib import Path
-from typing import Tuple, Optional
-import whisper
+from typing import List, Tuple, Optional
 from utils.text_utils import TextFormatter
 from utils.file_utils import FileUtils
 
+logger = logging.getLogger(__name__)
+
+# Model loaded once in each chunk worker process.
+_worker_model = None
+
+def _init_chunk_worker(model_name: str, threads: int) -> None:
+    global _worker_model
+    import torch
+    import whisper
+    # Split the cores between workers instead of every worker using all of them.
+    torch.set_num_threads(threads)
+    _worker_model = whisper.load_model(model_name, device='cpu')
+
+def _transcribe_chunk(audio_path: Path, start: int, end: int) -> List[dict]:
+    """Transcribe samples [start, end) in a worker, returning segments timed from the start of the file."""
+    from audio.vad import SAMPLE_RATE, read_samples
+    result = _worker_model.transcribe(read_samples(audio_path, start, end), fp16=False)
+    offset = start / SAMPLE_RATE
+    return [{'start': segment['start'] + offset, 'end': segment['end'] + offset, 'text': segment['text']}
+            for segment in result['segments']]
+
+def _timestamp(seconds: float) -> str:
+    minutes, seconds = divmod(seconds, 60)
+    hours, minutes = divmod(int(minutes), 60)
+    return f"{hours:02d}:{minutes:02d}:{seconds:06.3f}"
+
+class ChunkPool:
+    """CPU worker processes, each with its own Whisper model, that transcribe audio chunks."""
+
+    def __init__(self, model_name: str, workers: int):
+        self.model_name = model_name
+        self.workers = workers
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def submit(self, audio_path: Path, start: int, end: int) -> Future:
+        with self._lock:
+            if self._executor is None:
+                threads = max(1, (os.cpu_count() or 1) // self.workers)
+                # Spawn rather than fork, since the pipeline's threads are running.
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context('spawn'),
+                    initializer=_init_chunk_worker,
+                    initargs=(self.model_name, threads)
+                )
+            return self._executor.submit(_transcribe_chunk, audio_path, start, end)
+
+    def close(self) -> None:
+        """Shut down the worker processes; they restart on the next submit."""
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown()
+                self._executor = None
+
 class Transcriber:
-    def __init__(self, model_name: str = 'tiny.en', transcripts_dir: str = './transcripts'):
-        self.model = whisper.load_model(model_name)
+    def __init__(self, model_name: str = 'tiny.en', transcripts_dir: str = './transcripts',
+                 chunk_workers: int = 0, chunk_seconds: float = 120.0,
+                 chunk_pool: Optional[ChunkPool] = None):
+        self.model_name = model_name
+        self._model = None
+        self._model_lock = threading.Lock()
         self.transcripts_dir = Path(transcripts_dir)
+        # With chunk_workers, audio longer than chunk_seconds is split at
+        # silences and its chunks transcribed in that many CPU processes.
+        # Transcribers handed a chunk_pool share it instead of starting their own.
+        self.chunk_workers = chunk_pool.workers if chunk_pool else chunk_workers
+        self.chunk_seconds = chunk_seconds
+        self._owns_pool = chunk_pool is None and chunk_workers > 0
+        self.chunk_pool = ChunkPool(model_name, chunk_workers) if self._owns_pool else chunk_pool
         FileUtils.ensure_directory(self.transcripts_dir)
 
+    @property
+    def model(self):
+        """Whisper model, imported and loaded on first use."""
+        with self._model_lock:
+            if self._model is None:
+                import whisper
+                self._model = whisper.load_model(self.model_name)
+            return self._model
+
+    def transcribe_timed(self, audio_path: Path) -> Tuple[str, Optional[List[dict]]]:
+        """Transcribe audio file without restoring punctuation, with timed segments when it was chunked."""
+        if self.chunk_pool:
+            segments = self.transcribe_chunked(audio_path)
+            if segments is not None:
+                return "".join(segment['text'] for segment in segments), segments
+        return self.model.transcribe(str(audio_path))['text'], None
+
+    def transcribe_raw(self, audio_path: Path) -> str:
+        """Transcribe audio file without restoring punctuation."""
+        text, segments = self.transcribe_timed(audio_path)
+        if segments is not None:
+            self.save_segments(segments, audio_path)
+        return text
+
+    def transcribe_chunked(self, audio_path: Path) -> Optional[List[dict]]:
+        """Transcribe long audio as silence-separated chunks in parallel, returning timed segments.
+
+        Returns None when the file is short enough, or not 16 kHz mono PCM, to
+        transcribe in one piece.
+        """
+        from audio.vad import split_on_silence
+        try:
+            chunks = split_on_silence(audio_path, self.chunk_seconds)
+        except (ValueError, wave.Error, EOFError) as e:
+            logger.warning("Transcribing %s in one piece: %s", audio_path, e)
+            return None
+        if len(chunks) < 2:
+            return None
+
+        logger.info("Transcribing %s as %d chunks on %d workers", audio_path, len(chunks), self.chunk_workers)
+        futures = [self.chunk_pool.submit(audio_path, start, end) for start, end in chunks]
+        return [segment for future in futures for segment in future.result()]
+
+    def save_segments(self, segments: List[dict], audio_path: Path) -> Path:
+        """Write timed segments next to the transcript, one per line."""
+        segments_path = self.transcripts_dir / f"{audio_path.stem}_segments.txt"
+        segments_path.write_text("".join(
+            f"[{_timestamp(segment['start'])} --> {_timestamp(segment['end'])}] {segment['text'].strip()}\n"
+            for segment in segments
+        ), encoding='utf-8')
+        return segments_path
+
+    def close(self) -> None:
+        """Shut down the chunk worker processes this transcriber started, if any."""
+        if self._owns_pool:
+            self.chunk_pool.close()
+
     def transcribe(self, audio_path: Path) -> Tuple[Optional[str], Optional[Path]]:
         """Transcribe audio file and save to transcripts directory."""
         try:
-            result = self.model.transcribe(str(audio_path))
-            formatted_text = TextFormatter.format_transcript(result['text'])
-            
-            transcript_path = self.transcripts_dir / f"{audio_path.stem}_transcript.txt"
-            transcript_path.write_text(formatted_text, encoding='utf-8')
-            
-            return formatted_text, transcript_path
+            formatted_text = TextFormatter.format_transcript(self.transcribe_raw(audio_path))
+            return formatted_text, self.save(formatted_text, audio_path)
         except Exception as e:
             print(f"Error transcribing {audio_path}: {e}")
             raise e
-            # return None, None
\ No newline at end of file
+            # return None, None
+
+    def transcript_path(self, audio_path: Path) -> Path:
+        return self.transcripts_dir / f"{audio_path.stem}_transcript.txt"
+
+    def save(self, text: str, audio_path: Path) -> Path:
+        """Write a transcript for audio_path to the transcripts directory."""
+        transcript_path = self.transcript_path(audio_path)
+        transcript_path.write_text(text, encoding='utf-8')
+        return transcript_path
@@ -1,6 +1,7 @@
 import hashlib
 from pathlib import Path
 import re
+import wave
 
 class FileUtils:
     @staticmethod
@@ -8,10 +9,23 @@ class FileUtils:
         """Calculate SHA-256 hash of a file."""
         sha256_hash = hashlib.sha256()
         with open(filepath, "rb") as f:
-            for byte_block in iter(lambda: f.read(4096), b""):
+            for byte_block in iter(lambda: f.read(1 << 20), b""):
                 sha256_hash.update(byte_block)
         return sha256_hash.hexdigest()
 
+    @staticmethod
+    def get_audio_hash(filepath: Path) -> str:
+        """Calculate SHA-256 hash of a WAV file's format and samples, ignoring header metadata."""
+        try:
+            with wave.open(str(filepath), "rb") as wav:
+                sha256_hash = hashlib.sha256()
+                sha256_hash.update(f"{wav.getnchannels()}:{wav.getsampwidth()}:{wav.getframerate()}:".encode())
+                for frames in iter(lambda: wav.readframes(65536), b""):
+                    sha256_hash.update(frames)
+                return sha256_hash.hexdigest()
+        except (wave.Error, EOFError):
+            return FileUtils.get_file_hash(filepath)
+
     @staticmethod
     def sanitize_filename(filename: str) -> str:
         """Sanitize filename for consistent naming."""
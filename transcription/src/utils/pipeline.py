@@ -0,0 +1,141 @@
+import logging
+import queue
+import threading
+from typing import Any, Callable, Iterable, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+_DONE = object()
+
+
+class Stage:
+    """A pipeline step run by `workers` threads; func returns None to drop an item.
+
+    With a batch_size, func instead takes a list of up to batch_size items that
+    are already waiting and returns a list of results.
+    """
+
+    def __init__(self, name: str, func: Callable[[Any], Optional[Any]], workers: int = 1,
+                 batch_size: Optional[int] = None):
+        self.name = name
+        self.func = func
+        self.workers = max(1, workers)
+        self.batch_size = batch_size
+
+
+class Pipeline:
+    def __init__(self, stages: List[Stage], queue_size: int = 4):
+        self.stages = stages
+        self.queue_size = max(1, queue_size)
+
+    def run(self, items: Iterable[Any]) -> Iterator[Any]:
+        """Run items through all stages concurrently, yielding results as they finish."""
+        stop = threading.Event()
+        queues = [queue.Queue(self.queue_size) for _ in range(len(self.stages) + 1)]
+        # Exceptions that killed a thread, which would otherwise leave the
+        # stages after it waiting forever; run() re-raises the first one.
+        failures: List[BaseException] = []
+
+        def guarded(target: Callable[..., None]) -> Callable[..., None]:
+            def run_thread(*args: Any) -> None:
+                try:
+                    target(*args)
+                except BaseException as e:
+                    logger.error("Pipeline thread %s died: %s", threading.current_thread().name, e)
+                    failures.append(e)
+                    stop.set()
+            return run_thread
+
+        def put(q: queue.Queue, item: Any) -> bool:
+            # Bounded puts block, so poll the stop flag in case the consumer went away.
+            while not stop.is_set():
+                try:
+                    q.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+
+        def get(q: queue.Queue) -> Any:
+            while not stop.is_set():
+                try:
+                    return q.get(timeout=0.1)
+                except queue.Empty:
+                    continue
+            return _DONE
+
+        def feed() -> None:
+            try:
+                for item in items:
+                    if not put(queues[0], item):
+                        return
+            except Exception as e:
+                logger.error("Error reading pipeline input: %s", e)
+            for _ in range(self.stages[0].workers):
+                put(queues[0], _DONE)
+
+        def work(index: int, stage: Stage, remaining: List[int], lock: threading.Lock) -> None:
+            inbox, outbox = queues[index], queues[index + 1]
+            done = False
+            while not done:
+                item = get(inbox)
+                if item is _DONE:
+                    break
+                batch = [item]
+                # Never wait for a batch to fill, only take what is already queued.
+                while stage.batch_size and len(batch) < stage.batch_size:
+                    try:
+                        item = inbox.get_nowait()
+                    except queue.Empty:
+                        break
+                    if item is _DONE:
+                        done = True
+                        break
+                    batch.append(item)
+
+                try:
+                    results = stage.func(batch) if stage.batch_size else [stage.func(batch[0])]
+                except Exception as e:
+                    logger.error("%s failed for %s: %s", stage.name, ", ".join(map(str, batch)), e)
+                    continue
+                for result in results:
+                    if result is not None and not put(outbox, result):
+                        return
+
+            # The last worker of a stage to finish tells the next stage.
+            with lock:
+                remaining[0] -= 1
+                last = remaining[0] == 0
+            if last:
+                following = self.stages[index + 1].workers if index + 1 < len(self.stages) else 1
+                for _ in range(following):
+                    put(outbox, _DONE)
+
+        threads = [threading.Thread(target=guarded(feed), name="pipeline-feed", daemon=True)]
+        for index, stage in enumerate(self.stages):
+            remaining, lock = [stage.workers], threading.Lock()
+            for n in range(stage.workers):
+                threads.append(threading.Thread(
+                    target=guarded(work),
+                    args=(index, stage, remaining, lock),
+                    name=f"pipeline-{stage.name}-{n}",
+                    daemon=True,
+                ))
+
+        for thread in threads:
+            thread.start()
+        try:
+            while True:
+                try:
+                    result = queues[-1].get(timeout=0.1)
+                except queue.Empty:
+                    if failures:
+                        raise failures[0]
+                    if not queues[-1].empty() or any(thread.is_alive() for thread in threads):
+                        continue
+                    raise RuntimeError("Pipeline threads exited without finishing their input")
+                if result is _DONE:
+                    break
+                yield result
+        finally:
+            stop.set()
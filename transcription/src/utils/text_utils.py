@@ -1,12 +1,78 @@
-import re
-from typing import Optional
-from deepmultilingualpunctuation import PunctuationModel
+import threading
+from typing import List, Tuple
 
-_model = PunctuationModel()
+# Bump when formatting output changes so cached transcripts are regenerated.
+FORMATTER_VERSION = 1
+
+# Words per model call and words shared between neighbouring chunks, matching
+# deepmultilingualpunctuation's own chunking.
+CHUNK_WORDS = 230
+CHUNK_OVERLAP = 5
+
+_model = None
+_model_lock = threading.Lock()
+
+
+def _get_model():
+    """Load the punctuation model on first use."""
+    global _model
+    with _model_lock:
+        if _model is None:
+            from deepmultilingualpunctuation import PunctuationModel
+            _model = PunctuationModel()
+        return _model
 
 
 class TextFormatter:
 
+    @staticmethod
+    def chunk_words(words: List[str]) -> List[Tuple[List[str], int]]:
+        """Split words into model-sized chunks, each paired with how many of its words it labels."""
+        overlap = CHUNK_OVERLAP if len(words) > CHUNK_WORDS else 0
+        chunks = [words[i:i + CHUNK_WORDS] for i in range(0, len(words), CHUNK_WORDS - overlap)]
+        # A trailing chunk that fits inside the previous overlap adds nothing.
+        if len(chunks) > 1 and len(chunks[-1]) <= overlap:
+            chunks.pop()
+        return [(chunk, len(chunk) - (overlap if i < len(chunks) - 1 else 0))
+                for i, chunk in enumerate(chunks)]
+
+    @staticmethod
+    def label_words(chunk: List[str], keep: int, entities: List[dict]) -> List[List]:
+        """Give each word the label of the last subtoken that ends inside it."""
+        tagged = []
+        char_index = 0
+        entity_index = 0
+        score = 0.0
+        for word in chunk[:keep]:
+            char_index += len(word) + 1
+            label = "0"
+            while entity_index < len(entities) and char_index > entities[entity_index]["end"]:
+                label = entities[entity_index]["entity"]
+                score = entities[entity_index]["score"]
+                entity_index += 1
+            tagged.append([word, label, score])
+        return tagged
+
+    @staticmethod
+    def format_transcripts(texts: List[str], batch_size: int = 16) -> List[str]:
+        """Restore punctuation for many transcripts, sending all their chunks through the model together."""
+        if not any(texts):
+            return ["" for _ in texts]
+
+        model = _get_model()
+        words = [model.preprocess(text) if text else [] for text in texts]
+        chunks = [TextFormatter.chunk_words(text_words) if text_words else [] for text_words in words]
+        inputs = [" ".join(chunk) for text_chunks in chunks for chunk, _ in text_chunks]
+        outputs = iter(model.pipe(inputs, batch_size=batch_size)) if inputs else iter(())
+
+        formatted = []
+        for text_chunks in chunks:
+            tagged = []
+            for chunk, keep in text_chunks:
+                tagged.extend(TextFormatter.label_words(chunk, keep, next(outputs)))
+            formatted.append(model.prediction_to_text(tagged) if tagged else "")
+        return formatted
+
     @staticmethod
     def format_transcript(text: str) -> str:
-        return "" if not text else _model.restore_punctuation(text)
+        return "" if not text else TextFormatter.format_transcripts([text])[0]
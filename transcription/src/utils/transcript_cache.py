@@ -0,0 +1,108 @@
+import json
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from utils.file_utils import FileUtils
+from utils.text_utils import FORMATTER_VERSION
+
+logger = logging.getLogger(__name__)
+
+
+class TranscriptCache:
+    """Content-addressed transcripts keyed by (audio hash, model, chunking, formatter version)."""
+
+    INDEX_VERSION = 1
+
+    def __init__(self, transcripts_dir: str = './transcripts'):
+        self.cache_dir = FileUtils.ensure_directory(Path(transcripts_dir) / '.cache')
+        self.index_path = self.cache_dir / 'index.json'
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.index = self._load_index()
+
+    def _load_index(self) -> Dict:
+        try:
+            index = json.loads(self.index_path.read_text(encoding='utf-8'))
+            if index.get('version') == self.INDEX_VERSION:
+                return index
+            logger.info("Ignoring transcript cache index with version %s", index.get('version'))
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError) as e:
+            logger.warning("Could not read transcript cache index %s: %s", self.index_path, e)
+        return {'version': self.INDEX_VERSION, 'entries': {}, 'sources': {}}
+
+    def _save_index(self) -> None:
+        tmp_path = self.index_path.with_suffix('.tmp')
+        tmp_path.write_text(json.dumps(self.index, indent=1, sort_keys=True), encoding='utf-8')
+        os.replace(tmp_path, self.index_path)
+
+    @staticmethod
+    def key(audio_hash: str, model_name: str, chunk_seconds: Optional[float] = None) -> str:
+        # Chunked transcription splits the audio differently, so its text differs.
+        mode = f"-chunked{chunk_seconds:g}s" if chunk_seconds else ""
+        return f"{audio_hash}-{model_name}{mode}-v{FORMATTER_VERSION}"
+
+    def audio_hash_for_source(self, source_hash: str) -> Optional[str]:
+        """Audio hash previously produced by converting a source file with this hash."""
+        with self.lock:
+            return self.index['sources'].get(source_hash)
+
+    def remember_source(self, source_hash: str, audio_hash: str) -> None:
+        with self.lock:
+            if self.index['sources'].get(source_hash) != audio_hash:
+                self.index['sources'][source_hash] = audio_hash
+                self._save_index()
+
+    def get(self, audio_hash: str, model_name: str,
+            chunk_seconds: Optional[float] = None) -> Optional[Tuple[str, Optional[List[dict]]]]:
+        """Cached transcript text and its timed segments, if chunked transcription produced any."""
+        key = self.key(audio_hash, model_name, chunk_seconds)
+        with self.lock:
+            entry = self.index['entries'].get(key)
+        if entry is None:
+            return None
+        try:
+            text = (self.cache_dir / entry['file']).read_text(encoding='utf-8')
+            segments = None
+            if entry.get('segments'):
+                segments = json.loads((self.cache_dir / entry['segments']).read_text(encoding='utf-8'))
+            return text, segments
+        except (OSError, ValueError):
+            logger.warning("Transcript cache entry %s is missing or has a broken file", key)
+            return None
+
+    def record(self, hit: bool) -> None:
+        with self.lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def put(self, audio_hash: str, model_name: str, text: str,
+            chunk_seconds: Optional[float] = None, segments: Optional[List[dict]] = None) -> None:
+        key = self.key(audio_hash, model_name, chunk_seconds)
+        file_name = f"{key}.txt"
+        (self.cache_dir / file_name).write_text(text, encoding='utf-8')
+        segments_name = None
+        if segments is not None:
+            segments_name = f"{key}.segments.json"
+            (self.cache_dir / segments_name).write_text(json.dumps(segments), encoding='utf-8')
+        with self.lock:
+            self.index['entries'][key] = {
+                'file': file_name,
+                'segments': segments_name,
+                'audio_hash': audio_hash,
+                'model': model_name,
+                'chunk_seconds': chunk_seconds,
+                'formatter_version': FORMATTER_VERSION,
+            }
+            self._save_index()
+
+    def report(self) -> str:
+        total = self.hits + self.misses
+        rate = 100.0 * self.hits / total if total else 0.0
+        return f"Transcript cache: {self.hits}/{total} hits ({rate:.0f}%)"
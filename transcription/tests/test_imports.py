@@ -0,0 +1,27 @@
+import os
+import subprocess
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+
+from import_budget import HEAVY_MODULES, SRC_DIR, import_times
+
+
+class LazyImportTest(unittest.TestCase):
+
+    def test_cli_imports_no_heavy_modules(self):
+        for module in ('cli', 'processor'):
+            with self.subTest(module=module):
+                names = {name.split('.')[0] for name, _, _ in import_times(module)}
+                self.assertEqual(names & set(HEAVY_MODULES), set())
+
+    def test_help_runs_without_heavy_modules(self):
+        result = subprocess.run([sys.executable, 'cli.py', '--help'], cwd=SRC_DIR,
+                                capture_output=True, text=True)
+        self.assertEqual(result.returncode, 0, result.stderr)
+        self.assertIn('--chunk-workers', result.stdout)
+
+
+if __name__ == '__main__':
+    unittest.main()
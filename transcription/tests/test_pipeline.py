@@ -0,0 +1,72 @@
+import os
+import sys
+import threading
+import time
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+
+from utils.pipeline import Pipeline, Stage
+
+
+class Crash(BaseException):
+    """Escapes the per-item error handling, as a bug in a stage thread would."""
+
+
+class PipelineTest(unittest.TestCase):
+
+    def run_pipeline(self, stages, items, queue_size=2):
+        results = []
+        thread = threading.Thread(target=lambda: results.extend(Pipeline(stages, queue_size).run(items)))
+        thread.start()
+        thread.join(10)
+        self.assertFalse(thread.is_alive(), "pipeline did not finish")
+        return results
+
+    def test_single_workers_keep_input_order(self):
+        stages = [Stage('double', lambda x: x * 2), Stage('inc', lambda x: x + 1)]
+        self.assertEqual(self.run_pipeline(stages, range(20)), [x * 2 + 1 for x in range(20)])
+
+    def test_parallel_workers_return_every_item(self):
+        def slow(x):
+            time.sleep(0.001 * (x % 3))
+            return x
+        stages = [Stage('slow', slow, workers=4), Stage('same', lambda x: x, workers=2)]
+        self.assertEqual(sorted(self.run_pipeline(stages, range(50))), list(range(50)))
+
+    def test_batches_take_only_waiting_items(self):
+        batches = []
+        stages = [Stage('batch', lambda items: batches.append(len(items)) or items, batch_size=3)]
+        self.assertEqual(self.run_pipeline(stages, range(10), queue_size=10), list(range(10)))
+        self.assertTrue(all(1 <= size <= 3 for size in batches))
+
+    def test_failed_items_are_dropped(self):
+        def check(x):
+            if x % 2:
+                raise ValueError(f"odd {x}")
+            return x
+        with self.assertLogs('utils.pipeline', 'ERROR'):
+            results = self.run_pipeline([Stage('check', check)], range(6))
+        self.assertEqual(results, [0, 2, 4])
+
+    def test_dead_stage_thread_is_raised(self):
+        def crash(x):
+            if x == 3:
+                raise Crash()
+            return x
+        started = time.monotonic()
+        with self.assertLogs('utils.pipeline', 'ERROR'):
+            with self.assertRaises(Crash):
+                list(Pipeline([Stage('crash', crash), Stage('same', lambda x: x)]).run(range(10)))
+        self.assertLess(time.monotonic() - started, 5)
+
+    def test_failing_input_still_finishes(self):
+        def items():
+            yield 1
+            raise OSError("input went away")
+        with self.assertLogs('utils.pipeline', 'ERROR'):
+            self.assertEqual(self.run_pipeline([Stage('same', lambda x: x)], items()), [1])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,65 @@
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+
+from processor import MediaProcessor
+
+
+class CountingPool:
+    """Stands in for ChunkPool and counts how often its workers are stopped."""
+
+    workers = 2
+
+    def __init__(self):
+        self.closed = 0
+
+    def close(self):
+        self.closed += 1
+
+
+class ChunkPoolLifetimeTest(unittest.TestCase):
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.processor = MediaProcessor(output_dir=tmp.name, raw_dir=tmp.name, transcripts_dir=tmp.name,
+                                        use_cache=False, chunk_workers=2)
+        self.pool = self.processor.chunk_pool = CountingPool()
+
+        def download(job):
+            job.path = Path(tmp.name) / f'{job.source}.wav'
+            return job
+
+        def transcribe(job):
+            job.result = f'text of {job.source}', job.path
+            return job
+
+        self.processor.download = download
+        self.processor.convert = lambda job, download, transcribe: job
+        self.processor.transcribe = transcribe
+        self.processor.format = lambda jobs: jobs
+
+    def test_process_url_keeps_pool_between_calls(self):
+        for url in ('a', 'b', 'c'):
+            text, path = self.processor.process_url(url)
+            self.assertEqual(text, f'text of {url}')
+        self.assertEqual(self.pool.closed, 0)
+
+    def test_process_urls_keeps_pool_for_the_next_batch(self):
+        for batch in (['a', 'b'], ['c']):
+            results = list(self.processor.process_urls(batch))
+            self.assertEqual(sorted(text for text, _ in results), [f'text of {url}' for url in batch])
+        self.assertEqual(self.pool.closed, 0)
+
+    def test_close_stops_pool(self):
+        self.processor.process_url('a')
+        self.processor.close()
+        self.assertEqual(self.pool.closed, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,77 @@
+import os
+import sys
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+
+from utils.text_utils import CHUNK_OVERLAP, CHUNK_WORDS, TextFormatter
+
+
+class PeriodModel:
+    """Stands in for PunctuationModel: ends every chunk with a full stop and records calls."""
+
+    def __init__(self):
+        self.calls = []
+
+    def preprocess(self, text):
+        return text.split()
+
+    def pipe(self, inputs, batch_size):
+        self.calls.append(list(inputs))
+        return [[{'entity': '.', 'score': 0.9, 'end': len(text)}] for text in inputs]
+
+    def prediction_to_text(self, tagged):
+        return ' '.join(word + (label if label != '0' else '') for word, label, _ in tagged)
+
+
+class ChunkWordsTest(unittest.TestCase):
+
+    def test_kept_words_cover_the_text_once(self):
+        for count in (1, CHUNK_WORDS, CHUNK_WORDS + 1, CHUNK_WORDS + CHUNK_OVERLAP, 3 * CHUNK_WORDS + 7):
+            with self.subTest(count=count):
+                words = [f'w{i}' for i in range(count)]
+                chunks = TextFormatter.chunk_words(words)
+                self.assertEqual([word for chunk, keep in chunks for word in chunk[:keep]], words)
+                self.assertTrue(all(len(chunk) <= CHUNK_WORDS for chunk, _ in chunks))
+
+    def test_chunks_overlap_by_the_model_overlap(self):
+        words = [f'w{i}' for i in range(CHUNK_WORDS + 20)]
+        (first, keep), (second, _) = TextFormatter.chunk_words(words)
+        self.assertEqual(keep, CHUNK_WORDS - CHUNK_OVERLAP)
+        self.assertEqual(first[-CHUNK_OVERLAP:], second[:CHUNK_OVERLAP])
+
+    def test_label_words_takes_the_last_subtoken_in_each_word(self):
+        entities = [
+            {'entity': '0', 'score': 0.1, 'end': 2},
+            {'entity': ',', 'score': 0.8, 'end': 5},
+            {'entity': '.', 'score': 0.9, 'end': 11},
+        ]
+        self.assertEqual(
+            TextFormatter.label_words(['hello', 'there', 'unused'], 2, entities),
+            [['hello', ',', 0.8], ['there', '.', 0.9]],
+        )
+
+
+class FormatTranscriptsTest(unittest.TestCase):
+
+    def test_all_transcripts_go_through_one_model_call(self):
+        model = PeriodModel()
+        long_text = ' '.join(f'w{i}' for i in range(CHUNK_WORDS + 10))
+        with mock.patch('utils.text_utils._model', model):
+            formatted = TextFormatter.format_transcripts(['hello there', '', long_text])
+
+        self.assertEqual(len(model.calls), 1)
+        self.assertEqual(len(model.calls[0]), 3)
+        self.assertEqual(formatted[0], 'hello there.')
+        self.assertEqual(formatted[1], '')
+        self.assertEqual(formatted[2].split(), long_text.split()[:-1] + [f'w{CHUNK_WORDS + 9}.'])
+
+    def test_empty_transcripts_do_not_load_the_model(self):
+        with mock.patch('utils.text_utils._get_model', side_effect=AssertionError):
+            self.assertEqual(TextFormatter.format_transcripts(['', '']), ['', ''])
+            self.assertEqual(TextFormatter.format_transcript(''), '')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,101 @@
+import json
+import os
+import sys
+import tempfile
+import unittest
+import wave
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+
+from utils.file_utils import FileUtils
+from utils.transcript_cache import TranscriptCache
+
+
+class TranscriptCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.dir = tmp.name
+        self.cache = TranscriptCache(self.dir)
+
+    def test_entries_survive_a_new_cache(self):
+        segments = [{'start': 0.0, 'end': 1.5, 'text': 'hello'}]
+        self.cache.put('abc', 'tiny.en', 'Hello.')
+        self.cache.put('abc', 'tiny.en', 'Hello there.', 60.0, segments)
+
+        cache = TranscriptCache(self.dir)
+        self.assertEqual(cache.get('abc', 'tiny.en'), ('Hello.', None))
+        self.assertEqual(cache.get('abc', 'tiny.en', 60.0), ('Hello there.', segments))
+
+    def test_model_and_chunking_are_part_of_the_key(self):
+        self.cache.put('abc', 'tiny.en', 'tiny')
+        self.assertIsNone(self.cache.get('abc', 'base.en'))
+        self.assertIsNone(self.cache.get('abc', 'tiny.en', 60.0))
+        self.assertIsNone(self.cache.get('abd', 'tiny.en'))
+        self.cache.put('abc', 'tiny.en', 'chunked', 60.0)
+        self.assertIsNone(self.cache.get('abc', 'tiny.en', 120.0))
+        self.assertEqual(self.cache.get('abc', 'tiny.en'), ('tiny', None))
+
+    def test_formatter_version_invalidates_entries(self):
+        self.cache.put('abc', 'tiny.en', 'old formatting')
+        with mock.patch('utils.transcript_cache.FORMATTER_VERSION', 2):
+            self.assertIsNone(self.cache.get('abc', 'tiny.en'))
+
+    def test_missing_file_is_a_miss(self):
+        self.cache.put('abc', 'tiny.en', 'text')
+        os.remove(Path(self.dir) / '.cache' / f"{TranscriptCache.key('abc', 'tiny.en')}.txt")
+        self.assertIsNone(self.cache.get('abc', 'tiny.en'))
+
+    def test_index_with_other_version_is_ignored(self):
+        self.cache.put('abc', 'tiny.en', 'text')
+        self.cache.remember_source('src', 'abc')
+        index_path = Path(self.dir) / '.cache' / 'index.json'
+        index = json.loads(index_path.read_text())
+        index['version'] = TranscriptCache.INDEX_VERSION + 1
+        index_path.write_text(json.dumps(index))
+
+        cache = TranscriptCache(self.dir)
+        self.assertIsNone(cache.get('abc', 'tiny.en'))
+        self.assertIsNone(cache.audio_hash_for_source('src'))
+
+    def test_sources_map_to_audio_hashes(self):
+        self.cache.remember_source('src', 'abc')
+        self.assertEqual(TranscriptCache(self.dir).audio_hash_for_source('src'), 'abc')
+
+    def test_report_counts_hits(self):
+        self.cache.record(True)
+        self.cache.record(False)
+        self.cache.record(True)
+        self.assertEqual(self.cache.report(), 'Transcript cache: 2/3 hits (67%)')
+
+
+class AudioHashTest(unittest.TestCase):
+
+    def write_wav(self, path, frames, rate=16000):
+        with wave.open(str(path), 'wb') as wav:
+            wav.setnchannels(1)
+            wav.setsampwidth(2)
+            wav.setframerate(rate)
+            wav.writeframes(frames)
+
+    def test_hash_covers_format_and_samples_only(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            a, b, c, d = (Path(tmp) / f'{name}.wav' for name in 'abcd')
+            self.write_wav(a, b'\x01\x00' * 100)
+            self.write_wav(b, b'\x01\x00' * 100)
+            # Trailing chunks after the samples are header metadata, not audio.
+            with open(b, 'ab') as f:
+                f.write(b'LIST\x04\x00\x00\x00INFO')
+            self.write_wav(c, b'\x02\x00' * 100)
+            self.write_wav(d, b'\x01\x00' * 100, rate=8000)
+
+            self.assertEqual(FileUtils.get_audio_hash(a), FileUtils.get_audio_hash(b))
+            self.assertNotEqual(FileUtils.get_audio_hash(a), FileUtils.get_audio_hash(c))
+            self.assertNotEqual(FileUtils.get_audio_hash(a), FileUtils.get_audio_hash(d))
+
+
+if __name__ == '__main__':
+    unittest.main()
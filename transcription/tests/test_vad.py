@@ -0,0 +1,101 @@
+import os
+import sys
+import tempfile
+import unittest
+import wave
+from pathlib import Path
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+if np is not None:
+    from audio.vad import SAMPLE_RATE, read_samples, split_on_silence
+
+
+@unittest.skipIf(np is None, 'numpy is not installed')
+class SplitOnSilenceTest(unittest.TestCase):
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.path = Path(tmp.name) / 'audio.wav'
+        self.rng = np.random.default_rng(0)
+
+    def write(self, spans, rate=None):
+        """Write (seconds, is_speech) spans as a tone over faint noise."""
+        rate = rate or SAMPLE_RATE
+        parts = []
+        for seconds, speech in spans:
+            n = int(seconds * rate)
+            part = self.rng.normal(0, 0.001, n)
+            if speech:
+                part += 0.3 * np.sin(2 * np.pi * 220 * np.arange(n) / rate)
+            parts.append(part)
+        samples = np.concatenate(parts)
+        with wave.open(str(self.path), 'wb') as wav:
+            wav.setnchannels(1)
+            wav.setsampwidth(2)
+            wav.setframerate(rate)
+            wav.writeframes((np.clip(samples, -1, 1) * 32767).astype('<i2').tobytes())
+        return len(samples)
+
+    def assertCoversInOrder(self, chunks, total, chunk_seconds):
+        self.assertEqual(chunks[0][0], 0)
+        self.assertEqual(chunks[-1][1], total)
+        for (_, end), (start, _) in zip(chunks, chunks[1:]):
+            self.assertEqual(end, start)
+        for start, end in chunks:
+            self.assertLessEqual(end - start, chunk_seconds * SAMPLE_RATE + SAMPLE_RATE // 10)
+
+    def test_cuts_land_in_silences(self):
+        total = self.write([(8, True), (1, False), (8, True), (1, False), (6, True)])
+        chunks = split_on_silence(self.path, chunk_seconds=12)
+
+        self.assertEqual(len(chunks), 3)
+        self.assertCoversInOrder(chunks, total, 12)
+        for (_, cut), silence_start in zip(chunks, (8, 17)):
+            self.assertGreater(cut, silence_start * SAMPLE_RATE)
+            self.assertLess(cut, (silence_start + 1) * SAMPLE_RATE)
+
+    def test_short_audio_is_one_chunk(self):
+        total = self.write([(3, True), (1, False), (3, True)])
+        self.assertEqual(split_on_silence(self.path, chunk_seconds=12), [(0, total)])
+
+    def test_audio_without_silence_is_still_cut(self):
+        total = self.write([(25, True)])
+        chunks = split_on_silence(self.path, chunk_seconds=10)
+        self.assertGreaterEqual(len(chunks), 3)
+        self.assertCoversInOrder(chunks, total, 10)
+
+    def test_silent_chunks_are_left_out(self):
+        self.write([(6, True), (1, False), (20, False), (1, False), (6, True)])
+        chunks = split_on_silence(self.path, chunk_seconds=10)
+        self.assertGreater(len(chunks), 1)
+        for start, end in chunks:
+            self.assertGreater(np.abs(read_samples(self.path, start, end)).max(), 0.1)
+
+    def test_silence_only_gives_no_chunks(self):
+        self.write([(5, False)])
+        self.assertEqual(split_on_silence(self.path, chunk_seconds=2), [])
+
+    def test_other_formats_are_rejected(self):
+        self.write([(1, True)], rate=8000)
+        with self.assertRaises(ValueError):
+            split_on_silence(self.path)
+
+    def test_read_samples_returns_the_range_as_floats(self):
+        self.write([(1, False), (1, True)])
+        quiet = read_samples(self.path, 0, 100)
+        loud = read_samples(self.path, SAMPLE_RATE, SAMPLE_RATE + 100)
+        self.assertEqual(quiet.dtype, np.float32)
+        self.assertEqual(len(loud), 100)
+        self.assertLess(np.abs(quiet).max(), 0.01)
+        self.assertGreater(np.abs(loud).max(), 0.2)
+
+
+if __name__ == '__main__':
+    unittest.main()